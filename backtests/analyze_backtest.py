@@ -10,6 +10,12 @@ from datetime import datetime, timedelta
 import os
 import sys
 
+from lifecycle_compliance import STAGE_NAMES, evaluate_lifecycle
+from metric_graph import MetricGraph
+from metric_kernels import daily_risk_ratios, to_columns
+from series_archive import SeriesArchive, columns_to_trades
+from streak_analytics import streak_distribution, trade_outcomes
+
 # Pour les graphiques (optionnel)
 try:
     import matplotlib.pyplot as plt
@@ -30,7 +36,10 @@ PROPFIRM_RULES = {
         'profit_target_p1': 10.0,
         'profit_target_p2': 5.0,
         'min_trading_days': 4,
-        'profit_split': 80
+        'profit_split': 80,
+        'funded_max_daily_dd': 5.0,
+        'funded_max_total_dd': 10.0,
+        'scaling_plan': 'ftmo'
     },
     'E8_One': {
         'max_daily_dd': 5.0,
@@ -38,7 +47,10 @@ PROPFIRM_RULES = {
         'profit_target_p1': 10.0,
         'profit_target_p2': 0,
         'min_trading_days': 3,
-        'profit_split': 80
+        'profit_split': 80,
+        'funded_max_daily_dd': 5.0,
+        'funded_max_total_dd': 6.0,
+        'scaling_plan': 'e8'
     },
     'FundingPips_1Step': {
         'max_daily_dd': 4.0,
@@ -46,7 +58,10 @@ PROPFIRM_RULES = {
         'profit_target_p1': 10.0,
         'profit_target_p2': 0,
         'min_trading_days': 3,
-        'profit_split': 80
+        'profit_split': 80,
+        'funded_max_daily_dd': 4.0,
+        'funded_max_total_dd': 6.0,
+        'scaling_plan': None
     },
     'The5ers_Bootcamp': {
         'max_daily_dd': 100.0,  # Pas de limite en eval
@@ -54,21 +69,119 @@ PROPFIRM_RULES = {
         'profit_target_p1': 6.0,
         'profit_target_p2': 6.0,
         'min_trading_days': 0,
-        'profit_split': 80
+        'profit_split': 80,
+        'funded_max_daily_dd': 3.0,
+        'funded_max_total_dd': 4.0,
+        'scaling_plan': None
     }
 }
 
+# Nœuds du graphe qui produisent des métriques (ordre du dict metrics)
+METRIC_NODES = ('trade_stats', 'drawdown', 'daily_drawdown', 'streaks',
+                'risk_ratios', 'recovery_factor', 'trading_days')
+
+# Métrique -> nœud qui la calcule (BacktestAnalyzer.metric)
+METRIC_SOURCES = {
+    **dict.fromkeys(('total_trades', 'winning_trades', 'losing_trades', 'win_rate', 'gross_profit',
+                     'gross_loss', 'net_profit', 'net_profit_pct', 'profit_factor', 'avg_win',
+                     'avg_loss', 'expected_payoff'), 'trade_stats'),
+    **dict.fromkeys(('max_drawdown', 'max_drawdown_pct'), 'drawdown'),
+    **dict.fromkeys(('max_daily_dd_pct', 'worst_day'), 'daily_drawdown'),
+    **dict.fromkeys(('max_consec_wins', 'max_consec_losses'), 'streaks'),
+    **dict.fromkeys(('sharpe_ratio', 'sortino_ratio', 'calmar_ratio', 'ulcer_index'), 'risk_ratios'),
+    'recovery_factor': 'recovery_factor',
+    'trading_days': 'trading_days'
+}
+
+
 #==============================================================================
 # CLASSE PRINCIPALE
 #==============================================================================
 
 class BacktestAnalyzer:
-    def __init__(self, initial_balance=100000):
+    def __init__(self, initial_balance=100000, server_offset_hours=0):
+        self.graph = self._build_graph()
+        self._metrics_override = None
         self.initial_balance = initial_balance
+        self.server_offset_hours = server_offset_hours  # Décalage date trade -> heure serveur
         self.trades = []
-        self.equity_curve = []
-        self.daily_pnl = {}
-        self.metrics = {}
+
+    #--------------------------------------------------------------------------
+    # Entrées du graphe (toute modification invalide les métriques dépendantes)
+    #--------------------------------------------------------------------------
+
+    @property
+    def trades(self):
+        return self.graph.get('trades')
+
+    @trades.setter
+    def trades(self, trades):
+        """
+        Nouvelle version du set de trades (métriques invalidées)
+        Une liste modifiée en place (append, édition) doit être réassignée
+        à self.trades, ou suivie d'un appel à invalidate()
+        """
+        self._metrics_override = None
+        self.graph.set('trades', trades)
+
+    def invalidate(self):
+        """Nouvelle version des trades après une modification en place de la liste"""
+        self.trades = self.trades
+
+    @property
+    def initial_balance(self):
+        return self.graph.get('initial_balance')
+
+    @initial_balance.setter
+    def initial_balance(self, value):
+        self.graph.set('initial_balance', value)
+
+    @property
+    def server_offset_hours(self):
+        return self.graph.get('server_offset_hours')
+
+    @server_offset_hours.setter
+    def server_offset_hours(self, value):
+        self.graph.set('server_offset_hours', value)
+
+    def add_trades(self, trades):
+        """Ajoute des trades au set courant (nouvelle version, métriques invalidées)"""
+        self.trades = list(self.trades) + list(trades)
+
+    #--------------------------------------------------------------------------
+    # Vues calculées à la demande
+    #--------------------------------------------------------------------------
+
+    @property
+    def equity_curve(self):
+        return self.graph.get('equity_curve')
+
+    @property
+    def daily_pnl(self):
+        return self.graph.get('daily_pnl')
+
+    @property
+    def daily_ratios(self):
+        return self.graph.get('daily_ratios') or {}
+
+    @property
+    def metrics(self):
+        """Toutes les métriques (dict vide sans trades), ou celles assignées explicitement"""
+        if self._metrics_override is not None:
+            return self._metrics_override
+        return self.graph.get('metrics')
+
+    @metrics.setter
+    def metrics(self, metrics):
+        """
+        Métriques fournies de l'extérieur: prioritaires (rapport et conformité)
+        jusqu'au prochain changement de trades
+        """
+        self._metrics_override = metrics
+
+    def metric(self, key):
+        """Une seule métrique: seuls les nœuds nécessaires sont calculés"""
+        return self.graph.get(METRIC_SOURCES[key])[key]
 
     def load_mt5_report(self, filepath):
         """Charge un rapport MT5 au format CSV ou HTML"""
@@ -76,6 +189,8 @@ class BacktestAnalyzer:
             return self._load_csv(filepath)
         elif filepath.endswith('.html') or filepath.endswith('.htm'):
             return self._load_html(filepath)
+        elif filepath.endswith('.pfa'):
+            return self.load_archive(filepath)
         else:
             print(f"Format non supporté: {filepath}")
             return False
@@ -108,74 +223,124 @@ class BacktestAnalyzer:
             print(f"Erreur chargement HTML: {e}")
             return False
 
+    def load_archive(self, filepath, start=None, end=None):
+        """
+        Charge les trades d'une archive .pfa (series_archive), éventuellement
+        limités à une plage de dates: seuls les blocs concernés sont décompressés
+        """
+        try:
+            columns = SeriesArchive(filepath).read('trades', start, end)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Erreur chargement archive: {e}")
+            return False
+        self.trades = columns_to_trades(columns)
+        print(f"Chargé {len(self.trades)} trades depuis {filepath}")
+        return True
+
     def load_from_list(self, trades_list):
         """
         Charge les trades depuis une liste de dictionnaires
         Format: [{'date': datetime, 'profit': float, 'type': 'BUY'/'SELL', ...}, ...]
         """
         self.trades = trades_list
-        self._build_equity_curve()
         return True
 
-    def _build_equity_curve(self):
-        """Construit la courbe d'équité"""
-        balance = self.initial_balance
-        self.equity_curve = [{'date': None, 'equity': balance}]
+    #--------------------------------------------------------------------------
+    # Graphe des métriques
+    #--------------------------------------------------------------------------
 
-        for trade in self.trades:
-            balance += trade.get('profit', 0)
-            self.equity_curve.append({
-                'date': trade.get('date'),
-                'equity': balance
-            })
+    def _build_graph(self):
+        """
+        Déclare les métriques comme nœuds du graphe:
+        trades -> equity -> drawdown -> recovery factor
+        trades -> P&L journalier -> DD journalier -> conformité
+        """
+        graph = MetricGraph()
+        for name in ('trades', 'initial_balance', 'server_offset_hours'):
+            graph.add_input(name)
+
+        graph.add_node('equity_curve', self._build_equity_curve, ('trades', 'initial_balance'))
+        graph.add_node('columns', to_columns, ('trades',))
+        graph.add_node('trade_stats', self._calculate_trade_stats, ('trades', 'initial_balance'))
+        graph.add_node('drawdown', self._calculate_drawdown, ('equity_curve',))
+        graph.add_node('daily_pnl', self._calculate_daily_pnl, ('trades',))
+        graph.add_node('daily_drawdown', self._calculate_daily_drawdown, ('daily_pnl', 'initial_balance'))
+        graph.add_node('streaks', self._calculate_consecutive_series, ('columns',))
+        graph.add_node('daily_ratios', self._calculate_daily_ratios,
+                       ('columns', 'initial_balance', 'server_offset_hours'))
+        graph.add_node('risk_ratios', self._calculate_advanced_ratios,
+                       ('columns', 'daily_ratios', 'initial_balance'))
+        graph.add_node('recovery_factor', self._calculate_recovery_factor, ('trade_stats', 'drawdown'))
+        graph.add_node('trading_days', self._calculate_trading_days, ('trades',))
+        graph.add_node('metrics', self._merge_metrics, ('trades',) + METRIC_NODES)
+        graph.add_node('compliance', self._check_compliance,
+                       ('trade_stats', 'drawdown', 'daily_drawdown', 'trading_days'))
+        graph.add_node('lifecycle', self._evaluate_lifecycle,
+                       ('columns', 'initial_balance', 'server_offset_hours'))
+        return graph
 
     def calculate_metrics(self):
-        """Calcule toutes les métriques de performance"""
+        """Recalcule toutes les métriques de performance (mémorisées ensuite jusqu'au prochain changement)"""
+        self.invalidate()
         if not self.trades:
             print("Aucun trade à analyser")
             return
+        self.graph.get('metrics')
+
+    @staticmethod
+    def _merge_metrics(trades, *parts):
+        """Fusionne les nœuds de métriques dans l'ordre historique du rapport"""
+        metrics = {}
+        if trades:
+            for part in parts:
+                metrics.update(part)
+        return metrics
+
+    @staticmethod
+    def _build_equity_curve(trades, initial_balance):
+        """Construit la courbe d'équité"""
+        balance = initial_balance
+        equity_curve = [{'date': None, 'equity': balance}]
 
-        # Métriques de base
-        profits = [t['profit'] for t in self.trades if t['profit'] > 0]
-        losses = [abs(t['profit']) for t in self.trades if t['profit'] < 0]
-
-        self.metrics['total_trades'] = len(self.trades)
-        self.metrics['winning_trades'] = len(profits)
-        self.metrics['losing_trades'] = len(losses)
-        self.metrics['win_rate'] = len(profits) / len(self.trades) * 100 if self.trades else 0
-
-        self.metrics['gross_profit'] = sum(profits)
-        self.metrics['gross_loss'] = sum(losses)
-        self.metrics['net_profit'] = self.metrics['gross_profit'] - self.metrics['gross_loss']
-        self.metrics['net_profit_pct'] = self.metrics['net_profit'] / self.initial_balance * 100
-
-        self.metrics['profit_factor'] = (
-            self.metrics['gross_profit'] / self.metrics['gross_loss']
-            if self.metrics['gross_loss'] > 0 else float('inf')
+        for trade in trades:
+            balance += trade.get('profit', 0)
+            equity_curve.append({
+                'date': trade.get('date'),
+                'equity': balance
+            })
+        return equity_curve
+
+    @staticmethod
+    def _calculate_trade_stats(trades, initial_balance):
+        """Métriques de base"""
+        profits = [t['profit'] for t in trades if t['profit'] > 0]
+        losses = [abs(t['profit']) for t in trades if t['profit'] < 0]
+
+        metrics = {}
+        metrics['total_trades'] = len(trades)
+        metrics['winning_trades'] = len(profits)
+        metrics['losing_trades'] = len(losses)
+        metrics['win_rate'] = len(profits) / len(trades) * 100 if trades else 0
+
+        metrics['gross_profit'] = sum(profits)
+        metrics['gross_loss'] = sum(losses)
+        metrics['net_profit'] = metrics['gross_profit'] - metrics['gross_loss']
+        metrics['net_profit_pct'] = metrics['net_profit'] / initial_balance * 100
+
+        metrics['profit_factor'] = (
+            metrics['gross_profit'] / metrics['gross_loss']
+            if metrics['gross_loss'] > 0 else float('inf')
         )
 
-        self.metrics['avg_win'] = np.mean(profits) if profits else 0
-        self.metrics['avg_loss'] = np.mean(losses) if losses else 0
-        self.metrics['expected_payoff'] = self.metrics['net_profit'] / len(self.trades) if self.trades else 0
-
-        # Drawdown
-        self._calculate_drawdown()
-
-        # Séries consécutives
-        self._calculate_consecutive_series()
+        metrics['avg_win'] = np.mean(profits) if profits else 0
+        metrics['avg_loss'] = np.mean(losses) if losses else 0
+        metrics['expected_payoff'] = metrics['net_profit'] / len(trades) if trades else 0
+        return metrics
 
-        # Ratios avancés
-        self._calculate_advanced_ratios()
-
-        # Jours de trading
-        self._calculate_trading_days()
-
-    def _calculate_drawdown(self):
-        """Calcule le drawdown maximum et journalier"""
-        if not self.equity_curve:
-            return
-
-        equities = [e['equity'] for e in self.equity_curve]
+    @staticmethod
+    def _calculate_drawdown(equity_curve):
+        """Calcule le drawdown maximum"""
+        equities = [e['equity'] for e in equity_curve]
         peak = equities[0]
         max_dd = 0
         max_dd_pct = 0
@@ -189,105 +354,132 @@ class BacktestAnalyzer:
                 max_dd = dd
                 max_dd_pct = dd_pct
 
-        self.metrics['max_drawdown'] = max_dd
-        self.metrics['max_drawdown_pct'] = max_dd_pct
-
-        # Drawdown journalier maximum
-        self._calculate_daily_drawdown()
+        return {'max_drawdown': max_dd, 'max_drawdown_pct': max_dd_pct}
 
-    def _calculate_daily_drawdown(self):
-        """Calcule le drawdown journalier maximum"""
+    @staticmethod
+    def _calculate_daily_pnl(trades):
+        """P&L par jour calendaire"""
         daily_pnl = {}
 
-        for trade in self.trades:
+        for trade in trades:
             date = trade.get('date')
             if date:
                 day = date.date() if hasattr(date, 'date') else date
                 if day not in daily_pnl:
                     daily_pnl[day] = 0
                 daily_pnl[day] += trade['profit']
+        return daily_pnl
 
-        self.daily_pnl = daily_pnl
-
+    @staticmethod
+    def _calculate_daily_drawdown(daily_pnl, initial_balance):
+        """Calcule le drawdown journalier maximum"""
         if daily_pnl:
             # Calculer le pire jour en %
             worst_day = min(daily_pnl.values())
-            worst_day_pct = abs(worst_day) / self.initial_balance * 100
-            self.metrics['max_daily_dd_pct'] = worst_day_pct
-            self.metrics['worst_day'] = worst_day
-        else:
-            self.metrics['max_daily_dd_pct'] = 0
-            self.metrics['worst_day'] = 0
-
-    def _calculate_consecutive_series(self):
-        """Calcule les séries de gains/pertes consécutifs"""
-        max_consec_wins = 0
-        max_consec_losses = 0
-        current_wins = 0
-        current_losses = 0
-
-        for trade in self.trades:
-            if trade['profit'] > 0:
-                current_wins += 1
-                current_losses = 0
-                max_consec_wins = max(max_consec_wins, current_wins)
-            else:
-                current_losses += 1
-                current_wins = 0
-                max_consec_losses = max(max_consec_losses, current_losses)
-
-        self.metrics['max_consec_wins'] = max_consec_wins
-        self.metrics['max_consec_losses'] = max_consec_losses
-
-    def _calculate_advanced_ratios(self):
-        """Calcule Sharpe, Sortino, Recovery Factor"""
-        if not self.trades:
-            return
-
-        returns = [t['profit'] / self.initial_balance for t in self.trades]
+            worst_day_pct = abs(worst_day) / initial_balance * 100
+            return {'max_daily_dd_pct': worst_day_pct, 'worst_day': worst_day}
+        return {'max_daily_dd_pct': 0, 'worst_day': 0}
 
-        # Sharpe Ratio (annualisé)
-        avg_return = np.mean(returns)
-        std_return = np.std(returns)
-        if std_return > 0:
-            self.metrics['sharpe_ratio'] = (avg_return * 252) / (std_return * np.sqrt(252))
-        else:
-            self.metrics['sharpe_ratio'] = 0
+    @staticmethod
+    def _calculate_consecutive_series(columns):
+        """
+        Calcule les séries de gains/pertes consécutifs
+        Un trade breakeven (profit nul) interrompt les deux séries sans compter comme perte
+        """
+        streaks = streak_distribution(trade_outcomes(columns['profit']))
+        return {'max_consec_wins': streaks['max_win'], 'max_consec_losses': streaks['max_loss']}
 
-        # Sortino Ratio (ne considère que la volatilité négative)
-        negative_returns = [r for r in returns if r < 0]
-        if negative_returns:
-            downside_std = np.std(negative_returns)
+    @staticmethod
+    def _calculate_daily_ratios(columns, initial_balance, server_offset_hours):
+        """
+        Ratios sur rendements journaliers du calendrier serveur (jours sans trade
+        inclus) afin de comparer scalper et breakout à l'identique
+        None sans dates (pas de calendrier possible)
+        """
+        if not len(columns['time']) or np.isnat(columns['time']).any():
+            return None
+        return daily_risk_ratios(columns['time'], columns['profit'], initial_balance,
+                                 server_offset_hours=server_offset_hours)
+
+    @staticmethod
+    def _calculate_advanced_ratios(columns, daily_ratios, initial_balance):
+        """Calcule Sharpe, Sortino, Calmar et Ulcer"""
+        metrics = {}
+        if daily_ratios is None:
+            # Sans dates, pas de calendrier: repli sur les rendements par trade
+            returns = columns['profit'] / initial_balance
+            if not len(returns):
+                return {'sharpe_ratio': 0, 'sortino_ratio': 0, 'calmar_ratio': 0, 'ulcer_index': 0}
+            avg_return = np.mean(returns)
+            std_return = np.std(returns)
+            metrics['sharpe_ratio'] = avg_return / std_return * np.sqrt(252) if std_return > 0 else 0
+            downside_std = np.std(returns[returns < 0]) if (returns < 0).any() else 0
             if downside_std > 0:
-                self.metrics['sortino_ratio'] = (avg_return * 252) / (downside_std * np.sqrt(252))
+                metrics['sortino_ratio'] = avg_return / downside_std * np.sqrt(252)
             else:
-                self.metrics['sortino_ratio'] = 0
-        else:
-            self.metrics['sortino_ratio'] = float('inf')
-
-        # Recovery Factor
-        if self.metrics.get('max_drawdown', 0) > 0:
-            self.metrics['recovery_factor'] = self.metrics['net_profit'] / self.metrics['max_drawdown']
+                metrics['sortino_ratio'] = float('inf') if avg_return > 0 else 0
+            metrics['calmar_ratio'] = 0
+            metrics['ulcer_index'] = 0
         else:
-            self.metrics['recovery_factor'] = float('inf')
-
-    def _calculate_trading_days(self):
+            for key in ('sharpe_ratio', 'sortino_ratio', 'calmar_ratio', 'ulcer_index'):
+                metrics[key] = float(daily_ratios[key])
+        return metrics
+
+    @staticmethod
+    def _calculate_recovery_factor(trade_stats, drawdown):
+        """Recovery Factor"""
+        if drawdown['max_drawdown'] > 0:
+            return {'recovery_factor': trade_stats['net_profit'] / drawdown['max_drawdown']}
+        return {'recovery_factor': float('inf')}
+
+    @staticmethod
+    def _calculate_trading_days(trades):
         """Calcule le nombre de jours de trading"""
         trading_days = set()
-        for trade in self.trades:
+        for trade in trades:
             date = trade.get('date')
             if date:
                 day = date.date() if hasattr(date, 'date') else date
                 trading_days.add(day)
 
-        self.metrics['trading_days'] = len(trading_days)
+        return {'trading_days': len(trading_days)}
 
     def check_propfirm_compliance(self, propfirm='FTMO'):
-        """Vérifie la conformité avec les règles d'une prop firm"""
+        """
+        Vérifie la conformité avec les règles d'une prop firm (mémorisée par firm)
+        Des métriques assignées via self.metrics sont évaluées à la place des
+        métriques calculées (une métrique absente fait échouer sa règle)
+        """
         if propfirm not in PROPFIRM_RULES:
             print(f"PropFirm inconnue: {propfirm}")
             return None
+        if self._metrics_override is not None:
+            values = {'max_drawdown_pct': 100, 'max_daily_dd_pct': 100, 'net_profit_pct': 0,
+                      'net_profit': 0, 'trading_days': 0, **self._metrics_override}
+            compliance = self._check_compliance(values, values, values, values, propfirm)
+            lifecycle = self.graph.get('lifecycle', propfirm) if self.trades else None
+            return {**compliance, 'lifecycle': lifecycle}
+        if not self.trades:
+            return None
+        return {**self.graph.get('compliance', propfirm),
+                'lifecycle': self.graph.get('lifecycle', propfirm)}
 
+    @staticmethod
+    def _evaluate_lifecycle(columns, initial_balance, server_offset_hours, propfirm):
+        """
+        Nœud cycle de vie: phase 1, phase 2, funded (payouts, scaling) rejoués
+        sur l'historique; None sans dates (pas de jours de trading)
+        """
+        if not len(columns['time']) or np.isnat(columns['time']).any():
+            return None
+        result = evaluate_lifecycle(columns['time'], columns['profit'], initial_balance,
+                                    profiles={propfirm: PROPFIRM_RULES[propfirm]},
+                                    server_offset_hours=server_offset_hours)
+        return {key: values[0, 0].item() for key, values in result.items() if key != 'profiles'}
+
+    @staticmethod
+    def _check_compliance(trade_stats, drawdown, daily_drawdown, trading_days, propfirm):
+        """Nœud de conformité: ne dépend que des métriques utilisées par les règles"""
         rules = PROPFIRM_RULES[propfirm]
         results = {
             'propfirm': propfirm,
@@ -295,33 +487,33 @@ class BacktestAnalyzer:
         }
 
         # Check DD total
-        dd_total_ok = self.metrics.get('max_drawdown_pct', 100) < rules['max_total_dd']
+        dd_total_ok = drawdown['max_drawdown_pct'] < rules['max_total_dd']
         results['checks']['max_total_dd'] = {
-            'value': self.metrics.get('max_drawdown_pct', 0),
+            'value': drawdown['max_drawdown_pct'],
             'limit': rules['max_total_dd'],
             'passed': dd_total_ok
         }
 
         # Check DD journalier
-        dd_daily_ok = self.metrics.get('max_daily_dd_pct', 100) < rules['max_daily_dd']
+        dd_daily_ok = daily_drawdown['max_daily_dd_pct'] < rules['max_daily_dd']
         results['checks']['max_daily_dd'] = {
-            'value': self.metrics.get('max_daily_dd_pct', 0),
+            'value': daily_drawdown['max_daily_dd_pct'],
             'limit': rules['max_daily_dd'],
             'passed': dd_daily_ok
         }
 
         # Check profit target
-        profit_ok = self.metrics.get('net_profit_pct', 0) >= rules['profit_target_p1']
+        profit_ok = trade_stats['net_profit_pct'] >= rules['profit_target_p1']
         results['checks']['profit_target'] = {
-            'value': self.metrics.get('net_profit_pct', 0),
+            'value': trade_stats['net_profit_pct'],
             'limit': rules['profit_target_p1'],
             'passed': profit_ok
         }
 
         # Check trading days
-        days_ok = self.metrics.get('trading_days', 0) >= rules['min_trading_days']
+        days_ok = trading_days['trading_days'] >= rules['min_trading_days']
         results['checks']['min_trading_days'] = {
-            'value': self.metrics.get('trading_days', 0),
+            'value': trading_days['trading_days'],
             'limit': rules['min_trading_days'],
             'passed': days_ok
         }
@@ -331,7 +523,7 @@ class BacktestAnalyzer:
 
         # Estimation des gains si funded
         if results['would_pass']:
-            estimated_monthly = self.metrics.get('net_profit', 0) * rules['profit_split'] / 100
+            estimated_monthly = trade_stats['net_profit'] * rules['profit_split'] / 100
             results['estimated_payout'] = estimated_monthly
 
         return results
@@ -339,6 +531,7 @@ class BacktestAnalyzer:
     def generate_report(self, propfirm='FTMO'):
         """Génère un rapport complet"""
         compliance = self.check_propfirm_compliance(propfirm)
+        metrics = self.metrics
 
         report = []
         report.append("=" * 70)
@@ -351,35 +544,37 @@ class BacktestAnalyzer:
         report.append("-" * 70)
         report.append("PERFORMANCE METRICS")
         report.append("-" * 70)
-        report.append(f"Net Profit:       ${self.metrics.get('net_profit', 0):,.2f} ({self.metrics.get('net_profit_pct', 0):.2f}%)")
-        report.append(f"Gross Profit:     ${self.metrics.get('gross_profit', 0):,.2f}")
-        report.append(f"Gross Loss:       ${self.metrics.get('gross_loss', 0):,.2f}")
-        report.append(f"Profit Factor:    {self.metrics.get('profit_factor', 0):.2f}")
-        report.append(f"Expected Payoff:  ${self.metrics.get('expected_payoff', 0):.2f}")
+        report.append(f"Net Profit:       ${metrics.get('net_profit', 0):,.2f} ({metrics.get('net_profit_pct', 0):.2f}%)")
+        report.append(f"Gross Profit:     ${metrics.get('gross_profit', 0):,.2f}")
+        report.append(f"Gross Loss:       ${metrics.get('gross_loss', 0):,.2f}")
+        report.append(f"Profit Factor:    {metrics.get('profit_factor', 0):.2f}")
+        report.append(f"Expected Payoff:  ${metrics.get('expected_payoff', 0):.2f}")
         report.append("")
 
         report.append("-" * 70)
         report.append("TRADE STATISTICS")
         report.append("-" * 70)
-        report.append(f"Total Trades:     {self.metrics.get('total_trades', 0)}")
-        report.append(f"Winning Trades:   {self.metrics.get('winning_trades', 0)}")
-        report.append(f"Losing Trades:    {self.metrics.get('losing_trades', 0)}")
-        report.append(f"Win Rate:         {self.metrics.get('win_rate', 0):.2f}%")
-        report.append(f"Avg Win:          ${self.metrics.get('avg_win', 0):.2f}")
-        report.append(f"Avg Loss:         ${self.metrics.get('avg_loss', 0):.2f}")
-        report.append(f"Max Consec Wins:  {self.metrics.get('max_consec_wins', 0)}")
-        report.append(f"Max Consec Losses:{self.metrics.get('max_consec_losses', 0)}")
+        report.append(f"Total Trades:     {metrics.get('total_trades', 0)}")
+        report.append(f"Winning Trades:   {metrics.get('winning_trades', 0)}")
+        report.append(f"Losing Trades:    {metrics.get('losing_trades', 0)}")
+        report.append(f"Win Rate:         {metrics.get('win_rate', 0):.2f}%")
+        report.append(f"Avg Win:          ${metrics.get('avg_win', 0):.2f}")
+        report.append(f"Avg Loss:         ${metrics.get('avg_loss', 0):.2f}")
+        report.append(f"Max Consec Wins:  {metrics.get('max_consec_wins', 0)}")
+        report.append(f"Max Consec Losses:{metrics.get('max_consec_losses', 0)}")
         report.append("")
 
         report.append("-" * 70)
         report.append("RISK METRICS")
         report.append("-" * 70)
-        report.append(f"Max Drawdown:     ${self.metrics.get('max_drawdown', 0):,.2f} ({self.metrics.get('max_drawdown_pct', 0):.2f}%)")
-        report.append(f"Max Daily DD:     {self.metrics.get('max_daily_dd_pct', 0):.2f}%")
-        report.append(f"Sharpe Ratio:     {self.metrics.get('sharpe_ratio', 0):.2f}")
-        report.append(f"Sortino Ratio:    {self.metrics.get('sortino_ratio', 0):.2f}")
-        report.append(f"Recovery Factor:  {self.metrics.get('recovery_factor', 0):.2f}")
-        report.append(f"Trading Days:     {self.metrics.get('trading_days', 0)}")
+        report.append(f"Max Drawdown:     ${metrics.get('max_drawdown', 0):,.2f} ({metrics.get('max_drawdown_pct', 0):.2f}%)")
+        report.append(f"Max Daily DD:     {metrics.get('max_daily_dd_pct', 0):.2f}%")
+        report.append(f"Sharpe Ratio:     {metrics.get('sharpe_ratio', 0):.2f}")
+        report.append(f"Sortino Ratio:    {metrics.get('sortino_ratio', 0):.2f}")
+        report.append(f"Calmar Ratio:     {metrics.get('calmar_ratio', 0):.2f}")
+        report.append(f"Ulcer Index:      {metrics.get('ulcer_index', 0):.2f}")
+        report.append(f"Recovery Factor:  {metrics.get('recovery_factor', 0):.2f}")
+        report.append(f"Trading Days:     {metrics.get('trading_days', 0)}")
         report.append("")
 
         report.append("-" * 70)
@@ -400,6 +595,24 @@ class BacktestAnalyzer:
                 report.append("         ✗ CHALLENGE WOULD NOT PASS")
             report.append("=" * 70)
 
+            lifecycle = compliance.get('lifecycle')
+            if lifecycle:
+                report.append("")
+                report.append("-" * 70)
+                report.append(f"LIFECYCLE - {propfirm}")
+                report.append("-" * 70)
+                status = "BREACHED" if lifecycle['breached'] else "ACTIVE"
+                report.append(f"Stage Reached:    {STAGE_NAMES[lifecycle['stage']]} ({status})")
+                if lifecycle['passed_p2']:
+                    report.append(f"Funded After:     {lifecycle['days_to_funded']} trading days "
+                                  f"(trade #{lifecycle['funded_trade'] + 1})")
+                    report.append(f"Payouts:          {lifecycle['payouts']} "
+                                  f"(${lifecycle['payout_total']:,.2f})")
+                    report.append(f"Final Capital:    ${lifecycle['final_capital']:,.0f} "
+                                  f"(split {lifecycle['final_split']:.0f}%, "
+                                  f"max DD {lifecycle['final_total_dd']:.1f}%)")
+                    report.append(f"Open Cycle P&L:   {lifecycle['open_pnl_pct']:.2f}%")
+
         return "\n".join(report)
 
     def plot_equity_curve(self, save_path=None):
@@ -498,7 +711,10 @@ class BacktestAnalyzer:
 #==============================================================================
 
 def generate_sample_trades(num_trades=500, win_rate=0.55, avg_rr=1.5):
-    """Génère des trades simulés pour tester l'analyseur"""
+    """
+    Génère des trades simulés pour tester l'analyseur
+    Pour les gros volumes (format colonnaire): trade_generator.generate_trades
+    """
     import random
     from datetime import datetime, timedelta
 
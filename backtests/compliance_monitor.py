@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+PropFirm Compliance Monitor
+Surveillance live des comptes: suit les exports deals/équité écrits par les EAs
+et lève une alerte avant la limite de DD journalier ou total
+
+Arborescence surveillée (un dossier par compte):
+    <root>/<account_id>/account.json   {"profile": "FTMO", "initial_balance": 100000}
+    <root>/<account_id>/deals.csv      time,ticket,symbol,type,volume,profit
+    <root>/<account_id>/equity.csv     time,balance,equity
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from propfirm_validator import PROPFIRM_PROFILES
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+POLL_INTERVAL = 1.0      # Secondes entre deux scans (latence max d'alerte ~ 2x)
+LEVEL_OK = 'OK'
+LEVEL_WARNING = 'WARNING'    # Buffer de sécurité consommé
+LEVEL_BREACH = 'BREACH'      # Limite de la prop firm atteinte
+LEVELS = (LEVEL_OK, LEVEL_WARNING, LEVEL_BREACH)
+
+
+def parse_time(value):
+    """Parse une date MT5 ('2024.01.02 10:15:00') ou ISO"""
+    value = value.strip()
+    if value[4:5] == '.':
+        value = value.replace('.', '-', 2)
+    return datetime.fromisoformat(value)
+
+#==============================================================================
+# ETAT INCREMENTAL D'UN COMPTE
+#==============================================================================
+
+class AccountMonitor:
+    def __init__(self, account_id, profile_name='FTMO', initial_balance=100000):
+        if profile_name not in PROPFIRM_PROFILES:
+            raise ValueError(f"Profil inconnu: {profile_name}")
+        self.account_id = account_id
+        self.profile_name = profile_name
+        self.profile = PROPFIRM_PROFILES[profile_name]
+        self.initial_balance = initial_balance
+
+        self.balance = initial_balance
+        self.equity = initial_balance
+        self.day = None
+        self.day_start_balance = initial_balance
+        self.trading_days = set()
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.last_update = None
+        self.version = 0    # Incrémenté à chaque mise à jour (consommateurs incrémentaux)
+
+        self.daily_dd_pct = 0.0
+        self.total_dd_pct = 0.0
+        self.max_daily_dd_pct = 0.0
+        self.max_total_dd_pct = 0.0
+        self.levels = {'daily_dd': LEVEL_OK, 'total_dd': LEVEL_OK}
+        self.target_reached = False
+
+    def _roll_day(self, when):
+        """
+        Reset du DD journalier à 00:00 serveur (solde de début de journée)
+        Ne revient jamais en arrière: une ligne d'un jour antérieur reste sur le jour courant
+        """
+        day = when.date()
+        if self.day is None or day > self.day:
+            self.day = day
+            self.day_start_balance = self.balance
+            if self.levels['daily_dd'] != LEVEL_BREACH:    # Un breach reste définitif
+                self.levels['daily_dd'] = LEVEL_OK
+
+    def on_deal(self, when, profit):
+        """Deal clôturé: met à jour le solde"""
+        self._roll_day(when)
+        self.balance += profit
+        self.equity = self.balance
+        self.total_trades += 1
+        if profit > 0:
+            self.winning_trades += 1
+            self.gross_profit += profit
+        else:
+            self.gross_loss -= profit
+        self.trading_days.add(when.date())
+        return self._evaluate(when)
+
+    def on_equity(self, when, balance, equity):
+        """Snapshot d'équité (P&L flottant inclus); ignoré s'il est antérieur au dernier état"""
+        if self.last_update is not None and when < self.last_update:
+            return []
+        self._roll_day(when)
+        self.balance = balance
+        self.equity = equity
+        return self._evaluate(when)
+
+    def _level(self, value, limit, buffer):
+        if value >= limit:
+            return LEVEL_BREACH
+        if value >= limit - buffer:
+            return LEVEL_WARNING
+        return LEVEL_OK
+
+    def _evaluate(self, when):
+        """Recalcule DD journalier et total, retourne les alertes nouvelles"""
+        # Un deal tardif ne fait pas reculer l'horodatage du dernier état
+        self.last_update = when if self.last_update is None else max(self.last_update, when)
+        self.version += 1
+        # Règles statiques: pourcentages exprimés en capital initial
+        self.daily_dd_pct = max(0.0, (self.day_start_balance - self.equity) / self.initial_balance * 100)
+        self.total_dd_pct = max(0.0, (self.initial_balance - self.equity) / self.initial_balance * 100)
+        self.max_daily_dd_pct = max(self.max_daily_dd_pct, self.daily_dd_pct)
+        self.max_total_dd_pct = max(self.max_total_dd_pct, self.total_dd_pct)
+
+        alerts = []
+        checks = (
+            ('daily_dd', self.daily_dd_pct, self.profile['max_daily_dd'], self.profile['buffer_daily']),
+            ('total_dd', self.total_dd_pct, self.profile['max_total_dd'], self.profile['buffer_total'])
+        )
+        for rule, value, limit, buffer in checks:
+            level = self._level(value, limit, buffer)
+            # Alerte uniquement sur aggravation (pas de spam à chaque tick)
+            if LEVELS.index(level) > LEVELS.index(self.levels[rule]):
+                self.levels[rule] = level
+                alerts.append({
+                    'account': self.account_id,
+                    'profile': self.profile_name,
+                    'rule': rule,
+                    'level': level,
+                    'value': value,
+                    'limit': limit,
+                    'safe_limit': limit - buffer,
+                    'time': when.isoformat()
+                })
+
+        if not self.target_reached and self.net_profit_pct >= self.profile['profit_target']:
+            self.target_reached = True
+            alerts.append({
+                'account': self.account_id,
+                'profile': self.profile_name,
+                'rule': 'profit_target',
+                'level': 'TARGET',
+                'value': self.net_profit_pct,
+                'limit': self.profile['profit_target'],
+                'safe_limit': self.profile['profit_target'],
+                'time': when.isoformat()
+            })
+        return alerts
+
+    @property
+    def net_profit_pct(self):
+        return (self.balance - self.initial_balance) / self.initial_balance * 100
+
+    @property
+    def profit_factor(self):
+        return self.gross_profit / self.gross_loss if self.gross_loss > 0 else float('inf')
+
+    @property
+    def win_rate(self):
+        return self.winning_trades / self.total_trades * 100 if self.total_trades else 0.0
+
+    def snapshot(self):
+        """Etat de conformité courant (sérialisable JSON)"""
+        return {
+            'account': self.account_id,
+            'profile': self.profile_name,
+            'balance': self.balance,
+            'equity': self.equity,
+            'net_profit_pct': self.net_profit_pct,
+            'daily_dd_pct': self.daily_dd_pct,
+            'total_dd_pct': self.total_dd_pct,
+            'max_daily_dd_pct': self.max_daily_dd_pct,
+            'max_total_dd_pct': self.max_total_dd_pct,
+            'trading_days': len(self.trading_days),
+            'total_trades': self.total_trades,
+            'profit_factor': self.profit_factor,
+            'win_rate': self.win_rate,
+            'levels': dict(self.levels),
+            'target_reached': self.target_reached,
+            'last_update': self.last_update.isoformat() if self.last_update else None
+        }
+
+#==============================================================================
+# LECTURE INCREMENTALE DES FICHIERS
+#==============================================================================
+
+class FileTail:
+    """Lit uniquement les lignes ajoutées depuis le dernier appel"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.remainder = b''
+
+    def read_lines(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            # Fichier tronqué / recréé par l'EA: on repart du début
+            self.offset = 0
+            self.remainder = b''
+        if size == self.offset:
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        self.offset += len(data)
+
+        data = self.remainder + data
+        lines = data.split(b'\n')
+        self.remainder = lines.pop()    # Ligne partielle en cours d'écriture
+        return [line.decode('utf-8', 'replace').strip() for line in lines if line.strip()]
+
+#==============================================================================
+# MONITEUR MULTI-COMPTES
+#==============================================================================
+
+class ComplianceMonitor:
+    def __init__(self, root, poll_interval=POLL_INTERVAL, on_alert=None):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.on_alert = on_alert or print_alert
+        self.accounts = {}
+        self.tails = {}
+        self.alerts = asyncio.Queue()
+        self.last_scan_duration = 0.0
+        self._running = False
+
+    def discover(self):
+        """Ajoute les nouveaux dossiers de comptes (account.json)"""
+        try:
+            entries = os.listdir(self.root)
+        except OSError:
+            return
+        for account_id in entries:
+            if account_id in self.accounts:
+                continue
+            config_path = os.path.join(self.root, account_id, 'account.json')
+            if not os.path.exists(config_path):
+                continue
+            try:
+                with open(config_path) as f:
+                    config = json.load(f)
+                self.add_account(account_id, config.get('profile', 'FTMO'),
+                                 config.get('initial_balance', 100000))
+            except (ValueError, OSError) as e:
+                print(f"Compte ignoré {account_id}: {e}")
+
+    def add_account(self, account_id, profile_name='FTMO', initial_balance=100000):
+        folder = os.path.join(self.root, account_id)
+        self.accounts[account_id] = AccountMonitor(account_id, profile_name, initial_balance)
+        self.tails[account_id] = (FileTail(os.path.join(folder, 'deals.csv')),
+                                  FileTail(os.path.join(folder, 'equity.csv')))
+
+    def process_account(self, account_id):
+        """Applique les nouvelles lignes deals/équité d'un compte, fusionnées par horodatage"""
+        account = self.accounts[account_id]
+        deals_tail, equity_tail = self.tails[account_id]
+        events = []
+
+        for line in deals_tail.read_lines():
+            fields = line.split(',')
+            try:
+                events.append((parse_time(fields[0]), 0, (float(fields[5]),)))
+            except (ValueError, IndexError):
+                continue    # En-tête ou ligne invalide
+
+        for line in equity_tail.read_lines():
+            fields = line.split(',')
+            try:
+                events.append((parse_time(fields[0]), 1, (float(fields[1]), float(fields[2]))))
+            except (ValueError, IndexError):
+                continue
+
+        # Ordre chronologique; à horodatage égal le deal précède le snapshot qui l'inclut
+        events.sort(key=lambda e: (e[0], e[1]))
+        alerts = []
+        for when, kind, values in events:
+            if kind == 0:
+                alerts += account.on_deal(when, *values)
+            else:
+                alerts += account.on_equity(when, *values)
+        return alerts
+
+    async def scan_once(self):
+        """Un passage sur tous les comptes, en rendant la main régulièrement"""
+        started = time.monotonic()
+        self.discover()
+        for i, account_id in enumerate(list(self.accounts)):
+            for alert in self.process_account(account_id):
+                alert['detected_at'] = time.time()
+                await self.alerts.put(alert)
+            if i % 50 == 49:
+                await asyncio.sleep(0)
+        self.last_scan_duration = time.monotonic() - started
+
+    async def _scan_loop(self):
+        while self._running:
+            await self.scan_once()
+            if self.last_scan_duration > self.poll_interval:
+                print(f"⚠️  Scan lent: {self.last_scan_duration:.2f}s > {self.poll_interval}s")
+            await asyncio.sleep(max(0.0, self.poll_interval - self.last_scan_duration))
+
+    async def _alert_loop(self):
+        while True:
+            alert = await self.alerts.get()
+            result = self.on_alert(alert)
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def run(self, duration=None):
+        """Lance le scan et la diffusion des alertes (indéfiniment ou `duration` s)"""
+        self._running = True
+        tasks = [asyncio.create_task(self._scan_loop()), asyncio.create_task(self._alert_loop())]
+        try:
+            if duration is None:
+                await asyncio.gather(*tasks)
+            else:
+                await asyncio.sleep(duration)
+        finally:
+            self._running = False
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        self._running = False
+
+    def fleet_snapshot(self):
+        """Etat de tous les comptes"""
+        return {account_id: account.snapshot() for account_id, account in self.accounts.items()}
+
+
+def print_alert(alert):
+    """Handler d'alerte par défaut"""
+    icon = {'WARNING': '⚠️ ', 'BREACH': '🚨', 'TARGET': '✓'}.get(alert['level'], '')
+    print(f"{icon} [{alert['level']}] {alert['account']} ({alert['profile']}) "
+          f"{alert['rule']}: {alert['value']:.2f}% (safe: {alert['safe_limit']}%, limit: {alert['limit']}%)")
+
+#==============================================================================
+# MAIN
+#==============================================================================
+
+async def simulate_ea_writers(root, n_accounts, duration):
+    """Simule des EAs qui écrivent des deals/équités dans root (démo, tests de charge)"""
+    import random
+    profiles = ['FTMO', 'E8_ONE', 'FUNDING_PIPS_1STEP', 'THE5ERS_BOOTCAMP']
+    balances = {}
+    for i in range(n_accounts):
+        account_id = f"ACC{i:04d}"
+        folder = os.path.join(root, account_id)
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, 'account.json'), 'w') as f:
+            json.dump({'profile': profiles[i % len(profiles)], 'initial_balance': 100000}, f)
+        balances[account_id] = 100000.0
+
+    end = time.monotonic() + duration
+    ticket = 0
+    while time.monotonic() < end:
+        now = datetime.now().strftime('%Y.%m.%d %H:%M:%S')
+        for account_id in balances:
+            folder = os.path.join(root, account_id)
+            if random.random() < 0.3:
+                ticket += 1
+                profit = random.gauss(-150, 900)
+                balances[account_id] += profit
+                with open(os.path.join(folder, 'deals.csv'), 'a') as f:
+                    f.write(f"{now},{ticket},EURUSD,BUY,1.0,{profit:.2f}\n")
+            floating = random.gauss(0, 400)
+            with open(os.path.join(folder, 'equity.csv'), 'a') as f:
+                f.write(f"{now},{balances[account_id]:.2f},{balances[account_id] + floating:.2f}\n")
+        await asyncio.sleep(0.5)
+
+
+async def _demo(n_accounts=200, duration=10):
+    import tempfile
+    with tempfile.TemporaryDirectory() as root:
+        monitor = ComplianceMonitor(root, poll_interval=0.5)
+        await asyncio.gather(simulate_ea_writers(root, n_accounts, duration),
+                             monitor.run(duration=duration + 1))
+        snapshot = monitor.fleet_snapshot()
+        breached = [s for s in snapshot.values() if 'BREACH' in s['levels'].values()]
+        print(f"\nComptes surveillés: {len(snapshot)}  |  En breach: {len(breached)}  |  "
+              f"Dernier scan: {monitor.last_scan_duration * 1000:.1f} ms")
+
+
+def main():
+    if len(sys.argv) > 1:
+        root = sys.argv[1]
+        print(f"Surveillance de {root} (Ctrl+C pour arrêter)")
+        try:
+            asyncio.run(ComplianceMonitor(root).run())
+        except KeyboardInterrupt:
+            print("\n\nInterrompu.")
+    else:
+        print("\n[DEMO MODE - 200 comptes simulés]\n")
+        asyncio.run(_demo())
+
+
+if __name__ == "__main__":
+    main()
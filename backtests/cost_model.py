@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+PropFirm Cost Model
+Scénarios de coûts d'exécution (commission, swap, spread, slippage) appliqués
+en lot aux trades colonnaires: impact sur profit net, DD et conformité propfirm
+sans recharger ni reparser les rapports
+"""
+
+import numpy as np
+
+from metric_kernels import WEEKMASK, compliance_kernel, summarize_trades
+from propfirm_validator import PROPFIRM_PROFILES
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+# Valeur du pip ($ par lot standard) et swaps ($ par lot et par nuit)
+SYMBOL_SPECS = {
+    'EURUSD': {'pip_value': 10.0, 'swap_long': -7.0, 'swap_short': 2.5},
+    'GBPUSD': {'pip_value': 10.0, 'swap_long': -5.5, 'swap_short': 1.0},
+    'USDJPY': {'pip_value': 6.7, 'swap_long': 12.0, 'swap_short': -22.0},
+    'XAUUSD': {'pip_value': 10.0, 'swap_long': -40.0, 'swap_short': 18.0}
+}
+DEFAULT_SPEC = SYMBOL_SPECS['EURUSD']
+
+# Coûts additionnels au backtest (spread/slippage en pips, commission aller-retour $/lot)
+# Reprend les tests de stress de BACKTEST_GUIDE.md (10 points = 1 pip)
+SCENARIOS = {
+    'raw': {'commission_per_lot': 0.0, 'spread_pips': 0.0, 'slippage_pips': 0.0, 'swap_multiplier': 0.0},
+    'standard': {'commission_per_lot': 7.0, 'spread_pips': 0.0, 'slippage_pips': 0.1, 'swap_multiplier': 1.0},
+    'recent_2024': {'commission_per_lot': 7.0, 'spread_pips': 0.2, 'slippage_pips': 1.0, 'swap_multiplier': 1.0},
+    'volatility_2022': {'commission_per_lot': 7.0, 'spread_pips': 1.5, 'slippage_pips': 2.0, 'swap_multiplier': 1.5},
+    'covid_2020': {'commission_per_lot': 7.0, 'spread_pips': 3.0, 'slippage_pips': 3.0, 'swap_multiplier': 2.0}
+}
+
+TRIPLE_SWAP_WEEKDAY = 2     # Mercredi (lundi = 0): swap x3 pour couvrir le week-end
+
+#==============================================================================
+# NUITS DETENUES
+#==============================================================================
+
+def swap_nights(open_time, close_time, server_offset_hours=0):
+    """
+    Nuits de swap facturées entre ouverture et clôture (heure serveur)
+    Rollovers des jours ouvrés, +2 pour le rollover du mercredi (triple swap)
+    """
+    offset = np.timedelta64(int(server_offset_hours * 3600), 's')
+    open_day = (np.asarray(open_time, dtype='datetime64[s]') + offset).astype('datetime64[D]')
+    close_day = (np.asarray(close_time, dtype='datetime64[s]') + offset).astype('datetime64[D]')
+    close_day = np.maximum(close_day, open_day)
+    nights = np.busday_count(open_day, close_day, weekmask=WEEKMASK)
+    # Mercredis dans [open, close): 1970-01-01 est un jeudi -> jour de semaine = (d + 3) % 7
+    r = (TRIPLE_SWAP_WEEKDAY - 3) % 7
+    wednesdays = ((close_day.astype(np.int64) - r + 6) // 7
+                  - (open_day.astype(np.int64) - r + 6) // 7)
+    return nights + 2 * wednesdays
+
+#==============================================================================
+# MOTEUR
+#==============================================================================
+
+def _symbol_specs(columns, n):
+    """Vecteurs pip_value / swap_long / swap_short par trade"""
+    if 'symbol_code' in columns:
+        names = [str(s) for s in columns['symbols']]
+        codes = columns['symbol_code']
+    elif 'symbol' in columns:
+        names, codes = np.unique(np.asarray(columns['symbol'], dtype=str), return_inverse=True)
+        names = list(names)
+    else:
+        names, codes = ['EURUSD'], np.zeros(n, dtype=np.int64)
+    table = {key: np.array([SYMBOL_SPECS.get(s, DEFAULT_SPEC)[key] for s in names])
+             for key in ('pip_value', 'swap_long', 'swap_short')}
+    return {key: values[codes] for key, values in table.items()}
+
+
+def _sides(columns, n):
+    """+1 BUY / -1 SELL ('side' numérique ou 'type' texte; défaut BUY)"""
+    if 'side' in columns:
+        return np.asarray(columns['side'])
+    if 'type' in columns:
+        return np.where(np.char.upper(np.asarray(columns['type'], dtype=str)) == 'SELL', -1, 1)
+    return np.ones(n, dtype=np.int8)
+
+
+def _scenario_vectors(scenarios):
+    """Dict de scénarios -> noms + vecteurs de paramètres (S,)"""
+    names = list(scenarios.keys())
+    keys = ('commission_per_lot', 'spread_pips', 'slippage_pips', 'swap_multiplier')
+    return names, {k: np.array([scenarios[s].get(k, 0.0) for s in names], dtype=np.float64) for k in keys}
+
+
+def trade_costs(columns, scenarios=None, default_volume=1.0, server_offset_hours=0):
+    """
+    Coût de chaque trade sous chaque scénario -> (scénarios x trades), en $
+    columns: 'time' (clôture), 'profit', optionnels 'volume' (lots), 'open_time',
+    'side'/'type', 'symbol_code'+'symbols'/'symbol'
+    Sans 'open_time', aucun swap (trades intraday)
+    """
+    scenarios = scenarios or SCENARIOS
+    n = len(columns['profit'])
+    names, params = _scenario_vectors(scenarios)
+
+    volume = np.asarray(columns.get('volume', np.full(n, default_volume)), dtype=np.float64)
+    specs = _symbol_specs(columns, n)
+    side = _sides(columns, n)
+
+    # Commission + spread + slippage: proportionnels au volume
+    per_lot = (params['commission_per_lot'][:, None]
+               + (params['spread_pips'] + params['slippage_pips'])[:, None] * specs['pip_value'][None])
+    costs = per_lot * volume[None]
+
+    # Swap (signé: un swap positif est un crédit)
+    if 'open_time' in columns:
+        nights = swap_nights(columns['open_time'], columns['time'], server_offset_hours)
+        swap_rate = np.where(side > 0, specs['swap_long'], specs['swap_short'])
+        costs -= params['swap_multiplier'][:, None] * (swap_rate * nights * volume)[None]
+    return names, costs
+
+
+def evaluate_scenarios(columns, scenarios=None, initial_balance=100000, profiles=None,
+                       default_volume=1.0, server_offset_hours=0):
+    """
+    Evalue tous les scénarios en une passe: profits nets (S x trades) puis
+    métriques et conformité en lot
+    """
+    profiles = profiles or list(PROPFIRM_PROFILES.keys())
+    names, costs = trade_costs(columns, scenarios, default_volume, server_offset_hours)
+    net = np.asarray(columns['profit'], dtype=np.float64)[None] - costs
+
+    metrics = summarize_trades(columns['time'], net, initial_balance,
+                               server_offset_hours=server_offset_hours)
+    compliance = {name: compliance_kernel(metrics, PROPFIRM_PROFILES[name]) for name in profiles}
+    return {
+        'scenarios': names,
+        'total_costs': costs.sum(axis=1),
+        'cost_per_trade': costs.mean(axis=1),
+        'metrics': metrics,
+        'compliance': compliance
+    }
+
+
+def print_cost_report(results):
+    """Tableau profit net / DD / conformité par scénario"""
+    metrics = results['metrics']
+    profiles = list(results['compliance'].keys())
+    print("\n" + "=" * 90)
+    print("                         EXECUTION COST SCENARIOS")
+    print("=" * 90)
+    print(f"\n{'Scénario':<17} {'Coûts':>11} {'$/trade':>8} {'Net':>11} {'Net %':>7} "
+          f"{'PF':>6} {'Max DD%':>8} {'Daily%':>7}  Pass")
+    print("-" * 90)
+    for i, name in enumerate(results['scenarios']):
+        passes = sum(bool(results['compliance'][p]['would_pass'][i]) for p in profiles)
+        print(f"{name:<17} ${results['total_costs'][i]:>10,.0f} {results['cost_per_trade'][i]:>8.2f} "
+              f"${metrics['net_profit'][i]:>10,.0f} {metrics['net_profit_pct'][i]:>6.2f}% "
+              f"{metrics['profit_factor'][i]:>6.2f} {metrics['max_drawdown_pct'][i]:>7.2f}% "
+              f"{metrics['max_daily_dd_pct'][i]:>6.2f}%  {passes}/{len(profiles)}")
+
+    print("\n" + "-" * 90)
+    print("CONFORMITE PAR PROFIL")
+    print("-" * 90)
+    header = "".join(f"{s[:12]:>13}" for s in results['scenarios'])
+    print(f"{'PropFirm':<25}{header}")
+    for name in profiles:
+        row = "".join(f"{'✓' if ok else '✗':>13}" for ok in results['compliance'][name]['would_pass'])
+        print(f"{PROPFIRM_PROFILES[name]['name']:<25}{row}")
+    print("=" * 90 + "\n")
+
+
+def main():
+    """Démonstration: scalper multi-symboles, une partie des trades détenus la nuit"""
+    from trade_generator import SYMBOLS, generate_trades
+
+    columns = generate_trades(1500, win_rate=0.58, avg_rr=1.2, symbols=SYMBOLS, trades_per_day=8)
+    rng = np.random.default_rng(7)
+    # Durée de détention: minutes pour la plupart, quelques trades sur plusieurs nuits
+    held = rng.exponential(40 * 60, size=1500) + (rng.random(1500) < 0.05) * rng.exponential(2 * 86400, size=1500)
+    columns['open_time'] = columns['time'] - held.astype('timedelta64[s]')
+    columns['volume'] = np.full(1500, 1.0)
+
+    print_cost_report(evaluate_scenarios(columns))
+
+
+if __name__ == "__main__":
+    main()
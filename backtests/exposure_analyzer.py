@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+PropFirm Exposure Analyzer
+Exposition concurrente par balayage (sweep-line) des ouvertures/clôtures:
+positions simultanées, risque ouvert agrégé (SL) et pire perte journalière
+potentielle, là où la vue trades clôturés de BacktestAnalyzer ne voit rien
+
+Un tri des 2n événements puis des sommes cumulées: O(n log n)
+"""
+
+import numpy as np
+
+from cost_model import DEFAULT_SPEC, SYMBOL_SPECS
+from metric_kernels import server_days
+from propfirm_validator import PROPFIRM_PROFILES
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+MAX_OPEN_POSITIONS = 2      # Valeur des .set (MaxOpenPositions)
+
+OPEN = 1
+CLOSE = 0
+
+#==============================================================================
+# RISQUE PAR TRADE
+#==============================================================================
+
+def trade_risk(columns, default_volume=1.0):
+    """
+    Risque ($) de chaque trade si le SL est touché
+    'risk' ($) si présent, sinon 'sl_pips' x volume x valeur du pip du symbole
+    """
+    if 'risk' in columns:
+        return np.asarray(columns['risk'], dtype=np.float64)
+    n = len(columns['profit'])
+    volume = np.asarray(columns.get('volume', np.full(n, default_volume)), dtype=np.float64)
+    if 'symbol_code' in columns:
+        pip_value = np.array([SYMBOL_SPECS.get(str(s), DEFAULT_SPEC)['pip_value']
+                              for s in columns['symbols']])[columns['symbol_code']]
+    else:
+        pip_value = np.full(n, DEFAULT_SPEC['pip_value'])
+    return np.asarray(columns['sl_pips'], dtype=np.float64) * volume * pip_value
+
+#==============================================================================
+# SWEEP-LINE
+#==============================================================================
+
+def sweep_events(open_time, close_time, risk, profit):
+    """
+    Evénements triés (temps, type) et état après chaque événement:
+    positions ouvertes, risque ouvert, P&L réalisé cumulé
+    """
+    open_time = np.asarray(open_time, dtype='datetime64[s]')
+    close_time = np.maximum(np.asarray(close_time, dtype='datetime64[s]'), open_time)
+    n = len(open_time)
+
+    times = np.concatenate([open_time, close_time])
+    kind = np.concatenate([np.full(n, OPEN, dtype=np.int8), np.full(n, CLOSE, dtype=np.int8)])
+    # A horodatage égal: ouvertures des trades de durée nulle, clôtures, puis autres
+    # ouvertures (une position fermée à t ne chevauche pas celle ouverte à t)
+    instant = np.tile(open_time == close_time, 2)
+    rank = np.where(kind == CLOSE, 1, np.where(instant, 0, 2))
+    order = np.lexsort((rank, times))
+
+    sign = np.where(kind == OPEN, 1, -1)[order]
+    trade = np.concatenate([np.arange(n), np.arange(n)])[order]
+    realized = np.where(kind[order] == CLOSE, np.asarray(profit, dtype=np.float64)[trade], 0.0)
+
+    return {
+        'time': times[order],
+        'kind': kind[order],
+        'trade': trade,
+        'positions': np.cumsum(sign),
+        'open_risk': np.cumsum(sign * np.asarray(risk, dtype=np.float64)[trade]),
+        'realized': np.cumsum(realized)
+    }
+
+
+def analyze_exposure(columns, initial_balance=100000, max_open_positions=MAX_OPEN_POSITIONS,
+                     default_volume=1.0, server_offset_hours=0):
+    """
+    Exposition d'un set de trades (colonnes 'open_time', 'time' = clôture, 'profit'
+    et 'risk' ou 'sl_pips' [+ 'volume', 'symbol_code'])
+    """
+    risk = trade_risk(columns, default_volume)
+    events = sweep_events(columns['open_time'], columns['time'], risk, columns['profit'])
+    times = events['time']
+    positions = events['positions']
+    open_risk = events['open_risk']
+
+    if times.size == 0:
+        return {'events': events, 'peak_positions': 0, 'peak_open_risk': 0.0,
+                'peak_open_risk_pct': 0.0, 'worst_case_daily_loss_pct': 0.0, 'daily': {}}
+
+    # Pics et horodatages
+    peak_pos = int(positions.argmax())
+    peak_risk = int(open_risk.argmax())
+
+    # Temps passé à k positions (pondéré par la durée entre événements)
+    dt = np.diff(times).astype(np.int64).astype(np.float64)
+    time_at = np.bincount(positions[:-1], weights=dt, minlength=int(positions.max()) + 1)
+    over_limit = positions > max_open_positions
+    entries_over = (over_limit & (events['kind'] == OPEN)).sum()
+
+    # Pire cas journalier: réalisé du jour + tous les SL ouverts touchés
+    days = server_days(times, server_offset_hours)
+    calendar, first = np.unique(days, return_index=True)
+    day_index = np.repeat(np.arange(len(calendar)), np.diff(np.append(first, len(days))))
+    realized_before = np.concatenate([[0.0], events['realized']])[first]
+    realized_day = events['realized'] - realized_before[day_index]
+    worst_case = realized_day - open_risk
+    worst_day = np.full(len(calendar), np.inf)
+    np.minimum.at(worst_day, day_index, worst_case)
+    worst_event = np.lexsort((worst_case, day_index))[first]  # Premier pire événement par jour
+    peak_day_risk = np.zeros(len(calendar))
+    np.maximum.at(peak_day_risk, day_index, open_risk)
+
+    worst = int(worst_case.argmin())
+    worst_case_pct = float(-min(worst_case[worst], 0) / initial_balance * 100)
+
+    return {
+        'events': events,
+        'peak_positions': int(positions[peak_pos]),
+        'peak_positions_time': times[peak_pos],
+        'peak_open_risk': float(open_risk[peak_risk]),
+        'peak_open_risk_pct': float(open_risk[peak_risk] / initial_balance * 100),
+        'peak_open_risk_time': times[peak_risk],
+        'time_at_positions_pct': time_at / max(dt.sum(), 1) * 100,
+        'entries_over_limit': int(entries_over),
+        'max_open_positions': max_open_positions,
+        'worst_case_daily_loss': float(min(worst_case[worst], 0)),
+        'worst_case_daily_loss_pct': worst_case_pct,
+        'worst_case_time': times[worst],
+        'daily': {
+            'calendar': calendar,
+            'peak_open_risk': peak_day_risk,
+            'worst_case_loss': worst_day,
+            'worst_case_time': times[worst_event]
+        }
+    }
+
+
+def exposure_compliance(exposure, profiles=None):
+    """Pire cas journalier (réalisé + SL ouverts) vs limites de DD journalier des profils"""
+    profiles = profiles or list(PROPFIRM_PROFILES.keys())
+    result = {}
+    for name in profiles:
+        rules = PROPFIRM_PROFILES[name]
+        value = exposure['worst_case_daily_loss_pct']
+        result[name] = {
+            'value': value,
+            'limit': rules['max_daily_dd'],
+            'buffer': rules['buffer_daily'],
+            'breach': value >= rules['max_daily_dd'],
+            'warning': value >= rules['max_daily_dd'] - rules['buffer_daily']
+        }
+    return result
+
+
+def print_exposure_report(exposure, compliance=None):
+    """Affiche pics d'exposition et marge vs limites journalières"""
+    print("\n" + "=" * 70)
+    print("                 CONCURRENT EXPOSURE ANALYSIS")
+    print("=" * 70)
+    print(f"Positions simultanées max: {exposure['peak_positions']}  ({exposure['peak_positions_time']})")
+    print(f"Risque ouvert max:         ${exposure['peak_open_risk']:,.2f} "
+          f"({exposure['peak_open_risk_pct']:.2f}%)  ({exposure['peak_open_risk_time']})")
+    print(f"Entrées au-delà de MaxOpenPositions={exposure['max_open_positions']}: "
+          f"{exposure['entries_over_limit']}")
+    print(f"Pire cas journalier:       ${exposure['worst_case_daily_loss']:,.2f} "
+          f"({exposure['worst_case_daily_loss_pct']:.2f}%)  ({exposure['worst_case_time']})")
+
+    print("\nTemps passé par nombre de positions:")
+    for k, pct in enumerate(exposure['time_at_positions_pct']):
+        if pct > 0:
+            print(f"  {k} position(s): {pct:6.2f}%")
+
+    if compliance:
+        print("\n" + "-" * 70)
+        print(f"{'PropFirm':<25} {'Pire cas %':>11} {'Seuil':>8} {'Limite':>8}  Statut")
+        print("-" * 70)
+        for name, check in compliance.items():
+            status = "✗ BREACH" if check['breach'] else ("⚠️ WARNING" if check['warning'] else "✓ OK")
+            print(f"{PROPFIRM_PROFILES[name]['name']:<25} {check['value']:>10.2f}% "
+                  f"{check['limit'] - check['buffer']:>7.1f}% {check['limit']:>7.1f}%  {status}")
+    print("=" * 70 + "\n")
+
+
+def main():
+    """Démonstration: 1M trades synthétiques avec durées de détention et SL"""
+    import time
+
+    from trade_generator import SYMBOLS, generate_trades
+
+    n = 1_000_000
+    columns = generate_trades(n, symbols=SYMBOLS, trades_per_day=12, seed=3)
+    rng = np.random.default_rng(3)
+    columns['open_time'] = columns['time'] - rng.exponential(45 * 60, size=n).astype('timedelta64[s]')
+    columns['sl_pips'] = rng.choice([5.0, 6.0, 7.0], size=n)
+    columns['volume'] = np.full(n, 1.5)
+
+    started = time.perf_counter()
+    exposure = analyze_exposure(columns)
+    print(f"\n{n:,} trades analysés en {time.perf_counter() - started:.2f}s")
+    print_exposure_report(exposure, exposure_compliance(exposure))
+
+
+if __name__ == "__main__":
+    main()
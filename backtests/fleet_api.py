@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+PropFirm Fleet API
+Serveur HTTP asyncio léger exposant en JSON l'état de la flotte: métriques et
+conformité par compte, score du validateur et agrégats flotte
+
+Endpoints:
+    GET /health
+    GET /fleet                 Agrégats flotte
+    GET /accounts              Etat de tous les comptes
+    GET /accounts/<id>         Etat d'un compte (métriques + validation)
+"""
+
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import Counter
+
+from compliance_monitor import LEVELS, ComplianceMonitor, simulate_ea_writers
+from propfirm_validator import PropFirmValidator
+
+# Sérialisation rapide (optionnelle)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+HOST = '127.0.0.1'
+PORT = 8080
+REFRESH_INTERVAL = 1.0   # Secondes entre deux synchronisations avec le moniteur
+
+
+def _clean(value):
+    """Remplace inf/nan (non JSON) par None, récursivement"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(v) for v in value]
+    return value
+
+
+def _dumps(payload):
+    payload = _clean(payload)
+    if HAS_ORJSON:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+
+def _response(status, body, keep_alive=True):
+    """Réponse HTTP/1.1 complète, construite une seule fois par changement d'état"""
+    reason = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed', 400: 'Bad Request'}[status]
+    headers = (
+        f"HTTP/1.1 {status} {reason}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return headers.encode() + body
+
+
+NOT_FOUND = _response(404, b'{"error":"not found"}')
+NOT_ALLOWED = _response(405, b'{"error":"method not allowed"}')
+BAD_REQUEST = _response(400, b'{"error":"bad request"}', keep_alive=False)
+
+#==============================================================================
+# ETAT PRECALCULE
+#==============================================================================
+
+class FleetState:
+    """
+    Etat en mémoire de la flotte, mis à jour incrémentalement
+    Seuls les comptes dont la version a changé sont revalidés et resérialisés;
+    les agrégats flotte sont ajustés par différence
+    """
+
+    def __init__(self):
+        self.versions = {}
+        self.accounts = {}
+        self.bodies = {}
+        self.responses = {}
+        self.contrib = {}
+        self.validators = {}
+        self.totals = Counter()
+        self.levels = Counter()
+        self.profiles = Counter()
+        self.started = time.time()
+        self.updated_at = None
+        self.fleet_response = _response(200, _dumps(self.fleet()))
+        self.accounts_response = _response(200, b'{}')
+        self.health_response = _response(200, b'{"status":"ok"}')
+
+    def _validate(self, snapshot):
+        profile = snapshot['profile']
+        if profile not in self.validators:
+            self.validators[profile] = PropFirmValidator(profile)
+        results = self.validators[profile].validate({
+            'net_profit_pct': snapshot['net_profit_pct'],
+            'max_dd_pct': snapshot['max_total_dd_pct'],
+            'max_daily_dd_pct': snapshot['max_daily_dd_pct'],
+            'trading_days': snapshot['trading_days'],
+            'profit_factor': snapshot['profit_factor'],
+            'win_rate': snapshot['win_rate'],
+            'total_trades': snapshot['total_trades']
+        })
+        return {
+            'score': results['score'],
+            'would_pass': results['would_pass'],
+            'confidence': results['confidence'],
+            'recommendation': results['recommendation'],
+            'warnings': results['warnings']
+        }
+
+    def _apply_contrib(self, contrib, sign):
+        self.totals['balance'] += sign * contrib['balance']
+        self.totals['equity'] += sign * contrib['equity']
+        self.totals['score'] += sign * contrib['score']
+        self.totals['target_reached'] += sign * contrib['target_reached']
+        self.totals['would_pass'] += sign * contrib['would_pass']
+        self.levels[contrib['level']] += sign
+        self.profiles[contrib['profile']] += sign
+
+    def update_account(self, snapshot, version):
+        """Intègre le snapshot d'un compte (no-op si la version n'a pas changé)"""
+        account_id = snapshot['account']
+        if self.versions.get(account_id) == version:
+            return False
+
+        snapshot['validation'] = self._validate(snapshot)
+        worst = max(snapshot['levels'].values(), key=LEVELS.index)
+        contrib = {
+            'balance': snapshot['balance'],
+            'equity': snapshot['equity'],
+            'score': snapshot['validation']['score'],
+            'target_reached': int(snapshot['target_reached']),
+            'would_pass': int(snapshot['validation']['would_pass']),
+            'level': worst,
+            'profile': snapshot['profile']
+        }
+
+        if account_id in self.contrib:
+            self._apply_contrib(self.contrib[account_id], -1)
+        self._apply_contrib(contrib, 1)
+
+        self.contrib[account_id] = contrib
+        self.versions[account_id] = version
+        self.accounts[account_id] = snapshot
+        self.bodies[account_id] = _dumps(snapshot)
+        self.responses[account_id] = _response(200, self.bodies[account_id])
+        return True
+
+    def sync(self, monitor):
+        """Synchronise avec le moniteur de conformité (comptes modifiés uniquement)"""
+        changed = 0
+        for account_id, account in monitor.accounts.items():
+            if self.versions.get(account_id) != account.version:
+                changed += self.update_account(account.snapshot(), account.version)
+        if changed:
+            self.updated_at = time.time()
+            self.fleet_response = _response(200, _dumps(self.fleet()))
+            # Liste complète assemblée à partir des corps déjà sérialisés
+            body = b','.join(_dumps(account_id) + b':' + body for account_id, body in self.bodies.items())
+            self.accounts_response = _response(200, b'{' + body + b'}')
+        return changed
+
+    def fleet(self):
+        """Agrégats flotte"""
+        n = len(self.accounts)
+        return {
+            'accounts': n,
+            'total_balance': self.totals['balance'],
+            'total_equity': self.totals['equity'],
+            'avg_score': self.totals['score'] / n if n else 0,
+            'target_reached': self.totals['target_reached'],
+            'would_pass': self.totals['would_pass'],
+            'levels': {level: self.levels[level] for level in LEVELS},
+            'profiles': {k: v for k, v in self.profiles.items() if v},
+            'updated_at': self.updated_at,
+            'uptime': time.time() - self.started
+        }
+
+    def route(self, path):
+        """Réponse précalculée pour un chemin"""
+        if path == '/fleet':
+            return self.fleet_response
+        if path == '/accounts':
+            return self.accounts_response
+        if path.startswith('/accounts/'):
+            return self.responses.get(path[len('/accounts/'):], NOT_FOUND)
+        if path == '/health':
+            return self.health_response
+        return NOT_FOUND
+
+#==============================================================================
+# SERVEUR HTTP
+#==============================================================================
+
+class FleetServer:
+    def __init__(self, monitor, host=HOST, port=PORT, refresh_interval=REFRESH_INTERVAL):
+        self.monitor = monitor
+        self.state = FleetState()
+        self.host = host
+        self.port = port
+        self.refresh_interval = refresh_interval
+        self.requests_served = 0
+
+    async def handle(self, reader, writer):
+        """Connexion keep-alive: une réponse précalculée par requête GET"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                request_line, _, headers = head.partition(b'\r\n')
+                parts = request_line.split(b' ')
+                if len(parts) != 3:
+                    writer.write(BAD_REQUEST)
+                    break
+
+                method, target, _ = parts
+                if method != b'GET':
+                    response = NOT_ALLOWED
+                else:
+                    path = target.split(b'?', 1)[0].decode('latin-1').rstrip('/') or '/'
+                    response = self.state.route(path)
+                writer.write(response)
+                self.requests_served += 1
+
+                if b'connection: close' in headers.lower():
+                    break
+                # Contrôle de flux seulement si le buffer d'écriture se remplit
+                if writer.transport.get_write_buffer_size() > 65536:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _refresh_loop(self):
+        while True:
+            self.state.sync(self.monitor)
+            await asyncio.sleep(self.refresh_interval)
+
+    async def run(self, duration=None):
+        """Lance moniteur + serveur HTTP"""
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        print(f"Fleet API sur http://{self.host}:{self.port}  (orjson: {HAS_ORJSON})")
+        tasks = [asyncio.create_task(self.monitor.run()), asyncio.create_task(self._refresh_loop())]
+        try:
+            async with server:
+                if duration is None:
+                    await server.serve_forever()
+                else:
+                    await asyncio.sleep(duration)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+#==============================================================================
+# MAIN
+#==============================================================================
+
+async def _demo(n_accounts=300, duration=30):
+    import tempfile
+    with tempfile.TemporaryDirectory() as root:
+        monitor = ComplianceMonitor(root, poll_interval=0.5, on_alert=lambda alert: None)
+        server = FleetServer(monitor)
+        print(f"[DEMO MODE - {n_accounts} comptes simulés pendant {duration}s]")
+        print("Essayer: curl http://127.0.0.1:8080/fleet  |  python fleet_loadtest.py")
+        await asyncio.gather(simulate_ea_writers(root, n_accounts, duration),
+                             server.run(duration=duration))
+        print(f"Requêtes servies: {server.requests_served}")
+
+
+def main():
+    try:
+        if len(sys.argv) > 1:
+            port = int(sys.argv[2]) if len(sys.argv) > 2 else PORT
+            asyncio.run(FleetServer(ComplianceMonitor(sys.argv[1]), port=port).run())
+        else:
+            asyncio.run(_demo())
+    except KeyboardInterrupt:
+        print("\n\nInterrompu.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+PropFirm Fleet API - Load Test
+Client asyncio keep-alive: mesure débit (req/s) et latences de fleet_api.py
+
+Usage:
+    python fleet_loadtest.py [port]                  # Serveur démo intégré (port 8080 par défaut)
+    python fleet_loadtest.py 127.0.0.1 8080 [secs]   # Serveur déjà lancé
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from compliance_monitor import simulate_ea_writers
+from fleet_api import PORT
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+CONNECTIONS = 32
+PIPELINE = 1          # Requêtes en vol par connexion
+DURATION = 10.0
+PATHS = ['/fleet', '/accounts/ACC0001', '/accounts/ACC0042', '/health']
+
+#==============================================================================
+# CLIENT
+#==============================================================================
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    length = 0
+    for line in head.split(b'\r\n'):
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    await reader.readexactly(length)
+    return head[9:12]
+
+
+async def _worker(host, port, deadline, latencies, errors, worker_id):
+    reader, writer = await asyncio.open_connection(host, port)
+    requests = [
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode() for path in PATHS
+    ]
+    i = worker_id
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            for _ in range(PIPELINE):
+                writer.write(requests[i % len(requests)])
+                i += 1
+            for _ in range(PIPELINE):
+                status = await _read_response(reader)
+                if status != b'200':
+                    errors.append(status)
+            latencies.append((time.perf_counter() - started) / PIPELINE)
+    finally:
+        writer.close()
+
+
+async def load_test(host, port, duration=DURATION, connections=CONNECTIONS):
+    """Lance `connections` clients pendant `duration` secondes"""
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _worker(host, port, deadline, latencies, errors, i) for i in range(connections)
+    ])
+    elapsed = time.perf_counter() - started
+
+    lat = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies) * PIPELINE,
+        'errors': len(errors),
+        'rps': len(latencies) * PIPELINE / elapsed,
+        'p50_ms': float(np.percentile(lat, 50)) if lat.size else 0,
+        'p95_ms': float(np.percentile(lat, 95)) if lat.size else 0,
+        'p99_ms': float(np.percentile(lat, 99)) if lat.size else 0,
+        'max_ms': float(lat.max()) if lat.size else 0
+    }
+
+
+def print_load_report(results):
+    print("\n" + "=" * 60)
+    print("              FLEET API LOAD TEST")
+    print("=" * 60)
+    print(f"Requests:     {results['requests']:,}  (errors: {results['errors']})")
+    print(f"Throughput:   {results['rps']:,.0f} req/s")
+    print(f"Latency p50:  {results['p50_ms']:.2f} ms")
+    print(f"Latency p95:  {results['p95_ms']:.2f} ms")
+    print(f"Latency p99:  {results['p99_ms']:.2f} ms")
+    print(f"Latency max:  {results['max_ms']:.2f} ms")
+    print("=" * 60 + "\n")
+
+#==============================================================================
+# MAIN
+#==============================================================================
+
+async def _self_hosted(duration, port=PORT):
+    """
+    Serveur démo dans un sous-processus: le client de charge ne doit pas
+    partager la boucle (et le cœur) du serveur mesuré
+    Lancé depuis le dossier de ce script pour que fleet_api soit importable
+    """
+    with tempfile.TemporaryDirectory() as root:
+        writer_task = asyncio.create_task(simulate_ea_writers(root, 300, duration + 5))
+        server = await asyncio.create_subprocess_exec(
+            sys.executable, '-c',
+            f"import asyncio; from fleet_api import FleetServer; "
+            f"from compliance_monitor import ComplianceMonitor; "
+            f"asyncio.run(FleetServer(ComplianceMonitor({root!r}, on_alert=lambda a: None), port={port})"
+            f".run(duration={duration + 4}))",
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        await asyncio.sleep(2)
+        try:
+            return await load_test('127.0.0.1', port, duration)
+        finally:
+            await server.wait()
+            writer_task.cancel()
+
+
+def main():
+    if len(sys.argv) >= 3:
+        duration = float(sys.argv[3]) if len(sys.argv) > 3 else DURATION
+        results = asyncio.run(load_test(sys.argv[1], int(sys.argv[2]), duration))
+    else:
+        port = int(sys.argv[1]) if len(sys.argv) == 2 else PORT
+        results = asyncio.run(_self_hosted(DURATION, port))
+    print_load_report(results)
+
+
+if __name__ == "__main__":
+    main()
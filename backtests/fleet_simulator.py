@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+PropFirm Fleet Simulator
+Monte Carlo mois par mois d'une flotte de comptes: achats de challenges,
+passage des phases, payouts funded, breaches et rachats
+
+Etat vectorisé (flottes x comptes): toutes les trajectoires de flotte avancent
+ensemble, un mois à la fois, jour par jour à l'intérieur du mois
+"""
+
+import time
+
+import numpy as np
+
+from metric_kernels import daily_risk_ratios, to_columns
+from propfirm_validator import PROPFIRM_PROFILES
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+MONTHS = 24
+DAYS_PER_MONTH = 21
+N_FLEETS = 2000
+ACCOUNT_SIZE = 100000
+PAYOUT_THRESHOLD = 5.0      # Payout demandé dès 5% de profit (FLEET_SCALING_STRATEGY.md)
+
+# Etapes d'un slot de compte
+RETIRED = -2    # Breaché sans rachat
+IDLE = -1       # En attente d'achat
+PHASE_1 = 0
+PHASE_2 = 1
+FUNDED = 2
+
+DEFAULT_FLEET = {'FTMO': 4, 'E8_ONE': 3, 'FUNDING_PIPS_1STEP': 3}
+
+#==============================================================================
+# SIMULATEUR
+#==============================================================================
+
+class FleetSimulator:
+    def __init__(self, fleet=None, daily_returns_pct=None, daily_mean_pct=0.25,
+                 daily_std_pct=1.0, account_size=ACCOUNT_SIZE,
+                 payout_threshold=PAYOUT_THRESHOLD, max_purchases_per_month=None,
+                 repurchase=True):
+        """
+        fleet: {profil: nombre de comptes}
+        daily_returns_pct: rendements journaliers empiriques (%) à rééchantillonner;
+        sinon loi normale (daily_mean_pct, daily_std_pct)
+        """
+        self.fleet = fleet or DEFAULT_FLEET
+        for name in self.fleet:
+            if name not in PROPFIRM_PROFILES:
+                raise ValueError(f"Profil inconnu: {name}")
+
+        self.daily_returns_pct = None if daily_returns_pct is None else np.asarray(daily_returns_pct, dtype=np.float64)
+        self.daily_mean_pct = daily_mean_pct
+        self.daily_std_pct = daily_std_pct
+        self.account_size = account_size
+        self.payout_threshold = payout_threshold
+        self.max_purchases_per_month = max_purchases_per_month
+        self.repurchase = repurchase
+
+        # Règles par slot (vecteurs de longueur n_accounts)
+        names = [name for name, count in self.fleet.items() for _ in range(count)]
+        self.slot_profiles = names
+        rule = lambda key: np.array([PROPFIRM_PROFILES[n].get(key, 0) for n in names], dtype=np.float64)
+        self.max_daily_dd = rule('max_daily_dd')
+        self.max_total_dd = rule('max_total_dd')
+        self.target_p1 = rule('profit_target')
+        self.target_p2 = rule('profit_target_p2')
+        self.min_days = rule('min_trading_days')
+        self.cost = rule('challenge_cost')
+        self.split = rule('profit_split') / 100
+
+    def _draw_days(self, rng, shape):
+        if self.daily_returns_pct is not None:
+            return self.daily_returns_pct[rng.integers(0, len(self.daily_returns_pct), size=shape)]
+        return rng.normal(self.daily_mean_pct, self.daily_std_pct, size=shape)
+
+    def run(self, n_fleets=N_FLEETS, months=MONTHS, seed=42):
+        """
+        Simule n_fleets trajectoires de flotte sur `months` mois
+        Retourne les séries (flottes x mois) de cash-flow et d'activité
+        """
+        rng = np.random.default_rng(seed)
+        n_accounts = len(self.slot_profiles)
+        shape = (n_fleets, n_accounts)
+
+        stage = np.full(shape, IDLE, dtype=np.int8)
+        stage_pnl = np.zeros(shape)          # P&L (%) depuis début d'étape / dernier payout
+        stage_days = np.zeros(shape)
+
+        series = {key: np.zeros((n_fleets, months)) for key in
+                  ('costs', 'payouts', 'purchases', 'passes', 'breaches', 'funded')}
+
+        for month in range(months):
+            # 1. Achats / rachats des slots inactifs (limités par mois si demandé)
+            idle = stage == IDLE
+            if self.max_purchases_per_month is not None:
+                idle &= np.cumsum(idle, axis=1) <= self.max_purchases_per_month
+            stage[idle] = PHASE_1
+            stage_pnl[idle] = 0
+            stage_days[idle] = 0
+            series['costs'][:, month] = (idle * self.cost).sum(axis=1)
+            series['purchases'][:, month] = idle.sum(axis=1)
+
+            # 2. Mois de trading jour par jour (vectorisé sur les jours)
+            active = stage >= PHASE_1
+            daily = self._draw_days(rng, shape + (DAYS_PER_MONTH,))
+            cum = stage_pnl[..., None] + np.cumsum(daily, axis=2)
+
+            breach = (daily <= -self.max_daily_dd[:, None]) | (cum <= -self.max_total_dd[:, None])
+            first_breach = np.where(breach.any(axis=2), breach.argmax(axis=2), DAYS_PER_MONTH)
+
+            target = np.where(stage == PHASE_1, self.target_p1, self.target_p2)
+            hit = cum >= target[..., None]
+            first_hit = np.where(hit.any(axis=2), hit.argmax(axis=2), DAYS_PER_MONTH)
+            # Jours minimum: l'objectif ne compte qu'une fois le minimum atteint
+            first_hit = np.maximum(first_hit, self.min_days - stage_days - 1).astype(np.int64)
+
+            in_phase = active & (stage <= PHASE_2)
+            passed = in_phase & (first_hit < DAYS_PER_MONTH) & (first_hit < first_breach)
+            breached = active & ~passed & (first_breach < DAYS_PER_MONTH)
+
+            end_pnl = cum[..., -1]
+            stage_days += DAYS_PER_MONTH
+
+            # 3. Transitions: phase 1 -> phase 2 (ou funded si 1-step) -> funded
+            next_stage = np.where((stage == PHASE_1) & (self.target_p2 > 0), PHASE_2, FUNDED)
+            stage = np.where(passed, next_stage, stage).astype(np.int8)
+            stage_pnl = np.where(passed, 0.0, end_pnl)
+            stage_days = np.where(passed, 0, stage_days)
+
+            # 4. Payouts funded (comptes non breachés au-dessus du seuil)
+            funded = (stage == FUNDED) & ~passed & ~breached
+            pay = funded & (stage_pnl >= self.payout_threshold)
+            amount = np.where(pay, stage_pnl / 100 * self.account_size * self.split, 0.0)
+            stage_pnl = np.where(pay, 0.0, stage_pnl)
+            series['payouts'][:, month] = amount.sum(axis=1)
+
+            # 5. Breaches: le slot redevient inactif (racheté le mois suivant)
+            stage = np.where(breached, IDLE if self.repurchase else RETIRED, stage).astype(np.int8)
+            series['passes'][:, month] = passed.sum(axis=1)
+            series['breaches'][:, month] = breached.sum(axis=1)
+            series['funded'][:, month] = (stage == FUNDED).sum(axis=1)
+
+        return self._summarize(series)
+
+    def _summarize(self, series):
+        cash_flow = series['payouts'] - series['costs']
+        cumulative = np.cumsum(cash_flow, axis=1)
+        peak = np.maximum.accumulate(np.maximum(cumulative, 0), axis=1)
+        drawdown = (peak - cumulative).max(axis=1)
+
+        positive = cumulative > 0
+        # Mois de break-even: premier mois où le cumul devient (et reste) positif
+        stays_positive = np.flip(np.logical_and.accumulate(np.flip(positive, axis=1), axis=1), axis=1)
+        breakeven = np.where(stays_positive.any(axis=1), stays_positive.argmax(axis=1) + 1, np.nan)
+
+        series.update({
+            'cash_flow': cash_flow,
+            'cumulative': cumulative,
+            'max_cash_drawdown': drawdown,
+            'breakeven_month': breakeven,
+            'min_cumulative': cumulative.min(axis=1)
+        })
+        return series
+
+#==============================================================================
+# RAPPORT
+#==============================================================================
+
+def print_fleet_report(results, fleet):
+    """Affiche les distributions de cash-flow de la flotte"""
+    cumulative = results['cumulative']
+    n_fleets, months = cumulative.shape
+    pct = (5, 25, 50, 75, 95)
+
+    print("\n" + "=" * 78)
+    print("                    FLEET CASH-FLOW SIMULATION")
+    print("=" * 78)
+    print(f"\nFlotte: " + ", ".join(f"{n}x {PROPFIRM_PROFILES[p]['name']}" for p, n in fleet.items()))
+    print(f"Trajectoires: {n_fleets:,}  |  Horizon: {months} mois")
+
+    print("\n" + "-" * 78)
+    print(f"{'Mois':<6} {'Cash-flow moyen':>16} {'Cumul P5':>12} {'Cumul P50':>12} {'Cumul P95':>12} {'Funded':>8}")
+    print("-" * 78)
+    for m in [0, 1, 2, 5, 8, 11, 17, 23]:
+        if m >= months:
+            continue
+        p5, p50, p95 = np.percentile(cumulative[:, m], [5, 50, 95])
+        print(f"{m + 1:<6} ${results['cash_flow'][:, m].mean():>15,.0f} ${p5:>11,.0f} ${p50:>11,.0f} "
+              f"${p95:>11,.0f} {results['funded'][:, m].mean():>8.1f}")
+
+    print("\n" + "-" * 78)
+    print("DISTRIBUTIONS")
+    print("-" * 78)
+    final = np.percentile(cumulative[:, -1], pct)
+    dd = np.percentile(results['max_cash_drawdown'], pct)
+    print("Cumul final:       " + "  ".join(f"P{p}: ${v:,.0f}" for p, v in zip(pct, final)))
+    print("Drawdown cash max: " + "  ".join(f"P{p}: ${v:,.0f}" for p, v in zip(pct, dd)))
+    print(f"Pire creux cumulé (médiane): ${np.median(results['min_cumulative']):,.0f}")
+    breakeven = results['breakeven_month']
+    reached = np.isfinite(breakeven)
+    if reached.any():
+        print(f"Break-even: {reached.mean() * 100:.1f}% des flottes, mois médian {np.nanmedian(breakeven):.0f}")
+    print(f"Challenges achetés: {results['purchases'].sum(axis=1).mean():.1f}  |  "
+          f"Breaches: {results['breaches'].sum(axis=1).mean():.1f} (moyennes par flotte)")
+    print(f"P(cumul < 0 à 12 mois): {(cumulative[:, min(11, months - 1)] < 0).mean() * 100:.1f}%")
+    print("=" * 78 + "\n")
+
+
+def main():
+    """Démonstration: flotte de 10 comptes sur 24 mois"""
+    from analyze_backtest import generate_sample_trades
+
+    # Rendements journaliers empiriques d'un backtest (risque x4 pour la démo)
+    columns = to_columns(generate_sample_trades(num_trades=3000, win_rate=0.45, avg_rr=1.3))
+    columns['profit'] *= 4
+    daily = daily_risk_ratios(columns['time'], columns['profit'], ACCOUNT_SIZE)['daily_returns'] * 100
+
+    simulator = FleetSimulator(DEFAULT_FLEET, daily_returns_pct=daily, max_purchases_per_month=4)
+    started = time.perf_counter()
+    results = simulator.run()
+    print(f"\nSimulation: {time.perf_counter() - started:.2f}s")
+    print_fleet_report(results, DEFAULT_FLEET)
+
+
+if __name__ == "__main__":
+    main()
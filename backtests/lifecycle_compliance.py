@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+PropFirm Lifecycle Compliance
+Cycle de vie complet d'un historique de trades: phase 1, phase 2 (vérification),
+compte funded avec cycles de payout et plans de scaling (FTMO, E8)
+
+Vectorisé sur (profils x sets de trades): toutes les lignes avancent ensemble,
+étape par étape puis cycle de payout par cycle de payout, pour classer les
+passes d'optimisation sur leur issue réelle et pas seulement sur la phase 1
+"""
+
+import time
+
+import numpy as np
+
+from metric_kernels import WEEKMASK, server_days
+from propfirm_validator import PROPFIRM_PROFILES
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+PAYOUT_THRESHOLD = 5.0      # Payout demandé dès 5% de profit (FLEET_SCALING_STRATEGY.md)
+PAYOUT_INTERVAL_DAYS = 10   # Jours ouvrés minimum entre deux payouts (~14 jours calendaires)
+MAX_PAYOUT_CYCLES = 36
+ACCOUNT_SIZE = 100000
+BLOCK_SETS = 256            # Sets évalués ensemble (mémoire: profils x bloc x trades)
+
+# Plans de scaling du compte funded (FLEET_SCALING_STRATEGY.md)
+SCALING_PLANS = {
+    'ftmo': {
+        'cycle_days': 84,           # Cycle de 4 mois en jours ouvrés
+        'min_payouts': 2,
+        'min_profit_pct': 10.0,     # Profit net (payouts) sur le cycle
+        'capital_step': 0.25,       # +25% de capital
+        'max_capital': 2000000,
+        'split_after': 90
+    },
+    'e8': {
+        'dd_step': 1.0,             # +1% de DD max par payout
+        'max_total_dd': 14.0
+    }
+}
+PLAN_CODES = {None: 0, 'ftmo': 1, 'e8': 2}
+
+# Etape atteinte
+PHASE_1 = 0
+PHASE_2 = 1
+FUNDED = 2
+STAGE_NAMES = {PHASE_1: 'Phase 1', PHASE_2: 'Phase 2', FUNDED: 'Funded'}
+
+#==============================================================================
+# SEGMENT (une étape ou un cycle de payout)
+#==============================================================================
+
+def _first(mask):
+    """Premier indice vrai par ligne (largeur si aucun)"""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+
+
+def _segment(pnl_pct, day, valid, start, target, min_days, min_elapsed, max_daily_dd, max_total_dd):
+    """
+    Rejoue chaque ligne à partir de son trade 'start' (largeur = pas de segment)
+    pnl_pct: P&L des trades en % du capital courant (lignes x trades)
+    day: jour ouvré de chaque trade (entier croissant)
+    Objectif: profit >= target avec min_days jours tradés et min_elapsed jours ouvrés
+    Breach: perte du jour <= -max_daily_dd ou perte depuis le départ <= -max_total_dd
+    Retourne (premier objectif, premier breach, P&L à l'objectif, P&L final)
+    """
+    width = pnl_pct.shape[1]
+    hit = np.full(len(start), width)
+    breach = np.full(len(start), width)
+    pnl_hit = np.zeros(len(start))
+    pnl_end = np.zeros(len(start))
+    rows = np.flatnonzero(start < width)
+    if rows.size == 0:
+        return hit, breach, pnl_hit, pnl_end
+
+    # Seules les lignes actives et les colonnes après le premier départ sont rejouées
+    lo = int(start[rows].min())
+    pnl_pct, day, valid = pnl_pct[rows, lo:], day[rows, lo:], valid[rows, lo:]
+    idx = np.arange(width - lo)[None, :]
+    first = (start[rows] - lo)[:, None]
+    active = valid & (idx >= first)
+
+    step = np.where(active, pnl_pct, 0.0)
+    pnl = np.cumsum(step, axis=1)
+
+    # P&L à l'ouverture du jour (ou du segment s'il démarre en cours de journée)
+    prev_day = np.concatenate([day[:, :1] - 1, day[:, :-1]], axis=1)
+    new_day = active & ((idx == first) | (day != prev_day))
+    opened = np.maximum.accumulate(np.where(new_day, idx, 0), axis=1)
+    day_open = np.take_along_axis(pnl - step, opened, axis=1)
+
+    lost = active & ((pnl - day_open <= -max_daily_dd[rows, None]) | (pnl <= -max_total_dd[rows, None]))
+
+    days_traded = np.cumsum(new_day, axis=1)
+    start_day = np.take_along_axis(day, first, axis=1)
+    won = (active & (pnl >= target[rows, None]) & (days_traded >= min_days[rows, None])
+           & (day - start_day >= min_elapsed[rows, None]))
+
+    hit[rows] = _first(won) + lo
+    breach[rows] = _first(lost) + lo
+    pnl_hit[rows] = _at(pnl, hit[rows] - lo)
+    pnl_end[rows] = pnl[:, -1]
+    return hit, breach, pnl_hit, pnl_end
+
+
+def _at(values, index):
+    """values[ligne, index] avec index = largeur toléré (renvoie la dernière colonne)"""
+    index = np.minimum(index, values.shape[1] - 1)
+    return np.take_along_axis(values, index[:, None], axis=1)[:, 0]
+
+
+def _chronological(times, profit, valid):
+    """
+    Lignes triées par date (tri stable, trades invalides en fin de ligne et datés
+    du dernier trade valide): _segment suppose des jours croissants par ligne
+    Entrées renvoyées telles quelles si elles sont déjà triées
+    """
+    times = np.asarray(times, dtype='datetime64[s]')
+    full = np.broadcast_to(np.atleast_2d(times), profit.shape)
+    key = np.where(valid, full.view(np.int64), np.iinfo(np.int64).max)
+    if not (key[:, 1:] < key[:, :-1]).any():
+        return times, profit, valid
+
+    order = np.argsort(key, axis=1, kind='stable')
+    times, profit, valid = (np.take_along_axis(a, order, axis=1) for a in (full, profit, valid))
+    n_valid = valid.sum(axis=1)
+    last = _at(times, np.maximum(n_valid - 1, 0))
+    times = np.where(valid | (n_valid == 0)[:, None], times, last[:, None])
+    return times, profit, valid
+
+#==============================================================================
+# CYCLE DE VIE
+#==============================================================================
+
+def _rule_vectors(rules_list, n_sets):
+    """Règles des profils -> vecteurs par ligne (profil répété pour chaque set)"""
+    def column(getter, dtype=np.float64):
+        return np.repeat(np.array([getter(r) for r in rules_list], dtype=dtype), n_sets)
+
+    return {
+        'target_p1': column(lambda r: r.get('profit_target_p1', r.get('profit_target'))),
+        'target_p2': column(lambda r: r.get('profit_target_p2', 0)),
+        'min_days': column(lambda r: r.get('min_trading_days', 0), np.int64),
+        'daily_dd': column(lambda r: r['max_daily_dd']),
+        'total_dd': column(lambda r: r['max_total_dd']),
+        'funded_daily_dd': column(lambda r: r.get('funded_max_daily_dd', r['max_daily_dd'])),
+        'funded_total_dd': column(lambda r: r.get('funded_max_total_dd', r['max_total_dd'])),
+        'split': column(lambda r: r.get('profit_split', 80)),
+        'cost': column(lambda r: r.get('challenge_cost', 0)),
+        'plan': column(lambda r: PLAN_CODES[r.get('scaling_plan')], np.int64)
+    }
+
+
+def _lifecycle_block(pnl_pct, day, valid, rules, account_size, payout_threshold,
+                     payout_interval_days, max_cycles):
+    """Cycle de vie de toutes les lignes (profils x sets) d'un bloc"""
+    n_rows, width = pnl_pct.shape
+    zeros = np.zeros(n_rows, dtype=np.int64)
+
+    # Phase 1
+    hit1, breach1, _, _ = _segment(pnl_pct, day, valid, zeros, rules['target_p1'], rules['min_days'],
+                                   zeros, rules['daily_dd'], rules['total_dd'])
+    passed_p1 = hit1 < breach1
+
+    # Phase 2 (challenges 2-step uniquement), repart du trade suivant au capital initial
+    two_step = rules['target_p2'] > 0
+    start2 = np.where(passed_p1 & two_step, hit1 + 1, width)
+    hit2, breach2, _, _ = _segment(pnl_pct, day, valid, start2, rules['target_p2'], rules['min_days'],
+                                   zeros, rules['daily_dd'], rules['total_dd'])
+    passed_p2 = passed_p1 & (~two_step | (hit2 < breach2))
+    funded_at = np.where(two_step, hit2, hit1)
+
+    # Compte funded: cycles de payout successifs
+    capital = np.full(n_rows, float(account_size))
+    split = rules['split'].copy()
+    funded_total_dd = rules['funded_total_dd'].copy()
+    payouts = np.zeros(n_rows, dtype=np.int64)
+    paid = np.zeros(n_rows)
+    funded_breach = np.full(n_rows, width)
+    open_pnl = np.zeros(n_rows)
+    scalings = np.zeros(n_rows, dtype=np.int64)
+
+    ftmo = SCALING_PLANS['ftmo']
+    e8 = SCALING_PLANS['e8']
+    start = np.where(passed_p2, funded_at + 1, width)
+    cycle_start = _at(day, start)
+    cycle_payouts = np.zeros(n_rows, dtype=np.int64)
+    cycle_profit = np.zeros(n_rows)
+
+    threshold = np.full(n_rows, payout_threshold)
+    interval = np.full(n_rows, payout_interval_days)
+    alive = passed_p2 & (start < width)
+    for _ in range(max_cycles):
+        if not alive.any():
+            break
+        hit, breach, pnl_hit, pnl_end = _segment(pnl_pct, day, valid, np.where(alive, start, width),
+                                                 threshold, zeros, interval, rules['funded_daily_dd'], funded_total_dd)
+        pay = alive & (hit < breach)
+        broke = alive & ~pay & (breach < width)
+        funded_breach = np.where(broke, breach, funded_breach)
+        last = alive & ~pay & ~broke
+        open_pnl = np.where(last, pnl_end, open_pnl)
+
+        amount_pct = np.where(pay, pnl_hit, 0.0)
+        paid += amount_pct / 100 * capital * split / 100
+        payouts += pay
+
+        # E8: le DD max augmente à chaque payout
+        funded_total_dd = np.where(pay & (rules['plan'] == PLAN_CODES['e8']),
+                                   np.minimum(funded_total_dd + e8['dd_step'], e8['max_total_dd']),
+                                   funded_total_dd)
+
+        # FTMO: revue en fin de cycle de 4 mois (au payout qui le clôt)
+        cycle_payouts += pay
+        cycle_profit += amount_pct
+        pay_day = _at(day, hit)
+        review = pay & (rules['plan'] == PLAN_CODES['ftmo']) & (pay_day - cycle_start >= ftmo['cycle_days'])
+        scale = review & (cycle_payouts >= ftmo['min_payouts']) & (cycle_profit >= ftmo['min_profit_pct'])
+        capital = np.where(scale, np.minimum(capital * (1 + ftmo['capital_step']), ftmo['max_capital']), capital)
+        split = np.where(scale, np.maximum(split, ftmo['split_after']), split)
+        scalings += scale
+        cycle_start = np.where(review, pay_day, cycle_start)
+        cycle_payouts = np.where(review, 0, cycle_payouts)
+        cycle_profit = np.where(review, 0.0, cycle_profit)
+
+        # Après payout: retour au capital (nouveau cycle)
+        start = np.where(pay, hit + 1, start)
+        alive = pay & (start < width)
+
+    stage = np.where(passed_p2, FUNDED, np.where(passed_p1, PHASE_2, PHASE_1))
+    breach_trade = np.where(stage == PHASE_1, breach1, np.where(stage == PHASE_2, breach2, funded_breach))
+    first_day = day[:, 0]
+    return {
+        'stage': stage,
+        'breached': breach_trade < width,
+        'breach_trade': np.where(breach_trade < width, breach_trade, -1),
+        'passed_p1': passed_p1,
+        'passed_p2': passed_p2,
+        'p1_trade': np.where(passed_p1, hit1, -1),
+        'funded_trade': np.where(passed_p2, funded_at, -1),
+        'days_to_funded': np.where(passed_p2, _at(day, funded_at) - first_day, -1),
+        'payouts': payouts,
+        'payout_total': paid,
+        'open_pnl_pct': open_pnl,
+        'final_capital': capital,
+        'final_split': split,
+        'final_total_dd': funded_total_dd,
+        'scalings': scalings,
+        'net_value': paid - rules['cost']
+    }
+
+
+def evaluate_lifecycle(times, profit, initial_balance=ACCOUNT_SIZE, valid=None, profiles=None,
+                       server_offset_hours=0, payout_threshold=PAYOUT_THRESHOLD,
+                       payout_interval_days=PAYOUT_INTERVAL_DAYS, max_cycles=MAX_PAYOUT_CYCLES,
+                       block_sets=BLOCK_SETS):
+    """
+    Cycle de vie de sets de trades pour tous les profils en une passe
+    profit: (trades,) ou (sets x trades), ex: pad_trade_sets; times 1D partagé ou 2D
+    profiles: noms de PROPFIRM_PROFILES ou dict {nom: règles} (ex: PROPFIRM_RULES)
+    Le P&L est rapporté au capital initial: le sizing en % suit le capital après scaling
+    Chaque ligne est triée par date avant le découpage en jours
+    Retourne {'profiles': noms, champ: (profils x sets)}
+    """
+    if profiles is None:
+        profiles = list(PROPFIRM_PROFILES.keys())
+    rules_by_name = profiles if isinstance(profiles, dict) else {n: PROPFIRM_PROFILES[n] for n in profiles}
+    names = list(rules_by_name.keys())
+    rules_list = [rules_by_name[n] for n in names]
+
+    profit = np.atleast_2d(np.asarray(profit, dtype=np.float64))
+    n_sets, width = profit.shape
+    valid = np.ones((n_sets, width), dtype=bool) if valid is None else np.atleast_2d(valid)
+    times, profit, valid = _chronological(times, profit, valid)
+    pnl_pct = profit / initial_balance * 100
+
+    days = server_days(times, server_offset_hours)
+    day = np.busday_count(np.datetime64('1970-01-01', 'D'), days, weekmask=WEEKMASK)
+    day = np.broadcast_to(np.atleast_2d(day), (n_sets, width))
+
+    n_profiles = len(names)
+    results = {}
+    for lo in range(0, n_sets, block_sets):
+        hi = min(lo + block_sets, n_sets)
+        block = hi - lo
+        # Lignes = profils x sets du bloc (profil majeur)
+        block_result = _lifecycle_block(
+            np.tile(pnl_pct[lo:hi], (n_profiles, 1)), np.tile(day[lo:hi], (n_profiles, 1)),
+            np.tile(valid[lo:hi], (n_profiles, 1)), _rule_vectors(rules_list, block),
+            initial_balance, payout_threshold, payout_interval_days, max_cycles)
+        for key, values in block_result.items():
+            results.setdefault(key, []).append(values.reshape(n_profiles, block))
+
+    results = {key: np.concatenate(parts, axis=1) for key, parts in results.items()}
+    results['profiles'] = names
+    return results
+
+
+def rank_lifecycle(results, profile=None, top=None):
+    """
+    Classement des sets par valeur nette (payouts - coût du challenge)
+    Un profil donné, ou la moyenne sur tous les profils
+    """
+    if profile is None:
+        score = results['net_value'].mean(axis=0)
+    else:
+        score = results['net_value'][results['profiles'].index(profile)]
+    # Départage: étape atteinte puis nombre de payouts
+    stage = results['stage'].max(axis=0)
+    order = np.lexsort((-results['payouts'].sum(axis=0), -stage, -score))
+    return order[:top] if top else order
+
+
+def lifecycle_summary(results):
+    """Taux par profil: phase 1, phase 2, funded, breach funded, payouts moyens"""
+    summary = {}
+    for i, name in enumerate(results['profiles']):
+        funded = results['stage'][i] == FUNDED
+        summary[name] = {
+            'p1_rate': float(results['passed_p1'][i].mean() * 100),
+            'funded_rate': float(funded.mean() * 100),
+            'funded_breach_rate': float((funded & results['breached'][i]).mean() * 100),
+            'avg_payouts': float(results['payouts'][i].mean()),
+            'avg_payout_total': float(results['payout_total'][i].mean()),
+            'avg_net_value': float(results['net_value'][i].mean()),
+            'scaled_rate': float((results['scalings'][i] > 0).mean() * 100)
+        }
+    return summary
+
+
+def print_lifecycle_report(results, labels=None, top=10):
+    """Synthèse par profil puis meilleurs sets"""
+    names = results['profiles']
+    n_sets = results['stage'].shape[1]
+    print("\n" + "=" * 90)
+    print("                     PROPFIRM LIFECYCLE COMPLIANCE")
+    print("=" * 90)
+    print(f"Sets évalués: {n_sets:,}  |  Profils: {len(names)}")
+
+    print(f"\n{'PropFirm':<25} {'Phase 1':>8} {'Funded':>8} {'Breach F':>9} "
+          f"{'Payouts':>8} {'Payé moy.':>11} {'Net moy.':>10} {'Scaling':>8}")
+    print("-" * 90)
+    for name, s in lifecycle_summary(results).items():
+        label = PROPFIRM_PROFILES[name]['name'] if name in PROPFIRM_PROFILES else name
+        print(f"{label:<25} {s['p1_rate']:>7.1f}% {s['funded_rate']:>7.1f}% {s['funded_breach_rate']:>8.1f}% "
+              f"{s['avg_payouts']:>8.2f} ${s['avg_payout_total']:>10,.0f} ${s['avg_net_value']:>9,.0f} "
+              f"{s['scaled_rate']:>7.1f}%")
+
+    print("\n" + "-" * 90)
+    print(f"TOP {min(top, n_sets)} SETS (valeur nette moyenne sur les profils)")
+    print("-" * 90)
+    print(f"{'Set':<12} {'Net moy.':>10} {'Funded':>8} {'Payouts':>8}  Etape par profil")
+    for i in rank_lifecycle(results, top=top):
+        label = labels[i] if labels is not None else f"#{i}"
+        stages = " ".join(STAGE_NAMES[s][0] + ("x" if b else "") for s, b in
+                          zip(results['stage'][:, i], results['breached'][:, i]))
+        print(f"{str(label):<12} ${results['net_value'][:, i].mean():>9,.0f} "
+              f"{int((results['stage'][:, i] == FUNDED).sum()):>5}/{len(names):<2} "
+              f"{int(results['payouts'][:, i].sum()):>8}  {stages}")
+    print("=" * 90 + "\n")
+
+
+def main():
+    """Démonstration: 2000 passes d'optimisation (win rate/RR variés) sur 1 an de trades"""
+    from metric_kernels import pad_trade_sets
+    from trade_generator import generate_trades
+
+    rng = np.random.default_rng(11)
+    n_sets = 2000
+    params = list(zip(rng.uniform(0.40, 0.55, n_sets), rng.uniform(1.0, 1.6, n_sets)))
+    sets = [generate_trades(1000, win_rate=w, avg_rr=rr, avg_loss=250, trades_per_day=4, seed=i)
+            for i, (w, rr) in enumerate(params)]
+    batch = pad_trade_sets(sets)
+
+    started = time.perf_counter()
+    results = evaluate_lifecycle(batch['time'], batch['profit'], valid=batch['valid'])
+    elapsed = time.perf_counter() - started
+    print(f"\n{n_sets:,} sets x {len(results['profiles'])} profils évalués en {elapsed:.2f}s")
+
+    labels = [f"WR{w:.2f}/RR{rr:.1f}" for w, rr in params]
+    print_lifecycle_report(results, labels=labels)
+
+
+if __name__ == "__main__":
+    main()
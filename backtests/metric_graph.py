@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+PropFirm Metric Graph
+Graphe de dépendances paresseux des métriques: chaque nœud n'est calculé que
+s'il est demandé, mémorisé, puis invalidé (avec ses dépendants) quand une
+entrée change (nouveau set de trades, solde initial...)
+"""
+
+from collections import Counter, defaultdict
+
+#==============================================================================
+# GRAPHE
+#==============================================================================
+
+class MetricGraph:
+    def __init__(self):
+        self._inputs = {}
+        self._nodes = {}                        # nom -> (fonction, dépendances)
+        self._dependents = defaultdict(set)     # nom -> nœuds qui en dépendent directement
+        self._cache = {}                        # (nom, args) -> valeur
+        self.version = 0                        # Incrémenté à chaque changement d'entrée
+        self.evaluations = Counter()            # Nombre de calculs effectifs par nœud
+
+    def add_input(self, name, value=None):
+        """Déclare une entrée (feuille du graphe)"""
+        self._inputs[name] = value
+
+    def add_node(self, name, func, deps=()):
+        """
+        Déclare un nœud calculé: func(*valeurs des dépendances, *args)
+        Les args (ex: nom de prop firm) font partie de la clé de cache
+        """
+        for dep in deps:
+            if dep not in self._inputs and dep not in self._nodes:
+                raise KeyError(f"Dépendance inconnue pour {name}: {dep}")
+        self._nodes[name] = (func, tuple(deps))
+        for dep in deps:
+            self._dependents[dep].add(name)
+
+    def set(self, name, value):
+        """Change une entrée et invalide tout ce qui en dépend"""
+        if name not in self._inputs:
+            raise KeyError(f"Entrée inconnue: {name}")
+        self._inputs[name] = value
+        self.version += 1
+        self.invalidate(name)
+
+    def invalidate(self, name=None):
+        """Invalide un nœud et ses dépendants transitifs (tout le cache si None)"""
+        if name is None:
+            self._cache.clear()
+            return
+        stale = set()
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            for dependent in self._dependents[current]:
+                if dependent not in stale:
+                    stale.add(dependent)
+                    stack.append(dependent)
+        stale.add(name)
+        for key in [k for k in self._cache if k[0] in stale]:
+            del self._cache[key]
+
+    def get(self, name, *args):
+        """Valeur d'une entrée ou d'un nœud, calculée au besoin (dépendances d'abord)"""
+        if name in self._inputs:
+            return self._inputs[name]
+        key = (name, args)
+        if key in self._cache:
+            return self._cache[key]
+        if name not in self._nodes:
+            raise KeyError(f"Nœud inconnu: {name}")
+
+        func, deps = self._nodes[name]
+        value = func(*(self.get(dep) for dep in deps), *args)
+        self._cache[key] = value
+        self.evaluations[name] += 1
+        return value
+
+    def is_cached(self, name, *args):
+        return (name, args) in self._cache
+
+    def __contains__(self, name):
+        return name in self._inputs or name in self._nodes
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+PropFirm Metric Kernels
+Noyaux vectorisés (NumPy) des métriques de performance: format colonnaire,
+calendrier de trading serveur et ratios de risque sur rendements journaliers
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+TRADING_DAYS_PER_YEAR = 252
+WEEKMASK = '1111100'    # Lundi-vendredi (jours serveur MT5)
+
+#==============================================================================
+# FORMAT COLONNAIRE
+#==============================================================================
+
+def to_columns(trades):
+    """
+    Convertit une liste de trades (dicts) en colonnes NumPy
+    Format: {'time': datetime64[s], 'profit': float64}
+    """
+    n = len(trades)
+    times = np.array([t.get('date') for t in trades], dtype='datetime64[s]')
+    profit = np.fromiter((t.get('profit', 0) for t in trades), dtype=np.float64, count=n)
+    return {'time': times, 'profit': profit}
+
+
+def sort_by_time(columns):
+    """Set colonnaire trié par date (tri stable); renvoyé tel quel s'il l'est déjà"""
+    times = np.asarray(columns['time'], dtype='datetime64[s]')
+    if times.size < 2 or not (times[1:] < times[:-1]).any():
+        return columns
+    order = np.argsort(times, kind='stable')
+    n = len(times)
+    return {k: (np.asarray(v)[order] if np.ndim(v) == 1 and len(v) == n else v)
+            for k, v in columns.items()}
+
+
+def pad_trade_sets(trade_sets):
+    """
+    Empile plusieurs sets de trades colonnaires en matrices (sets x trades)
+    Les sets courts sont complétés par des trades nuls datés du dernier trade
+    (un set vide: du premier trade du lot, pour ne pas étendre le calendrier);
+    'valid' distingue les vrais trades du remplissage
+    """
+    lengths = np.array([len(s['profit']) for s in trade_sets], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    n_sets = len(trade_sets)
+    first = min((np.datetime64(s['time'][0], 's') for s in trade_sets if len(s['profit'])),
+                default=np.datetime64(0, 's'))
+
+    times = np.full((n_sets, width), first, dtype='datetime64[s]')
+    profit = np.zeros((n_sets, width), dtype=np.float64)
+    valid = np.arange(width)[None, :] < lengths[:, None]
+
+    for i, s in enumerate(trade_sets):
+        n = lengths[i]
+        if n == 0:
+            continue
+        times[i, :n] = s['time']
+        times[i, n:] = s['time'][-1]
+        profit[i, :n] = s['profit']
+
+    return {'time': times, 'profit': profit, 'valid': valid, 'lengths': lengths}
+
+#==============================================================================
+# CALENDRIER DE TRADING
+#==============================================================================
+
+def _holidays(holidays):
+    """Jours fériés broker au format attendu par numpy.busday_*"""
+    if holidays is None:
+        return np.array([], dtype='datetime64[D]')
+    return np.asarray(holidays, dtype='datetime64[D]')
+
+
+def server_days(times, server_offset_hours=0, holidays=None):
+    """
+    Jour de trading serveur de chaque trade
+    Les trades du week-end (ou d'un jour férié) sont rattachés au jour ouvré précédent
+    """
+    times = np.asarray(times, dtype='datetime64[s]')
+    if server_offset_hours:
+        times = times + np.timedelta64(int(server_offset_hours * 3600), 's')
+    days = times.astype('datetime64[D]')
+    return np.busday_offset(days, 0, roll='backward', weekmask=WEEKMASK,
+                            holidays=_holidays(holidays))
+
+
+def trading_calendar(days, holidays=None):
+    """
+    Calendrier des jours ouvrés couvrant les trades
+    Retourne (calendar, index) où index donne la position de chaque trade dans calendar
+    Les jours sans trade (gaps) restent présents avec un P&L nul
+    """
+    if days.size == 0:
+        return np.array([], dtype='datetime64[D]'), np.zeros(days.shape, dtype=np.int64)
+    start = days.min()
+    end = days.max() + 1
+    calendar = np.arange(start, end, dtype='datetime64[D]')
+    calendar = calendar[np.is_busday(calendar, weekmask=WEEKMASK, holidays=_holidays(holidays))]
+    index = np.busday_count(start, days, weekmask=WEEKMASK, holidays=_holidays(holidays))
+    return calendar, index
+
+
+def bucket_daily(profit, index, n_days):
+    """
+    Somme des profits par jour de calendrier
+    Accepte un lot 2D (sets x trades): le résultat est alors (sets x jours)
+    """
+    profit = np.asarray(profit, dtype=np.float64)
+    if profit.ndim == 1:
+        return np.bincount(index, weights=profit, minlength=n_days)
+
+    n_sets = profit.shape[0]
+    index = np.broadcast_to(index, profit.shape)
+    flat = (np.arange(n_sets)[:, None] * n_days + index).ravel()
+    pnl = np.bincount(flat, weights=profit.ravel(), minlength=n_sets * n_days)
+    return pnl.reshape(n_sets, n_days)
+
+#==============================================================================
+# EQUITY ET DRAWDOWN
+#==============================================================================
+
+def equity_from_pnl(pnl, initial_balance):
+    """Courbe d'équité (dernier axe) précédée du solde initial"""
+    pnl = np.asarray(pnl, dtype=np.float64)
+    start = np.full(pnl.shape[:-1] + (1,), float(initial_balance))
+    return np.concatenate([start, initial_balance + np.cumsum(pnl, axis=-1)], axis=-1)
+
+
+def drawdown_pct(equity):
+    """Drawdown en % du plus haut atteint (dernier axe)"""
+    peak = np.maximum.accumulate(equity, axis=-1)
+    return (peak - equity) / peak * 100
+
+
+def returns_from_equity(equity):
+    """Rendements simples période par période"""
+    return np.diff(equity, axis=-1) / equity[..., :-1]
+
+#==============================================================================
+# RATIOS DE RISQUE
+#==============================================================================
+
+def sharpe_ratio(returns, periods=TRADING_DAYS_PER_YEAR):
+    """Sharpe annualisé (taux sans risque nul)"""
+    mean = returns.mean(axis=-1)
+    std = returns.std(axis=-1, ddof=1) if returns.shape[-1] > 1 else np.zeros_like(mean)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = mean / std * np.sqrt(periods)
+    return np.where(std > 0, ratio, 0.0)
+
+
+def sortino_ratio(returns, periods=TRADING_DAYS_PER_YEAR):
+    """Sortino annualisé (déviation des seuls rendements négatifs)"""
+    mean = returns.mean(axis=-1)
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2, axis=-1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = mean / downside * np.sqrt(periods)
+    return np.where(downside > 0, ratio, np.where(mean > 0, np.inf, 0.0))
+
+
+def calmar_ratio(equity, periods=TRADING_DAYS_PER_YEAR):
+    """Calmar: rendement annualisé (%) / drawdown max (%)"""
+    n_periods = equity.shape[-1] - 1
+    growth = equity[..., -1] / equity[..., 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annual = (np.power(np.maximum(growth, 0), periods / max(n_periods, 1)) - 1) * 100
+        max_dd = drawdown_pct(equity).max(axis=-1)
+        ratio = annual / max_dd
+    return np.where(max_dd > 0, ratio, np.where(annual > 0, np.inf, 0.0))
+
+
+def ulcer_index(equity):
+    """Ulcer index: moyenne quadratique du drawdown (%)"""
+    return np.sqrt(np.mean(drawdown_pct(equity) ** 2, axis=-1))
+
+
+def _rolling_sum(values, window):
+    """Somme glissante sur le dernier axe via sommes cumulées"""
+    cums = np.cumsum(values, axis=-1)
+    zero = np.zeros(values.shape[:-1] + (1,))
+    cums = np.concatenate([zero, cums], axis=-1)
+    return cums[..., window:] - cums[..., :-window]
+
+
+def rolling_ratios(returns, equity, window, periods=TRADING_DAYS_PER_YEAR):
+    """
+    Versions glissantes de Sharpe, Sortino, Calmar et Ulcer sur `window` jours
+    La valeur i couvre les rendements [i, i + window)
+    """
+    if returns.shape[-1] < window or window < 2:
+        empty = np.zeros(returns.shape[:-1] + (0,))
+        return {'sharpe_ratio': empty, 'sortino_ratio': empty,
+                'calmar_ratio': empty, 'ulcer_index': empty}
+
+    s1 = _rolling_sum(returns, window)
+    s2 = _rolling_sum(returns ** 2, window)
+    down2 = _rolling_sum(np.minimum(returns, 0) ** 2, window)
+
+    mean = s1 / window
+    std = np.sqrt(np.maximum(s2 - s1 * mean, 0) / (window - 1))
+    downside = np.sqrt(down2 / window)
+
+    # Fenêtres d'équité: window + 1 points pour window rendements
+    windows = sliding_window_view(equity, window + 1, axis=-1)
+    dd = drawdown_pct(windows)
+    max_dd = dd.max(axis=-1)
+    growth = windows[..., -1] / windows[..., 0]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods), 0.0)
+        sortino = np.where(downside > 0, mean / downside * np.sqrt(periods),
+                           np.where(mean > 0, np.inf, 0.0))
+        annual = (np.power(np.maximum(growth, 0), periods / window) - 1) * 100
+        calmar = np.where(max_dd > 0, annual / max_dd, np.where(annual > 0, np.inf, 0.0))
+
+    return {
+        'sharpe_ratio': sharpe,
+        'sortino_ratio': sortino,
+        'calmar_ratio': calmar,
+        'ulcer_index': np.sqrt(np.mean(dd ** 2, axis=-1))
+    }
+
+#==============================================================================
+# PIPELINE RENDEMENTS JOURNALIERS
+#==============================================================================
+
+def daily_risk_ratios(times, profit, initial_balance, server_offset_hours=0,
+                      holidays=None, window=None):
+    """
+    Rééchantillonne les trades sur le calendrier serveur et calcule les ratios
+
+    times/profit peuvent être 1D (un backtest) ou 2D (sets x trades, ex: passes
+    d'optimisation complétées par des profits nuls). Tous les sets partagent le
+    même calendrier, ce qui rend les ratios comparables entre stratégies.
+    """
+    profit = np.asarray(profit, dtype=np.float64)
+    days = server_days(times, server_offset_hours, holidays)
+    calendar, index = trading_calendar(days, holidays)
+
+    pnl = bucket_daily(profit, index, len(calendar))
+    equity = equity_from_pnl(pnl, initial_balance)
+    returns = returns_from_equity(equity)
+
+    result = {
+        'calendar': calendar,
+        'daily_pnl': pnl,
+        'daily_equity': equity,
+        'daily_returns': returns,
+        'sharpe_ratio': sharpe_ratio(returns),
+        'sortino_ratio': sortino_ratio(returns),
+        'calmar_ratio': calmar_ratio(equity),
+        'ulcer_index': ulcer_index(equity)
+    }
+
+    if window:
+        result['rolling'] = rolling_ratios(returns, equity, window)
+        result['rolling_calendar'] = calendar[window - 1:]
+
+    return result
+
+#==============================================================================
+# METRIQUES DE BASE
+#==============================================================================
+
+def trade_metrics(profit, valid, daily_pnl, daily_count, initial_balance):
+    """
+    Métriques de base par set (dernier axe), mêmes définitions que BacktestAnalyzer
+    daily_pnl/daily_count: P&L et nombre de trades par jour (voir bucket_daily)
+    """
+    profit = np.where(valid, profit, 0.0)
+    wins = profit > 0
+    losses = profit < 0
+
+    total = valid.sum(axis=-1)
+    gross_profit = np.where(wins, profit, 0.0).sum(axis=-1)
+    gross_loss = -np.where(losses, profit, 0.0).sum(axis=-1)
+    net_profit = gross_profit - gross_loss
+
+    equity = equity_from_pnl(profit, initial_balance)
+    peak = np.maximum.accumulate(equity, axis=-1)
+    dd_pct = (peak - equity) / peak * 100
+    worst = dd_pct.argmax(axis=-1)
+    max_dd = np.take_along_axis(peak - equity, worst[..., None], axis=-1)[..., 0]
+
+    if daily_pnl.shape[-1]:
+        worst_day = np.minimum(daily_pnl.min(axis=-1), 0)
+    else:
+        worst_day = np.zeros(daily_pnl.shape[:-1])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        win_rate = np.where(total > 0, wins.sum(axis=-1) / total * 100, 0.0)
+        profit_factor = np.where(gross_loss > 0, gross_profit / gross_loss, np.inf)
+        expected_payoff = np.where(total > 0, net_profit / total, 0.0)
+
+    return {
+        'total_trades': total,
+        'winning_trades': wins.sum(axis=-1),
+        'losing_trades': losses.sum(axis=-1),
+        'win_rate': win_rate,
+        'gross_profit': gross_profit,
+        'gross_loss': gross_loss,
+        'net_profit': net_profit,
+        'net_profit_pct': net_profit / initial_balance * 100,
+        'profit_factor': profit_factor,
+        'expected_payoff': expected_payoff,
+        'max_drawdown': max_dd,
+        'max_drawdown_pct': dd_pct.max(axis=-1),
+        'worst_day': worst_day,
+        'max_daily_dd_pct': -worst_day / initial_balance * 100,
+        'trading_days': (daily_count > 0).sum(axis=-1)
+    }
+
+#==============================================================================
+# CONFORMITE PROPFIRM
+#==============================================================================
+
+def compliance_kernel(metrics, rules):
+    """
+    Conformité vectorisée d'un lot de métriques contre un jeu de règles
+    Accepte PROPFIRM_RULES (analyzer) ou PROPFIRM_PROFILES (validator)
+    """
+    target = rules.get('profit_target_p1', rules.get('profit_target'))
+    checks = {
+        'max_total_dd': metrics['max_drawdown_pct'] < rules['max_total_dd'],
+        'max_daily_dd': metrics['max_daily_dd_pct'] < rules['max_daily_dd'],
+        'profit_target': metrics['net_profit_pct'] >= target,
+        'min_trading_days': metrics['trading_days'] >= rules['min_trading_days']
+    }
+    would_pass = np.logical_and.reduce(list(checks.values()))
+    return {'checks': checks, 'would_pass': would_pass}
+
+#==============================================================================
+# RESUME COMPLET
+#==============================================================================
+
+def summarize_trades(times, profit, initial_balance, valid=None, server_offset_hours=0):
+    """
+    Métriques complètes (base + ratios journaliers) d'un set ou d'un lot de sets
+    Retourne des scalaires NumPy pour un set 1D, des tableaux (sets,) pour un lot 2D
+    """
+    profit = np.asarray(profit, dtype=np.float64)
+    if valid is None:
+        valid = np.ones(profit.shape, dtype=bool)
+
+    days = server_days(times, server_offset_hours)
+    calendar, index = trading_calendar(days)
+    return calendar_metrics(profit, valid, index, len(calendar), initial_balance)
+
+
+def calendar_metrics(profit, valid, index, n_days, initial_balance):
+    """
+    Métriques complètes sur un calendrier déjà construit (index de jour par trade)
+    Des sous-lots indexés sur le même calendrier donnent les mêmes ratios que le lot entier
+    """
+    daily_pnl = bucket_daily(np.where(valid, profit, 0.0), index, n_days)
+    daily_count = bucket_daily(valid.astype(np.float64), index, n_days)
+
+    metrics = trade_metrics(profit, valid, daily_pnl, daily_count, initial_balance)
+    equity = equity_from_pnl(daily_pnl, initial_balance)
+    returns = returns_from_equity(equity)
+    metrics['sharpe_ratio'] = sharpe_ratio(returns)
+    metrics['sortino_ratio'] = sortino_ratio(returns)
+    metrics['calmar_ratio'] = calmar_ratio(equity)
+    metrics['ulcer_index'] = ulcer_index(equity)
+    return metrics
+
+#==============================================================================
+# SIMULATION DE CHALLENGE
+#==============================================================================
+
+def challenge_outcomes(paths_pct, trades_per_day, max_daily_dd, max_total_dd,
+                       profit_target, min_trading_days=0):
+    """
+    Issue de challenges simulés (dernier axe = trades, jours de trades_per_day trades)
+    paths_pct: P&L de chaque trade en % du capital initial (règles statiques)
+    Passage = objectif atteint (et jours minimum) avant breach DD journalier/total
+    Les limites peuvent être des tableaux diffusés sur les axes de tête
+    Retourne passed, breached et le jour (1-based) de l'issue
+    """
+    n_trades = paths_pct.shape[-1]
+    never = n_trades
+    pnl = np.cumsum(paths_pct, axis=-1)
+
+    by_day = paths_pct.reshape(paths_pct.shape[:-1] + (-1, trades_per_day))
+    intraday = np.cumsum(by_day, axis=-1).reshape(paths_pct.shape)
+    breach = (intraday <= -max_daily_dd) | (pnl <= -max_total_dd)
+    first_breach = np.where(breach.any(axis=-1), breach.argmax(axis=-1), never)
+
+    target = pnl >= profit_target
+    first_target = np.where(target.any(axis=-1), target.argmax(axis=-1), never)
+    # Jours minimum: le compte doit survivre jusqu'au dernier jour obligatoire
+    done = np.maximum(first_target, min_trading_days * trades_per_day - 1)
+
+    passed = (first_target < never) & (done < first_breach)
+    breached = ~passed & (first_breach < never)
+    day = np.where(passed, done, np.where(breached, first_breach, never - 1)) // trades_per_day + 1
+    return {'passed': passed, 'breached': breached, 'day': day}
@@ -17,11 +17,18 @@ PROPFIRM_PROFILES = {
         'max_daily_dd': 5.0,
         'max_total_dd': 10.0,
         'profit_target': 10.0,
+        'profit_target_p2': 5.0,
         'min_trading_days': 4,
         'buffer_daily': 0.5,    # Buffer de sécurité recommandé
         'buffer_total': 1.0,
         'challenge_cost': 540,   # EUR pour $100K
         'profit_split': 80,
+        'funded_max_daily_dd': 5.0,  # Règles du compte funded
+        'funded_max_total_dd': 10.0,
+        'scaling_plan': 'ftmo',  # Voir lifecycle_compliance.SCALING_PLANS
+        'news_window_minutes': 2,  # Min avant/après news high impact (0 = autorisé)
+        'weekend_holding': False,
+        'max_sl_pct': None,
         'notes': 'News filter obligatoire, pas de weekend holding'
     },
     'FTMO_SWING': {
@@ -29,11 +36,18 @@ PROPFIRM_PROFILES = {
         'max_daily_dd': 5.0,
         'max_total_dd': 10.0,
         'profit_target': 10.0,
+        'profit_target_p2': 5.0,
         'min_trading_days': 4,
         'buffer_daily': 0.5,
         'buffer_total': 1.0,
         'challenge_cost': 540,
         'profit_split': 80,
+        'funded_max_daily_dd': 5.0,
+        'funded_max_total_dd': 10.0,
+        'scaling_plan': 'ftmo',
+        'news_window_minutes': 0,
+        'weekend_holding': True,
+        'max_sl_pct': None,
         'notes': 'News trading OK, weekend holding OK, leverage 1:30'
     },
     'E8_ONE': {
@@ -41,11 +55,18 @@ PROPFIRM_PROFILES = {
         'max_daily_dd': 5.0,
         'max_total_dd': 6.0,
         'profit_target': 10.0,
+        'profit_target_p2': 0,    # 0 = challenge 1-step
         'min_trading_days': 3,
         'buffer_daily': 0.5,
         'buffer_total': 0.5,
         'challenge_cost': 400,
         'profit_split': 80,
+        'funded_max_daily_dd': 5.0,
+        'funded_max_total_dd': 6.0,
+        'scaling_plan': 'e8',
+        'news_window_minutes': 0,
+        'weekend_holding': True,
+        'max_sl_pct': None,
         'notes': 'DD serré (6%), 1-step rapide'
     },
     'E8_CLASSIC': {
@@ -53,11 +74,18 @@ PROPFIRM_PROFILES = {
         'max_daily_dd': 5.0,
         'max_total_dd': 8.0,
         'profit_target': 8.0,
+        'profit_target_p2': 5.0,
         'min_trading_days': 3,
         'buffer_daily': 0.5,
         'buffer_total': 0.5,
         'challenge_cost': 350,
         'profit_split': 80,
+        'funded_max_daily_dd': 5.0,
+        'funded_max_total_dd': 8.0,
+        'scaling_plan': 'e8',
+        'news_window_minutes': 0,
+        'weekend_holding': True,
+        'max_sl_pct': None,
         'notes': '2-step, target plus accessible'
     },
     'FUNDING_PIPS_1STEP': {
@@ -65,11 +93,18 @@ PROPFIRM_PROFILES = {
         'max_daily_dd': 4.0,
         'max_total_dd': 6.0,
         'profit_target': 10.0,
+        'profit_target_p2': 0,
         'min_trading_days': 3,
         'buffer_daily': 0.5,
         'buffer_total': 0.5,
         'challenge_cost': 400,
         'profit_split': 80,
+        'funded_max_daily_dd': 4.0,
+        'funded_max_total_dd': 6.0,
+        'scaling_plan': None,
+        'news_window_minutes': 0,
+        'weekend_holding': True,
+        'max_sl_pct': None,
         'notes': 'DD journalier le plus strict (4%)'
     },
     'FUNDING_PIPS_2STEP': {
@@ -77,11 +112,18 @@ PROPFIRM_PROFILES = {
         'max_daily_dd': 5.0,
         'max_total_dd': 10.0,
         'profit_target': 8.0,
+        'profit_target_p2': 5.0,
         'min_trading_days': 3,
         'buffer_daily': 0.5,
         'buffer_total': 1.0,
         'challenge_cost': 350,
         'profit_split': 80,
+        'funded_max_daily_dd': 5.0,
+        'funded_max_total_dd': 10.0,
+        'scaling_plan': None,
+        'news_window_minutes': 0,
+        'weekend_holding': True,
+        'max_sl_pct': None,
         'notes': 'Target 8%, conditions plus souples'
     },
     'THE5ERS_BOOTCAMP': {
@@ -89,11 +131,18 @@ PROPFIRM_PROFILES = {
         'max_daily_dd': 100.0,  # Pas de limite en eval
         'max_total_dd': 5.0,
         'profit_target': 6.0,
+        'profit_target_p2': 6.0,
         'min_trading_days': 0,
         'buffer_daily': 0,
         'buffer_total': 0.5,
         'challenge_cost': 250,
         'profit_split': 50,
+        'funded_max_daily_dd': 3.0,
+        'funded_max_total_dd': 4.0,
+        'scaling_plan': None,
+        'news_window_minutes': 0,
+        'weekend_holding': True,
+        'max_sl_pct': 2.0,    # SL obligatoire <= 2% du capital
         'notes': 'ATTENTION: Règle 2% SL obligatoire!'
     },
     'THE5ERS_HIGHSTAKES': {
@@ -101,11 +150,18 @@ PROPFIRM_PROFILES = {
         'max_daily_dd': 5.0,
         'max_total_dd': 10.0,
         'profit_target': 8.0,
+        'profit_target_p2': 5.0,
         'min_trading_days': 3,
         'buffer_daily': 0.5,
         'buffer_total': 1.0,
         'challenge_cost': 495,
         'profit_split': 80,
+        'funded_max_daily_dd': 5.0,
+        'funded_max_total_dd': 10.0,
+        'scaling_plan': None,
+        'news_window_minutes': 0,
+        'weekend_holding': True,
+        'max_sl_pct': None,
         'notes': '2-step classique'
     }
 }
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+PropFirm Risk Optimizer
+Recherche du risque par trade et du stop journalier (BaseRiskPercent / MaxDailyDD
+des .set) qui maximisent la probabilité de passer un challenge, par prop firm
+"""
+
+import time
+
+import numpy as np
+
+from metric_kernels import challenge_outcomes
+from propfirm_validator import PROPFIRM_PROFILES
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+RISK_GRID = (0.1, 0.2, 0.3, 0.4, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0)    # % par trade
+DAILY_STOP_GRID = (1.0, 2.0, 3.0, 4.0, None)                         # % (None = pas de stop EA)
+CHALLENGE_DAYS = 60
+N_PATHS = 2000
+BLOCK_ELEMENTS = 1 << 23    # Trades (profils x risques x stops x chemins) par bloc (borne la mémoire)
+
+#==============================================================================
+# CONVERSION
+#==============================================================================
+
+def r_multiples(profit, risk_amount):
+    """Profits ($) -> R-multiples pour un risque fixe par trade ($)"""
+    return np.asarray(profit, dtype=np.float64) / risk_amount
+
+
+def sample_paths(r, trades_per_day, n_paths=N_PATHS, days=CHALLENGE_DAYS, seed=42):
+    """Chemins bootstrap de R-multiples (chemins x jours x trades/jour)"""
+    rng = np.random.default_rng(seed)
+    r = np.asarray(r, dtype=np.float64)
+    return r[rng.integers(0, len(r), size=(n_paths, days, trades_per_day))]
+
+#==============================================================================
+# NOYAU
+#==============================================================================
+
+def apply_daily_stop(paths_pct, stops):
+    """
+    Stop journalier de l'EA: plus de trade dans la journée après une perte
+    cumulée >= stop (le trade qui franchit le seuil est compté)
+    paths_pct: (... x chemins x jours x trades); stops: (S,)
+    -> (... x S x chemins x jours x trades)
+    """
+    stops = np.where(np.isnan(stops), np.inf, stops)
+    stops = stops.reshape((1,) * (paths_pct.ndim - 3) + (-1, 1, 1, 1))
+    paths_pct = paths_pct[..., None, :, :, :]
+    intraday = np.cumsum(paths_pct, axis=-1)
+    hit = intraday <= -stops
+    stopped = np.logical_or.accumulate(hit, axis=-1)
+    stopped[..., 1:] = stopped[..., :-1].copy()
+    stopped[..., 0] = False
+    return np.where(stopped, 0.0, paths_pct)
+
+
+def evaluate_grid(paths_r, risks=RISK_GRID, stops=DAILY_STOP_GRID, profiles=None):
+    """
+    Evalue toute la grille risque x stop x profil sur les mêmes chemins
+    (nombres aléatoires communs: les écarts viennent des paramètres, pas du tirage)
+    Retourne des tableaux (risques x stops x profils)
+    """
+    profiles = profiles or list(PROPFIRM_PROFILES.keys())
+    risks = np.asarray(risks, dtype=np.float64)
+    stops = np.array([np.nan if s is None else s for s in stops], dtype=np.float64)
+    n_paths, days, tpd = paths_r.shape
+
+    # Limites des profils en axe de tête: (profils x 1 x 1 x 1 [x 1])
+    limits = {key: np.array([PROPFIRM_PROFILES[name][key] for name in profiles], dtype=np.float64)
+              for key in ('max_daily_dd', 'max_total_dd', 'profit_target', 'min_trading_days')}
+    per_trade = {key: v.reshape(-1, 1, 1, 1, 1) for key, v in limits.items()}
+    min_days = limits['min_trading_days'].astype(np.int64).reshape(-1, 1, 1, 1)
+
+    shape = (len(profiles), len(risks), len(stops))
+    passed = np.zeros(shape)
+    breached = np.zeros(shape)
+    days_sum = np.zeros(shape)
+
+    chunk_size = max(1, BLOCK_ELEMENTS // (len(profiles) * len(risks) * len(stops) * days * tpd))
+    for start in range(0, n_paths, chunk_size):
+        chunk = paths_r[start:start + chunk_size]
+        # R-multiples -> P&L en % du capital initial (risques en axe de tête),
+        # puis stop journalier de l'EA: (risques x stops x chemins x trades)
+        taken = apply_daily_stop(chunk[None] * risks[:, None, None, None], stops)
+        taken = taken.reshape(len(risks), len(stops), len(chunk), days * tpd)
+        # Tous les profils en une passe: (profils x risques x stops x chemins)
+        out = challenge_outcomes(taken[None], tpd, per_trade['max_daily_dd'], per_trade['max_total_dd'],
+                                 per_trade['profit_target'], min_days)
+        passed += out['passed'].sum(axis=-1)
+        breached += out['breached'].sum(axis=-1)
+        days_sum += np.where(out['passed'], out['day'], 0).sum(axis=-1)
+
+    # (profils x risques x stops) -> (risques x stops x profils)
+    passed, breached, days_sum = (np.moveaxis(a, 0, -1) for a in (passed, breached, days_sum))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_to_target = np.where(passed > 0, days_sum / passed, np.nan)
+    return {
+        'risks': risks,
+        'stops': stops,
+        'profiles': profiles,
+        'pass_probability': passed / n_paths * 100,
+        'breach_probability': breached / n_paths * 100,
+        'days_to_target': days_to_target
+    }
+
+
+def optimal_settings(grid, max_breach=None):
+    """
+    Meilleur couple (risque, stop) par profil: probabilité de passage maximale,
+    puis moins de breach, puis passage le plus rapide, puis risque le plus faible
+    max_breach: plafond de probabilité de breach (%) optionnel
+    """
+    best = {}
+    for k, name in enumerate(grid['profiles']):
+        p_pass = grid['pass_probability'][:, :, k]
+        p_breach = grid['breach_probability'][:, :, k]
+        score = np.where(np.isnan(p_pass), -1, p_pass)
+        if max_breach is not None:
+            score = np.where(p_breach <= max_breach, score, -1)
+        days = np.nan_to_num(grid['days_to_target'][:, :, k], nan=np.inf)
+        # Tri lexicographique: pass desc, breach asc, jours asc, risque asc
+        order = np.lexsort((np.arange(score.size), days.ravel(), p_breach.ravel(), -score.ravel()))
+        i, j = np.unravel_index(order[0], score.shape)
+        stop = grid['stops'][j]
+        best[name] = {
+            'risk_percent': float(grid['risks'][i]),
+            'daily_stop': None if np.isnan(stop) else float(stop),
+            'pass_probability': float(p_pass[i, j]),
+            'breach_probability': float(p_breach[i, j]),
+            'days_to_target': float(grid['days_to_target'][i, j, k]),
+            'feasible': bool(score[i, j] >= 0)
+        }
+    return best
+
+
+def optimize_risk(r, trades_per_day, risks=RISK_GRID, stops=DAILY_STOP_GRID, profiles=None,
+                  n_paths=N_PATHS, days=CHALLENGE_DAYS, max_breach=None, seed=42):
+    """Sweep complet: chemins bootstrap, grille, optimum par profil"""
+    paths = sample_paths(r, trades_per_day, n_paths, days, seed)
+    grid = evaluate_grid(paths, risks, stops, profiles)
+    grid['optimal'] = optimal_settings(grid, max_breach)
+    return grid
+
+#==============================================================================
+# RAPPORT
+#==============================================================================
+
+def print_optimizer_report(grid):
+    """Affiche l'optimum par profil et la ligne .set correspondante"""
+    print("\n" + "=" * 86)
+    print("                      RISK-PER-TRADE OPTIMIZER")
+    print("=" * 86)
+    print(f"\n{'PropFirm':<25} {'Risk':<7} {'DailyStop':<10} {'Pass %':<9} {'Breach %':<10} {'Days':<7} {'.set'}")
+    print("-" * 86)
+    for name, best in grid['optimal'].items():
+        stop = f"{best['daily_stop']:.1f}" if best['daily_stop'] is not None else "-"
+        days = f"{best['days_to_target']:.1f}" if np.isfinite(best['days_to_target']) else "-"
+        set_line = f"BaseRiskPercent={best['risk_percent']}"
+        if best['daily_stop'] is not None:
+            set_line += f" MaxDailyDD={best['daily_stop']}"
+        flag = "" if best['feasible'] else " ⚠️"
+        print(f"{PROPFIRM_PROFILES[name]['name']:<25} {best['risk_percent']:<7.2f} {stop:<10} "
+              f"{best['pass_probability']:<9.1f} {best['breach_probability']:<10.1f} {days:<7} {set_line}{flag}")
+    print("=" * 86 + "\n")
+
+
+def main():
+    """Démonstration: R-multiples d'un scalper simulé (12 trades/jour)"""
+    from analyze_backtest import generate_sample_trades
+
+    trades = generate_sample_trades(num_trades=2000, win_rate=0.47, avg_rr=1.3)
+    r = r_multiples([t['profit'] for t in trades], risk_amount=100)
+
+    started = time.perf_counter()
+    grid = optimize_risk(r, trades_per_day=12, max_breach=10)
+    elapsed = time.perf_counter() - started
+    n_combos = len(grid['risks']) * len(grid['stops']) * len(grid['profiles'])
+    print(f"\n{n_combos} combinaisons x {N_PATHS} chemins évaluées en {elapsed:.1f}s")
+    print_optimizer_report(grid)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+PropFirm Rule Auditor
+Audit trade par trade des règles que le validateur ne vérifie pas:
+news filter (calendrier économique local), weekend holding, fenêtre de
+rollover et plafond de risque par trade (règle 2% SL The5ers)
+
+Calendrier indexé en tableaux triés par devise: chaque recherche est un
+searchsorted, des millions de trades s'auditent en quelques secondes
+
+Format du calendrier (CSV): time,currency,impact,event
+    2024.01.05 13:30:00,USD,High,Non-Farm Payrolls
+"""
+
+import csv
+import time
+
+import numpy as np
+
+from compliance_monitor import parse_time
+from exposure_analyzer import trade_risk
+from propfirm_validator import PROPFIRM_PROFILES
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+ROLLOVER_MINUTES = (5, 15)      # Avant/après minuit serveur: spreads élargis
+SL_DEADLINE_SECONDS = 180       # The5ers: SL posé dans les 3 minutes
+MAX_SL_VIOLATIONS = 5           # The5ers: 5 violations = compte fermé
+
+CHECKS = ('news', 'weekend', 'rollover', 'risk_cap', 'sl_late')
+
+#==============================================================================
+# CALENDRIER ECONOMIQUE
+#==============================================================================
+
+class NewsCalendar:
+    def __init__(self, times, currencies):
+        """
+        Index des événements: un tableau datetime64[s] trié par devise
+        times: datetime64 (heure du calendrier), currencies: codes devise
+        """
+        times = np.asarray(times, dtype='datetime64[s]')
+        currencies = np.asarray(currencies, dtype=str)
+        self.all = np.sort(times)
+        self.by_currency = {
+            c: np.sort(times[currencies == c]) for c in np.unique(currencies)
+        }
+
+    @classmethod
+    def load(cls, path, impact=('High',), offset_hours=0):
+        """
+        Charge un calendrier CSV, filtré par impact
+        offset_hours: décalage calendrier -> heure des trades (ex: +2 UTC -> serveur)
+        """
+        times = []
+        currencies = []
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                if impact and row['impact'].strip() not in impact:
+                    continue
+                times.append(parse_time(row['time']))
+                currencies.append(row['currency'].strip().upper())
+        times = np.array(times, dtype='datetime64[s]') + np.timedelta64(int(offset_hours * 3600), 's')
+        return cls(times, currencies)
+
+    def __len__(self):
+        return len(self.all)
+
+    @staticmethod
+    def _distance(events, t):
+        """Distance (s) de chaque instant à l'événement le plus proche"""
+        if events.size == 0:
+            return np.full(t.shape, np.inf)
+        idx = np.searchsorted(events, t)
+        before = events[np.maximum(idx - 1, 0)]
+        after = events[np.minimum(idx, len(events) - 1)]
+        gap_before = np.abs((t - before).astype(np.float64))
+        gap_after = np.abs((after - t).astype(np.float64))
+        return np.minimum(gap_before, gap_after)
+
+    def distance(self, t, currencies=None):
+        """
+        Distance à la news la plus proche; currencies: devises concernées par
+        trade (tableau (n, 2) de codes) ou None pour toutes les news
+        """
+        t = np.asarray(t, dtype='datetime64[s]')
+        if currencies is None:
+            return self._distance(self.all, t)
+        result = np.full(t.shape, np.inf)
+        for code, events in self.by_currency.items():
+            mask = (currencies == code).any(axis=1)
+            if mask.any():
+                result[mask] = np.minimum(result[mask], self._distance(events, t[mask]))
+        return result
+
+#==============================================================================
+# CONTROLES VECTORISES
+#==============================================================================
+
+def _trade_currencies(columns):
+    """Devises de base/cotation de chaque trade (n, 2) ou None sans symbole"""
+    if 'symbol_code' in columns:
+        names = [str(s) for s in columns['symbols']]
+        pairs = np.array([[s[:3], s[3:6]] for s in names])
+        return pairs[columns['symbol_code']]
+    if 'symbol' in columns:
+        symbols = np.asarray(columns['symbol'], dtype=str)
+        names, codes = np.unique(symbols, return_inverse=True)
+        return np.array([[s[:3], s[3:6]] for s in names])[codes]
+    return None
+
+
+def weekend_held(open_time, close_time):
+    """Position ouverte pendant un samedi ou dimanche (heure serveur)"""
+    open_day = np.asarray(open_time, dtype='datetime64[s]').astype('datetime64[D]')
+    close_day = np.asarray(close_time, dtype='datetime64[s]').astype('datetime64[D]')
+    # Jours de week-end dans [open, close]
+    return np.busday_count(open_day, np.maximum(close_day, open_day) + 1, weekmask='0000011') > 0
+
+
+def in_rollover(t, window=ROLLOVER_MINUTES):
+    """Instant dans la fenêtre [minuit - avant, minuit + après] serveur"""
+    seconds = np.asarray(t, dtype='datetime64[s]').astype(np.int64) % 86400
+    return (seconds >= 86400 - window[0] * 60) | (seconds < window[1] * 60)
+
+
+def audit_trades(columns, calendar=None, initial_balance=100000, default_volume=1.0):
+    """
+    Contrôles trade par trade (tableaux booléens de longueur n), indépendants du profil
+    columns: 'time' (clôture), 'profit', optionnels 'open_time', 'risk'/'sl_pips' (NaN = sans SL),
+    'sl_delay' (secondes avant pose du SL), symboles
+    """
+    n = len(columns['profit'])
+    close_time = np.asarray(columns['time'], dtype='datetime64[s]')
+    open_time = np.asarray(columns.get('open_time', close_time), dtype='datetime64[s]')
+    result = {'news_distance': np.full(n, np.inf)}
+
+    if calendar is not None and len(calendar):
+        currencies = _trade_currencies(columns)
+        result['news_distance'] = np.minimum(calendar.distance(open_time, currencies),
+                                             calendar.distance(close_time, currencies))
+
+    result['weekend'] = weekend_held(open_time, close_time)
+    result['rollover'] = in_rollover(open_time)
+
+    if 'risk' in columns or 'sl_pips' in columns:
+        result['risk_pct'] = trade_risk(columns, default_volume) / initial_balance * 100
+    else:
+        result['risk_pct'] = np.full(n, np.nan)
+    if 'sl_delay' in columns:
+        result['sl_late'] = np.asarray(columns['sl_delay'], dtype=np.float64) > SL_DEADLINE_SECONDS
+    else:
+        result['sl_late'] = np.zeros(n, dtype=bool)
+    return result
+
+
+def profile_violations(audit, rules):
+    """Violations d'un profil: dict check -> booléens par trade (checks applicables)"""
+    violations = {}
+    if rules.get('news_window_minutes'):
+        violations['news'] = audit['news_distance'] <= rules['news_window_minutes'] * 60
+    if not rules.get('weekend_holding', True):
+        violations['weekend'] = audit['weekend']
+    if rules.get('max_sl_pct') is not None:
+        # SL obligatoire: un trade sans SL (risque inconnu, NaN) viole le plafond
+        violations['risk_cap'] = ~(audit['risk_pct'] <= rules['max_sl_pct'])
+        violations['sl_late'] = audit['sl_late']
+    violations['rollover'] = audit['rollover']      # Avertissement pour tous les profils
+    return violations
+
+
+def audit_profiles(columns, calendar=None, profiles=None, initial_balance=100000, default_volume=1.0):
+    """Audit complet: contrôles une seule fois, puis résumé par profil"""
+    profiles = profiles or list(PROPFIRM_PROFILES.keys())
+    audit = audit_trades(columns, calendar, initial_balance, default_volume=default_volume)
+    profit = np.asarray(columns['profit'], dtype=np.float64)
+
+    summaries = {}
+    for name in profiles:
+        rules = PROPFIRM_PROFILES[name]
+        violations = profile_violations(audit, rules)
+        blocking = [c for c in violations if c != 'rollover']
+        any_violation = (np.logical_or.reduce([violations[c] for c in blocking])
+                         if blocking else np.zeros(len(profit), dtype=bool))
+        # Un trade qui viole les deux règles SL ne compte qu'une fois
+        sl_count = int((violations['risk_cap'] | violations['sl_late']).sum()) if 'risk_cap' in violations else 0
+        summaries[name] = {
+            'counts': {c: int(v.sum()) for c, v in violations.items()},
+            'violating_trades': int(any_violation.sum()),
+            'violating_profit': float(profit[any_violation].sum()),
+            'first_violation': int(any_violation.argmax()) if any_violation.any() else None,
+            'terminated': sl_count >= MAX_SL_VIOLATIONS,
+            'violations': violations
+        }
+    return {'audit': audit, 'profiles': summaries}
+
+
+def violation_table(result, profile, include_warnings=False):
+    """
+    Table des trades en violation d'un profil: indices + checks violés
+    (bitmask sur CHECKS); rollover seulement si include_warnings
+    """
+    violations = result['profiles'][profile]['violations']
+    mask = np.zeros(len(result['audit']['weekend']), dtype=np.int16)
+    for bit, check in enumerate(CHECKS):
+        if check == 'rollover' and not include_warnings:
+            continue
+        if check in violations:
+            mask |= violations[check].astype(np.int16) << bit
+    index = np.flatnonzero(mask)
+    return {'trade': index, 'mask': mask[index], 'checks': CHECKS}
+
+
+def print_audit_report(result, n_trades):
+    """Résumé des violations par profil"""
+    print("\n" + "=" * 88)
+    print("                          TRADE-LEVEL RULE AUDIT")
+    print("=" * 88)
+    print(f"Trades audités: {n_trades:,}")
+    print(f"\n{'PropFirm':<25} {'News':>8} {'Weekend':>8} {'SL>cap':>8} {'SL tard':>8} "
+          f"{'Rollover':>9} {'Profit concerné':>16}  Statut")
+    print("-" * 88)
+    for name, summary in result['profiles'].items():
+        counts = summary['counts']
+        cell = lambda c: f"{counts[c]:>8,}" if c in counts else f"{'-':>8}"
+        if summary['terminated']:
+            status = "✗ TERMINATED"
+        elif summary['violating_trades']:
+            status = "⚠️ VIOLATIONS"
+        else:
+            status = "✓ OK"
+        print(f"{PROPFIRM_PROFILES[name]['name']:<25} {cell('news')} {cell('weekend')} {cell('risk_cap')} "
+              f"{cell('sl_late')} {counts['rollover']:>9,} ${summary['violating_profit']:>15,.0f}  {status}")
+    print("=" * 88 + "\n")
+
+#==============================================================================
+# MAIN
+#==============================================================================
+
+def write_sample_calendar(path, start='2024-01-01', years=30, seed=0):
+    """Calendrier synthétique: NFP, CPI, FOMC, BCE, BoE, BoJ (heures UTC)"""
+    rng = np.random.default_rng(seed)
+    months = np.arange(np.datetime64(start, 'M'), np.datetime64(start, 'M') + 12 * years)
+    first_days = months.astype('datetime64[D]')
+    events = [
+        ('USD', 'Non-Farm Payrolls', np.busday_offset(first_days, 0, roll='forward', weekmask='Fri'), '13:30'),
+        ('USD', 'CPI m/m', np.busday_offset(first_days, 8, roll='forward'), '13:30'),
+        ('USD', 'FOMC Statement', np.busday_offset(first_days, 12, roll='forward', weekmask='Wed'), '19:00'),
+        ('EUR', 'ECB Rate Decision', np.busday_offset(first_days, 10, roll='forward', weekmask='Thu'), '13:15'),
+        ('GBP', 'BoE Rate Decision', np.busday_offset(first_days, 14, roll='forward', weekmask='Thu'), '12:00'),
+        ('JPY', 'BoJ Rate Decision', np.busday_offset(first_days, 16, roll='forward'), '03:00')
+    ]
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['time', 'currency', 'impact', 'event'])
+        for currency, name, days, hour in events:
+            for day in days:
+                impact = 'High' if rng.random() < 0.9 else 'Medium'
+                writer.writerow([f"{str(day).replace('-', '.')} {hour}:00", currency, impact, name])
+
+
+def main():
+    """Démonstration: 2M trades synthétiques audités contre un calendrier local"""
+    import os
+    import tempfile
+
+    from trade_generator import SYMBOLS, generate_trades
+
+    n = 2_000_000
+    columns = generate_trades(n, symbols=SYMBOLS, trades_per_day=250, seed=5)
+    rng = np.random.default_rng(5)
+    held = rng.exponential(30 * 60, size=n) + (rng.random(n) < 0.01) * rng.exponential(3 * 86400, size=n)
+    columns['open_time'] = columns['time'] - held.astype('timedelta64[s]')
+    columns['sl_pips'] = rng.choice([5.0, 6.0, 7.0, 150.0], size=n, p=[0.4, 0.3, 0.29999, 0.00001])
+    columns['volume'] = np.full(n, 1.5)
+    columns['sl_delay'] = rng.exponential(5, size=n)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'calendar.csv')
+        write_sample_calendar(path)
+        calendar = NewsCalendar.load(path, offset_hours=2)     # Serveur UTC+2
+
+    started = time.perf_counter()
+    result = audit_profiles(columns, calendar)
+    print(f"\n{len(calendar)} news high impact, audit en {time.perf_counter() - started:.2f}s")
+    print_audit_report(result, n)
+
+    table = violation_table(result, 'FTMO')
+    print(f"FTMO: {len(table['trade']):,} trades en violation, premiers: {table['trade'][:5].tolist()}")
+
+
+if __name__ == "__main__":
+    main()
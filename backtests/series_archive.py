@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+PropFirm Series Archive
+Archive compacte des trades et courbes d'équité (.pfa): colonnes encodées
+(delta entier pour les dates, float64 brut par défaut, float32 ou virgule fixe
+delta sur demande pour les montants),
+compressées par blocs avec un index de blocs pour la lecture par plage
+sans décompresser tout le fichier
+
+Format:
+    [magic 8o] [blocs compressés ...] [index JSON] [taille index uint64] [magic 8o]
+"""
+
+import json
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+MAGIC = b'PFARC01\x00'
+CHUNK_ROWS = 65536
+COMPRESSION_LEVEL = 6
+DECIMALS = 2            # Encodage 'fixed' (montants): précision au cent
+
+# Encodages conseillés pour les colonnes monétaires (opt-in: arrondi au cent)
+CURRENCY_ENCODINGS = {'profit': 'fixed', 'balance': 'fixed', 'equity': 'fixed'}
+
+#==============================================================================
+# ENCODAGES
+#==============================================================================
+
+def _shuffle(data):
+    """Regroupe les octets de même rang (meilleure compression des entiers proches)"""
+    return data.view(np.uint8).reshape(-1, data.dtype.itemsize).T.tobytes()
+
+
+def _unshuffle(raw, dtype, n):
+    dtype = np.dtype(dtype)
+    return np.frombuffer(raw, dtype=np.uint8).reshape(dtype.itemsize, n).T.copy().view(dtype).ravel()
+
+
+def _narrow(deltas):
+    """int64 -> int32 quand les deltas le permettent"""
+    info = np.iinfo(np.int32)
+    if deltas.size == 0 or (deltas.min() >= info.min and deltas.max() <= info.max):
+        return deltas.astype(np.int32)
+    return deltas
+
+
+def default_encoding(values):
+    """
+    Encodage par défaut selon le dtype de la colonne: sans perte
+    'fixed' (cents) et 'float32' ne s'appliquent que sur demande
+    """
+    if values.dtype.kind == 'M':
+        return 'time'
+    return 'raw'
+
+
+def encode_chunk(values, encoding, decimals=DECIMALS):
+    """Encode un bloc de colonne -> (octets compressés, métadonnées du bloc)"""
+    meta = {'encoding': encoding}
+    if encoding == 'time':
+        ints = values.astype('datetime64[s]').astype(np.int64)
+        meta['first'] = int(ints[0]) if ints.size else 0
+        data = _narrow(np.diff(ints))
+    elif encoding == 'fixed':
+        if not np.isfinite(values).all():
+            raise ValueError("Encodage 'fixed': valeurs non finies (NaN/inf), utiliser 'raw'")
+        ints = np.round(values.astype(np.float64) * 10 ** decimals).astype(np.int64)
+        meta['first'] = int(ints[0]) if ints.size else 0
+        meta['decimals'] = decimals
+        data = _narrow(np.diff(ints))
+    elif encoding == 'float32':
+        data = values.astype(np.float32)
+    elif encoding == 'raw':
+        data = np.ascontiguousarray(values)
+    else:
+        raise ValueError(f"Encodage inconnu: {encoding}")
+    meta['dtype'] = data.dtype.str
+    return zlib.compress(_shuffle(data), COMPRESSION_LEVEL), meta
+
+
+def decode_chunk(raw, meta, n, dtype):
+    """Décode un bloc (n lignes) vers le dtype d'origine de la colonne"""
+    encoding = meta['encoding']
+    count = n - 1 if encoding in ('time', 'fixed') else n
+    data = _unshuffle(zlib.decompress(raw), meta['dtype'], max(count, 0))
+    if encoding in ('time', 'fixed'):
+        ints = np.empty(n, dtype=np.int64)
+        if n:
+            ints[0] = 0
+            np.cumsum(data, out=ints[1:])
+            ints += meta['first']
+        if encoding == 'time':
+            return ints.astype('datetime64[s]')
+        return (ints / 10 ** meta['decimals']).astype(dtype)
+    return data.astype(dtype, copy=False)
+
+#==============================================================================
+# ECRITURE
+#==============================================================================
+
+def write_archive(path, tables, encodings=None, chunk_rows=CHUNK_ROWS, decimals=DECIMALS):
+    """
+    Ecrit des tables colonnaires {nom: {colonne: tableau}} dans une archive
+    Chaque table doit avoir une colonne 'time' triée (index des plages)
+    encodings: {table: {colonne: 'time'|'fixed'|'float32'|'raw'}} optionnel
+    (défaut: 'time' pour les dates, 'raw' sinon; voir CURRENCY_ENCODINGS)
+    Toutes les colonnes doivent avoir la longueur de 'time'
+    """
+    encodings = encodings or {}
+    index = {'version': 1, 'codec': 'zlib', 'tables': {}}
+
+    tmp_path = path + '.tmp'    # Pas d'archive partielle si une table est rejetée
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            for table, columns in tables.items():
+                columns = {k: np.asarray(v) for k, v in columns.items() if np.ndim(v) == 1}
+                n = len(columns['time'])
+                wrong = {c: len(v) for c, v in columns.items() if len(v) != n}
+                if wrong:
+                    raise ValueError(f"Table {table}: longueurs différentes de 'time' ({n}): {wrong}")
+                times = columns['time'].astype('datetime64[s]').astype(np.int64)
+                if n and (np.diff(times) < 0).any():
+                    raise ValueError(f"Table {table}: colonne 'time' non triée")
+                spec = {
+                    'rows': n,
+                    'columns': {c: {'dtype': v.dtype.str,
+                                    'encoding': encodings.get(table, {}).get(c, default_encoding(v))}
+                                for c, v in columns.items()},
+                    'chunks': []
+                }
+                for start in range(0, n, chunk_rows):
+                    stop = min(start + chunk_rows, n)
+                    chunk = {'start': start, 'rows': stop - start,
+                             'time_min': int(times[start]), 'time_max': int(times[stop - 1]),
+                             'columns': {}}
+                    for name, values in columns.items():
+                        raw, meta = encode_chunk(values[start:stop], spec['columns'][name]['encoding'], decimals)
+                        meta['offset'] = f.tell()
+                        meta['size'] = len(raw)
+                        f.write(raw)
+                        chunk['columns'][name] = meta
+                    spec['chunks'].append(chunk)
+                index['tables'][table] = spec
+
+            payload = json.dumps(index, separators=(',', ':')).encode()
+            f.write(payload)
+            f.write(struct.pack('<Q', len(payload)))
+            f.write(MAGIC)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+#==============================================================================
+# LECTURE
+#==============================================================================
+
+class SeriesArchive:
+    def __init__(self, path):
+        """Ouvre une archive: seul l'index est lu"""
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Archive invalide: {path}")
+            f.seek(-len(MAGIC) - 8, os.SEEK_END)
+            size = struct.unpack('<Q', f.read(8))[0]
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Archive tronquée: {path}")
+            f.seek(-len(MAGIC) - 8 - size, os.SEEK_END)
+            self.index = json.loads(f.read(size))
+
+        # Bornes temporelles des blocs en tableaux pour searchsorted
+        self._bounds = {
+            table: (np.array([c['time_min'] for c in spec['chunks']], dtype=np.int64),
+                    np.array([c['time_max'] for c in spec['chunks']], dtype=np.int64))
+            for table, spec in self.index['tables'].items()
+        }
+
+    @property
+    def tables(self):
+        return list(self.index['tables'].keys())
+
+    def columns(self, table):
+        return list(self.index['tables'][table]['columns'].keys())
+
+    def rows(self, table):
+        return self.index['tables'][table]['rows']
+
+    def _read_chunks(self, table, chunk_ids, columns):
+        spec = self.index['tables'][table]
+        columns = columns or list(spec['columns'].keys())
+        parts = {c: [] for c in columns}
+        with open(self.path, 'rb') as f:
+            for i in chunk_ids:
+                chunk = spec['chunks'][i]
+                for name in columns:
+                    meta = chunk['columns'][name]
+                    f.seek(meta['offset'])
+                    raw = f.read(meta['size'])
+                    parts[name].append(decode_chunk(raw, meta, chunk['rows'], spec['columns'][name]['dtype']))
+        return {
+            c: (np.concatenate(p) if p else np.zeros(0, dtype=np.dtype(spec['columns'][c]['dtype'])))
+            for c, p in parts.items()
+        }
+
+    def read(self, table, start=None, end=None, columns=None):
+        """
+        Lignes dont 'time' est dans [start, end] (datetime64 ou ISO; None = ouvert)
+        Seuls les blocs qui recoupent la plage sont lus et décompressés
+        """
+        time_min, time_max = self._bounds[table]
+        lo = -np.inf if start is None else np.datetime64(start, 's').astype(np.int64)
+        hi = np.inf if end is None else np.datetime64(end, 's').astype(np.int64)
+        # Blocs triés: premier bloc dont time_max >= lo, dernier dont time_min <= hi
+        first = int(np.searchsorted(time_max, lo, side='left'))
+        last = int(np.searchsorted(time_min, hi, side='right'))
+        wanted = None if columns is None else list(dict.fromkeys(['time'] + list(columns)))
+        data = self._read_chunks(table, range(first, last), wanted)
+
+        t = data['time'].astype(np.int64)
+        i0 = np.searchsorted(t, lo, side='left')
+        i1 = np.searchsorted(t, hi, side='right')
+        return {c: v[i0:i1] for c, v in data.items() if columns is None or c in columns or c == 'time'}
+
+    def read_rows(self, table, start=0, stop=None, columns=None):
+        """Lignes [start, stop) par position"""
+        spec = self.index['tables'][table]
+        stop = spec['rows'] if stop is None else min(stop, spec['rows'])
+        starts = np.array([c['start'] for c in spec['chunks']], dtype=np.int64)
+        first = max(int(np.searchsorted(starts, start, side='right')) - 1, 0)
+        last = int(np.searchsorted(starts, stop, side='left'))
+        data = self._read_chunks(table, range(first, last), columns)
+        offset = int(starts[first]) if len(starts) else 0
+        return {c: v[start - offset:stop - offset] for c, v in data.items()}
+
+    def size_bytes(self):
+        return os.path.getsize(self.path)
+
+#==============================================================================
+# PONT VERS L'ANALYSEUR
+#==============================================================================
+
+def columns_to_trades(columns):
+    """Colonnes -> liste de dicts (format BacktestAnalyzer.load_from_list)"""
+    dates = columns['time'].astype('datetime64[us]').tolist()
+    profits = columns['profit'].tolist()
+    if 'side' in columns:
+        types = np.where(columns['side'] > 0, 'BUY', 'SELL').tolist()
+        return [{'date': d, 'profit': p, 'type': t} for d, p, t in zip(dates, profits, types)]
+    return [{'date': d, 'profit': p} for d, p in zip(dates, profits)]
+
+
+def plot_equity_series(path, table='equity', start=None, end=None, save_path=None):
+    """Trace une courbe d'équité archivée (plage lue directement dans l'archive)"""
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib requis pour les graphiques")
+        return
+
+    data = SeriesArchive(path).read(table, start, end)
+    fig, ax = plt.subplots(figsize=(14, 6))
+    ax.plot(data['time'], data['equity'], 'b-', linewidth=0.8, label='Equity')
+    if 'balance' in data:
+        ax.plot(data['time'], data['balance'], 'g-', linewidth=0.8, alpha=0.6, label='Balance')
+    ax.set_title(f"Equity ({os.path.basename(path)})")
+    ax.set_ylabel('Equity ($)')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    plt.tight_layout()
+    if save_path:
+        plt.savefig(save_path, dpi=150, bbox_inches='tight')
+        print(f"Graphique sauvegardé: {save_path}")
+    else:
+        plt.show()
+    plt.close()
+
+#==============================================================================
+# MAIN
+#==============================================================================
+
+def main():
+    """Démonstration: 1 compte, 5 ans d'équité à la minute + 200k trades"""
+    import pickle
+    import tempfile
+
+    import pandas as pd
+
+    from trade_generator import SYMBOLS, generate_trades
+
+    trades = generate_trades(200_000, symbols=SYMBOLS, trades_per_day=150, seed=11)
+    trades = {k: v for k, v in trades.items() if k != 'symbols'}
+    trades['profit'] = np.round(trades['profit'], 2)
+
+    # Equité minute par minute (heures de marché): balance + flottant
+    minutes = np.arange(np.datetime64('2024-01-01T00:00'), np.datetime64('2029-01-01T00:00'),
+                        dtype='datetime64[m]')
+    minutes = minutes[np.is_busday(minutes.astype('datetime64[D]'))].astype('datetime64[s]')
+    rng = np.random.default_rng(11)
+    balance = 100000 + np.round(np.cumsum(np.where(rng.random(len(minutes)) < 0.01, rng.normal(3, 60, len(minutes)), 0)), 2)
+    equity = np.round(balance + rng.normal(0, 25, size=len(minutes)), 2)
+    equity_table = {'time': minutes, 'balance': balance, 'equity': equity}
+
+    print("\n" + "=" * 70)
+    print("                 SERIES ARCHIVE - BENCHMARK")
+    print("=" * 70)
+    print(f"Trades: {len(trades['time']):,}  |  Points d'équité: {len(minutes):,}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = os.path.join(tmp, 'ACC0001.pfa')
+        csv_path = os.path.join(tmp, 'equity.csv')
+        pkl_path = os.path.join(tmp, 'account.pkl')
+
+        started = time.perf_counter()
+        write_archive(archive, {'trades': trades, 'equity': equity_table},
+                      encodings={'trades': CURRENCY_ENCODINGS, 'equity': CURRENCY_ENCODINGS})
+        write_time = time.perf_counter() - started
+
+        frames = {'trades': pd.DataFrame(trades), 'equity': pd.DataFrame(equity_table)}
+        frames['equity'].to_csv(csv_path, index=False)
+        frames['trades'].to_csv(csv_path + '.trades', index=False)
+        with open(pkl_path, 'wb') as f:
+            pickle.dump(frames, f)
+
+        csv_size = os.path.getsize(csv_path) + os.path.getsize(csv_path + '.trades')
+        sizes = {'archive .pfa': os.path.getsize(archive), 'CSV': csv_size,
+                 'pickle pandas': os.path.getsize(pkl_path)}
+        print(f"\n{'Format':<16} {'Taille':>12} {'Ratio':>8}")
+        for name, size in sizes.items():
+            print(f"{name:<16} {size / 1e6:>10.1f}MB {size / sizes['archive .pfa']:>7.1f}x")
+        print(f"Ecriture archive: {write_time:.2f}s")
+
+        started = time.perf_counter()
+        pd.read_csv(csv_path, parse_dates=['time'])
+        csv_time = time.perf_counter() - started
+        started = time.perf_counter()
+        reader = SeriesArchive(archive)
+        full = reader.read('equity')
+        full_time = time.perf_counter() - started
+        started = time.perf_counter()
+        month = reader.read('equity', '2026-03-01', '2026-03-31T23:59:59')
+        range_time = time.perf_counter() - started
+
+        print(f"\nLecture équité complète: archive {full_time * 1000:.0f}ms  vs  CSV {csv_time * 1000:.0f}ms")
+        print(f"Lecture d'un mois (plage): {range_time * 1000:.1f}ms ({len(month['time']):,} points)")
+        print(f"Exactitude (cents): {np.array_equal(full['equity'], equity)}  "
+              f"dates: {np.array_equal(full['time'], minutes)}")
+
+        from analyze_backtest import BacktestAnalyzer
+        analyzer = BacktestAnalyzer()
+        started = time.perf_counter()
+        analyzer.load_archive(archive, start='2025-01-01', end='2025-12-31T23:59:59')
+        analyzer.calculate_metrics()
+        print(f"Analyseur sur 2025 (depuis l'archive): {time.perf_counter() - started:.2f}s, "
+              f"{analyzer.metrics['total_trades']:,} trades, PF {analyzer.metrics['profit_factor']:.2f}")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
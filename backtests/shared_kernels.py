@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+PropFirm Shared Kernels
+Lot de sets de trades dans un seul buffer colonnaire en mémoire partagée
+(multiprocessing.shared_memory): les workers s'y attachent par nom une fois,
+puis traitent des segments de sets (equity, DD, bucketing journalier, ratios,
+conformité) sans pickling ni copie, et écrivent leurs résultats en place
+
+Seules les bornes (début, fin) des segments transitent par le pool
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from metric_kernels import (
+    WEEKMASK, calendar_metrics, compliance_kernel, server_days, sort_by_time, trading_calendar
+)
+from propfirm_validator import PROPFIRM_PROFILES
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+ALIGN = 64                  # Colonnes alignées sur une ligne de cache
+SEGMENTS_PER_WORKER = 4     # Equilibrage de charge (sets de longueurs inégales)
+
+# Métriques écrites dans le buffer de résultats (ordre des colonnes)
+METRIC_FIELDS = (
+    'total_trades', 'winning_trades', 'losing_trades', 'win_rate',
+    'gross_profit', 'gross_loss', 'net_profit', 'net_profit_pct',
+    'profit_factor', 'expected_payoff', 'max_drawdown', 'max_drawdown_pct',
+    'worst_day', 'max_daily_dd_pct', 'trading_days',
+    'sharpe_ratio', 'sortino_ratio', 'calmar_ratio', 'ulcer_index'
+)
+
+#==============================================================================
+# BUFFER PARTAGE
+#==============================================================================
+
+def _layout(n_sets, width, n_fields):
+    """Position (octets), dtype et forme de chaque colonne dans le buffer"""
+    columns = {
+        'time': ('datetime64[s]', (n_sets, width)),
+        'profit': ('float64', (n_sets, width)),
+        'valid': ('bool', (n_sets, width)),
+        'lengths': ('int64', (n_sets,)),
+        'results': ('float64', (n_sets, n_fields))
+    }
+    layout = {}
+    offset = 0
+    for name, (dtype, shape) in columns.items():
+        layout[name] = (offset, dtype, shape)
+        size = np.dtype(dtype).itemsize * int(np.prod(shape))
+        offset += -(-size // ALIGN) * ALIGN
+    return layout, max(offset, ALIGN)
+
+
+def _views(buf, layout):
+    """Tableaux NumPy posés sur le buffer (aucune copie)"""
+    return {name: np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            for name, (offset, dtype, shape) in layout.items()}
+
+
+class SharedTradeBatch:
+    def __init__(self, n_sets, width, fields=METRIC_FIELDS):
+        """
+        Lot (sets x trades) au format de pad_trade_sets, alloué en mémoire partagée
+        fields: colonnes du buffer de résultats (sets x champs)
+        """
+        self.fields = list(fields)
+        self.layout, size = _layout(n_sets, width, len(self.fields))
+        self.shm = SharedMemory(create=True, size=size)
+        self.columns = _views(self.shm.buf, self.layout)
+        self.columns['valid'][:] = False
+        self.columns['lengths'][:] = 0
+
+    @classmethod
+    def from_sets(cls, trade_sets, fields=METRIC_FIELDS):
+        """
+        Copie des sets colonnaires directement dans le buffer (sans lot intermédiaire)
+        Chaque set est trié par date (calendar_bounds lit le premier et le dernier trade)
+        """
+        trade_sets = [sort_by_time(s) for s in trade_sets]
+        lengths = np.array([len(s['profit']) for s in trade_sets], dtype=np.int64)
+        batch = cls(len(trade_sets), int(lengths.max()) if len(lengths) else 0, fields)
+        columns = batch.columns
+        first = min((s['time'][0] for s in trade_sets if len(s['profit'])),
+                    default=np.datetime64(0, 's'))
+
+        for i, s in enumerate(trade_sets):
+            n = lengths[i]
+            columns['lengths'][i] = n
+            columns['valid'][i, :n] = True
+            columns['profit'][i, :n] = s['profit']
+            columns['profit'][i, n:] = 0.0
+            columns['time'][i, :n] = s['time']
+            # Remplissage daté du dernier trade (d'un trade réel pour un set vide)
+            columns['time'][i, n:] = s['time'][n - 1] if n else first
+        return batch
+
+    @property
+    def spec(self):
+        """Description picklable pour s'attacher au buffer depuis un autre processus"""
+        return {'name': self.shm.name, 'layout': self.layout, 'fields': self.fields}
+
+    @property
+    def n_sets(self):
+        return len(self.columns['lengths'])
+
+    def calendar_bounds(self, server_offset_hours=0):
+        """Premier jour et nombre de jours ouvrés du calendrier commun du lot"""
+        lengths = self.columns['lengths']
+        rows = np.flatnonzero(lengths > 0)
+        if rows.size == 0:
+            return np.datetime64('1970-01-01', 'D'), 0
+        ends = self.columns['time'][rows, lengths[rows] - 1]
+        days = server_days(np.concatenate([self.columns['time'][rows, 0], ends]), server_offset_hours)
+        calendar, _ = trading_calendar(days)
+        return calendar[0], len(calendar)
+
+    def results(self):
+        """Copie des résultats hors du buffer: {champ: (sets,)}"""
+        table = self.columns['results']
+        return {field: table[:, j].copy() for j, field in enumerate(self.fields)}
+
+    def close(self):
+        """Libère les vues puis le segment de mémoire partagée"""
+        self.columns = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+#==============================================================================
+# WORKERS
+#==============================================================================
+
+# Etat par worker: buffer attaché une seule fois via l'initializer du pool
+_STATE = {}
+
+
+def _init_worker(spec):
+    shm = SharedMemory(name=spec['name'])
+    _STATE.clear()
+    _STATE.update(spec)
+    _STATE['shm'] = shm
+    _STATE['columns'] = _views(shm.buf, spec['layout'])
+
+
+def _release_worker():
+    shm = _STATE.pop('shm', None)
+    _STATE.clear()
+    if shm is not None:
+        shm.close()
+
+
+def _process_segment(bounds):
+    """Métriques et conformité des sets [lo, hi), écrites dans le buffer de résultats"""
+    lo, hi = bounds
+    columns = _STATE['columns']
+    width = int(columns['lengths'][lo:hi].max(initial=0))
+    if width == 0:
+        columns['results'][lo:hi] = 0.0
+        return hi - lo
+
+    times = columns['time'][lo:hi, :width]
+    profit = columns['profit'][lo:hi, :width]
+    valid = columns['valid'][lo:hi, :width]
+
+    # Index sur le calendrier commun: ratios identiques quel que soit le découpage
+    days = server_days(times, _STATE['server_offset_hours'])
+    index = np.busday_count(_STATE['calendar_start'], days, weekmask=WEEKMASK)
+    metrics = calendar_metrics(profit, valid, index, _STATE['n_days'], _STATE['initial_balance'])
+    for firm, rules in _STATE['rules'].items():
+        metrics[f'pass_{firm}'] = compliance_kernel(metrics, rules)['would_pass']
+
+    out = columns['results'][lo:hi]
+    for j, field in enumerate(_STATE['fields']):
+        out[:, j] = metrics[field]
+    return hi - lo
+
+#==============================================================================
+# MOTEUR
+#==============================================================================
+
+class SharedMetricsEngine:
+    def __init__(self, batch, initial_balance=100000, profiles=None, server_offset_hours=0,
+                 workers=None):
+        """
+        batch: SharedTradeBatch dont les champs de résultats incluent 'pass_<profil>'
+        pour chaque profil (voir result_fields)
+        profiles: noms de PROPFIRM_PROFILES ou dict {nom: règles}
+        """
+        if profiles is None:
+            profiles = list(PROPFIRM_PROFILES.keys())
+        self.rules = profiles if isinstance(profiles, dict) else {n: PROPFIRM_PROFILES[n] for n in profiles}
+        missing = [f for f in result_fields(self.rules) if f not in batch.fields]
+        if missing:
+            raise ValueError(f"Champs absents du buffer de résultats: {missing}")
+
+        self.batch = batch
+        self.workers = workers or os.cpu_count() or 1
+        calendar_start, n_days = batch.calendar_bounds(server_offset_hours)
+        self.spec = {
+            **batch.spec,
+            'initial_balance': initial_balance,
+            'server_offset_hours': server_offset_hours,
+            'calendar_start': calendar_start,
+            'n_days': n_days,
+            'rules': self.rules
+        }
+        self._pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.spec,))
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def segments(self, n_segments=None):
+        """Découpage des sets en segments contigus [lo, hi)"""
+        n_sets = self.batch.n_sets
+        n_segments = min(n_segments or self.workers * SEGMENTS_PER_WORKER, max(n_sets, 1))
+        bounds = np.linspace(0, n_sets, n_segments + 1).astype(np.int64)
+        return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+    def run(self, n_segments=None):
+        """Evalue tous les sets; retourne {champ: (sets,)}"""
+        segments = self.segments(n_segments)
+        if self._pool is not None:
+            processed = sum(self._pool.map(_process_segment, segments))
+        elif self.workers > 1:
+            with self:
+                processed = sum(self._pool.map(_process_segment, segments))
+        else:
+            _init_worker(self.spec)
+            try:
+                processed = sum(_process_segment(s) for s in segments)
+            finally:
+                _release_worker()
+
+        if processed != self.batch.n_sets:
+            raise RuntimeError(f"{processed} sets traités sur {self.batch.n_sets}")
+        results = self.batch.results()
+        for firm in self.rules:
+            results[f'pass_{firm}'] = results[f'pass_{firm}'].astype(bool)
+        return results
+
+
+def result_fields(profiles=None):
+    """Champs du buffer de résultats: métriques puis conformité par profil"""
+    if profiles is None:
+        profiles = list(PROPFIRM_PROFILES.keys())
+    return list(METRIC_FIELDS) + [f'pass_{firm}' for firm in profiles]
+
+
+def shared_metrics(trade_sets, initial_balance=100000, profiles=None, server_offset_hours=0,
+                   workers=None):
+    """
+    Raccourci: buffer partagé + pool, le temps d'une évaluation
+    Les ratios journaliers (Sharpe, Sortino, Calmar, Ulcer) sont calculés sur le
+    calendrier commun du lot, comme summarize_trades sur pad_trade_sets: les jours
+    hors de la période d'un set comptent comme jours à P&L nul, si bien que ses
+    ratios dépendent des autres sets du lot. Evaluer un set seul pour des ratios
+    sur sa propre période
+    """
+    if profiles is None:
+        profiles = list(PROPFIRM_PROFILES.keys())
+    with SharedTradeBatch.from_sets(trade_sets, result_fields(profiles)) as batch:
+        with SharedMetricsEngine(batch, initial_balance, profiles, server_offset_hours, workers) as engine:
+            return engine.run()
+
+
+def print_scaling_report(timings, n_sets, n_trades):
+    """Débit et accélération par nombre de workers"""
+    print("\n" + "=" * 70)
+    print("                SHARED-MEMORY KERNELS - SCALING")
+    print("=" * 70)
+    print(f"Lot: {n_sets:,} sets, {n_trades:,} trades")
+    print(f"\n{'Workers':>8} {'Temps':>9} {'Sets/s':>11} {'Trades/s':>13} {'Speedup':>8} {'Effic.':>7}")
+    print("-" * 70)
+    base = timings[0][1]
+    for workers, elapsed in timings:
+        speedup = base / elapsed
+        print(f"{workers:>8} {elapsed:>8.2f}s {n_sets / elapsed:>11,.0f} {n_trades / elapsed:>13,.0f} "
+              f"{speedup:>7.2f}x {speedup / workers * 100:>6.0f}%")
+    print("=" * 70 + "\n")
+
+
+def main():
+    """Démonstration: 2000 sets de 2000 trades, 1 -> N workers sur le même buffer"""
+    from metric_kernels import pad_trade_sets, summarize_trades
+    from trade_generator import generate_trades
+
+    n_sets = 2000
+    sets = [generate_trades(2000, win_rate=0.40 + (i % 10) / 100, trades_per_day=8, seed=i)
+            for i in range(n_sets)]
+    n_trades = sum(len(s['profit']) for s in sets)
+    fields = result_fields()
+
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, *[w for w in (2, 4, 8, 16, 32) if w <= cpus], cpus})
+    timings = []
+    with SharedTradeBatch.from_sets(sets, fields) as batch:
+        for workers in counts:
+            with SharedMetricsEngine(batch, workers=workers) as engine:
+                engine.run()    # Démarrage du pool hors mesure
+                started = time.perf_counter()
+                results = engine.run()
+                timings.append((workers, time.perf_counter() - started))
+
+    # Contrôle: mêmes métriques que le noyau mono-processus sur le lot complet
+    padded = pad_trade_sets(sets)
+    reference = summarize_trades(padded['time'], padded['profit'], 100000, valid=padded['valid'])
+    worst = max(float(np.nanmax(np.abs(np.where(np.isfinite(reference[f]), reference[f], 0)
+                                       - np.where(np.isfinite(results[f]), results[f], 0))))
+                for f in METRIC_FIELDS)
+    print(f"\nEcart max vs summarize_trades: {worst:.2e}")
+    print(f"Passent FTMO: {int(results['pass_FTMO'].sum())}/{n_sets}")
+    print_scaling_report(timings, n_sets, n_trades)
+
+
+if __name__ == "__main__":
+    main()
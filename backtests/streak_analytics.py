@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+PropFirm Streak Analytics
+Séries gagnantes/perdantes par run-length (NumPy) et temps sous l'eau:
+distributions de séries, impact des séries perdantes, épisodes de drawdown
+et probabilité d'atteindre MaxConsecutiveLosses
+"""
+
+import numpy as np
+
+from metric_kernels import equity_from_pnl
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+WIN = 1
+BREAKEVEN = 0           # Ni gain ni perte: interrompt les deux séries
+LOSS = -1
+MAX_CONSECUTIVE_LOSSES = 5      # Valeur des .set (MaxConsecutiveLosses)
+
+#==============================================================================
+# RUN-LENGTH
+#==============================================================================
+
+def trade_outcomes(profit, breakeven=0.0):
+    """Profits -> issues WIN / BREAKEVEN / LOSS (|profit| <= breakeven = breakeven)"""
+    profit = np.asarray(profit, dtype=np.float64)
+    return np.where(profit > breakeven, WIN, np.where(profit < -breakeven, LOSS, BREAKEVEN)).astype(np.int8)
+
+
+def run_lengths(values):
+    """
+    Encodage run-length d'un tableau 1D
+    Retourne (valeur, indice de début, longueur) de chaque série
+    """
+    values = np.asarray(values)
+    n = len(values)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return values[:0], empty, empty
+    starts = np.concatenate([[0], np.flatnonzero(values[1:] != values[:-1]) + 1])
+    lengths = np.diff(np.append(starts, n))
+    return values[starts], starts, lengths
+
+
+def streak_distribution(outcomes):
+    """
+    Distributions des longueurs de séries gagnantes et perdantes
+    'win'/'loss'[k] = nombre de séries de longueur exactement k
+    """
+    values, _, lengths = run_lengths(outcomes)
+    result = {}
+    for name, value in (('win', WIN), ('loss', LOSS)):
+        streaks = lengths[values == value]
+        result[name] = np.bincount(streaks, minlength=1)
+        result[f'max_{name}'] = int(streaks.max()) if streaks.size else 0
+        result[f'mean_{name}'] = float(streaks.mean()) if streaks.size else 0.0
+    return result
+
+#==============================================================================
+# IMPACT DES SERIES PERDANTES
+#==============================================================================
+
+def loss_streak_impact(profit, initial_balance, outcomes=None):
+    """
+    Perte de chaque série perdante en $ et en % de l'équité au début de la série,
+    puis agrégat (moyenne, pire) par longueur de série
+    """
+    profit = np.asarray(profit, dtype=np.float64)
+    if outcomes is None:
+        outcomes = trade_outcomes(profit)
+    values, starts, lengths = run_lengths(outcomes)
+    loss = values == LOSS
+    if not loss.any():
+        empty = np.zeros(0)
+        return {'start': empty.astype(np.int64), 'length': empty.astype(np.int64),
+                'loss': empty, 'loss_pct': empty, 'by_length': {}}
+
+    equity = equity_from_pnl(profit, initial_balance)
+    streak_pnl = np.add.reduceat(profit, starts)[loss]
+    start = starts[loss]
+    length = lengths[loss]
+    loss_pct = streak_pnl / equity[start] * 100
+
+    # Agrégat par longueur: moyenne via bincount, pire via minimum.at
+    count = np.bincount(length)
+    mean = np.bincount(length, weights=streak_pnl) / np.maximum(count, 1)
+    mean_pct = np.bincount(length, weights=loss_pct) / np.maximum(count, 1)
+    worst = np.zeros(len(count))
+    worst_pct = np.zeros(len(count))
+    np.minimum.at(worst, length, streak_pnl)
+    np.minimum.at(worst_pct, length, loss_pct)
+    by_length = {
+        int(k): {
+            'count': int(count[k]),
+            'mean_loss': float(mean[k]),
+            'mean_loss_pct': float(mean_pct[k]),
+            'worst_loss': float(worst[k]),
+            'worst_loss_pct': float(worst_pct[k])
+        }
+        for k in np.flatnonzero(count)
+    }
+    return {'start': start, 'length': length, 'loss': streak_pnl, 'loss_pct': loss_pct,
+            'by_length': by_length}
+
+#==============================================================================
+# TEMPS SOUS L'EAU
+#==============================================================================
+
+def drawdown_episodes(profit, initial_balance, times=None):
+    """
+    Table des épisodes de drawdown (pic -> creux -> retour au pic)
+    Indices sur la courbe d'équité (0 = capital initial, i = après le trade i-1)
+    Durées en trades, et en jours si `times` (datetime64) est fourni
+    Un épisode non récupéré a recovered=False et une récupération NaN
+    """
+    equity = equity_from_pnl(np.asarray(profit, dtype=np.float64), initial_balance)
+    n = len(equity)
+    peak = np.maximum.accumulate(equity)
+    dd = peak - equity
+    values, starts, lengths = run_lengths(dd > 0)
+    under = values.astype(bool)
+    first = starts[under]                   # Premier point sous l'eau
+    end = first + lengths[under]            # Premier point revenu au pic (n si jamais)
+    peak_idx = first - 1
+
+    if first.size:
+        # Creux: premier maximum de dd dans chaque segment [first_i, first_i+1)
+        depth = np.maximum.reduceat(dd, first)
+        segment = np.repeat(np.arange(len(first)), np.diff(np.append(first, n)))
+        offset = first[0]
+        candidate = np.flatnonzero(dd[offset:] == depth[segment]) + offset
+        _, idx = np.unique(segment[candidate - offset], return_index=True)
+        trough = candidate[idx]
+    else:
+        depth = np.zeros(0)
+        trough = np.zeros(0, dtype=np.int64)
+
+    recovered = end < n
+    table = {
+        'peak_index': peak_idx,
+        'trough_index': trough,
+        'recovery_index': np.where(recovered, end, -1),
+        'recovered': recovered,
+        'depth': depth,
+        'depth_pct': depth / equity[peak_idx] * 100 if first.size else depth,
+        'duration_trades': np.where(recovered, end, n - 1) - peak_idx,
+        'decline_trades': trough - peak_idx,
+        'recovery_trades': np.where(recovered, end - trough, np.nan)
+    }
+
+    if times is not None and first.size:
+        times = np.asarray(times, dtype='datetime64[s]')
+        eq_times = np.concatenate([times[:1], times])
+        day = np.timedelta64(1, 'D')
+        last = np.where(recovered, end, n - 1)
+        table['duration_days'] = (eq_times[last] - eq_times[peak_idx]) / day
+        table['decline_days'] = (eq_times[trough] - eq_times[peak_idx]) / day
+        table['recovery_days'] = np.where(recovered, (eq_times[last] - eq_times[trough]) / day, np.nan)
+
+    table['time_under_water_pct'] = float((dd > 0).mean() * 100)
+    return table
+
+#==============================================================================
+# PROBABILITE MaxConsecutiveLosses
+#==============================================================================
+
+def consecutive_loss_probability(loss_rate, n_trades, k):
+    """
+    Probabilité d'au moins une série de >= k pertes sur n_trades trades
+    indépendants (chaîne de Markov sur la longueur de série courante,
+    état absorbant k; puissance de matrice -> O(k^3 log n))
+    """
+    k = int(k)
+    if k <= 0:
+        return 1.0
+    transition = np.zeros((k + 1, k + 1))
+    transition[:k, 0] = 1 - loss_rate                       # Gain / breakeven: série remise à 0
+    transition[np.arange(k), np.arange(1, k + 1)] = loss_rate
+    transition[k, k] = 1.0
+    return float(np.linalg.matrix_power(transition, int(n_trades))[0, k])
+
+#==============================================================================
+# ANALYSE COMPLETE
+#==============================================================================
+
+def streak_analytics(profit, initial_balance, times=None,
+                     max_consecutive_losses=MAX_CONSECUTIVE_LOSSES, horizon=None, breakeven=0.0):
+    """
+    Analyse complète des séries et du temps sous l'eau
+    horizon: nombre de trades pour P(MaxConsecutiveLosses) (défaut: historique)
+    """
+    profit = np.asarray(profit, dtype=np.float64)
+    outcomes = trade_outcomes(profit, breakeven)
+    distribution = streak_distribution(outcomes)
+    loss_rate = float((outcomes == LOSS).mean()) if outcomes.size else 0.0
+    horizon = len(profit) if horizon is None else horizon
+    hits = int((distribution['loss'][max_consecutive_losses:]).sum())
+
+    return {
+        'distribution': distribution,
+        'breakeven_trades': int((outcomes == BREAKEVEN).sum()),
+        'loss_streaks': loss_streak_impact(profit, initial_balance, outcomes),
+        'episodes': drawdown_episodes(profit, initial_balance, times),
+        'loss_rate': loss_rate,
+        'max_consecutive_losses': max_consecutive_losses,
+        'horizon': horizon,
+        'observed_hits': hits,
+        'p_hit_max_losses': consecutive_loss_probability(loss_rate, horizon, max_consecutive_losses)
+    }
+
+
+def print_streak_report(result, top=5):
+    """Affiche distributions, impact des séries et pires épisodes de drawdown"""
+    dist = result['distribution']
+    print("\n" + "=" * 78)
+    print("                    STREAK & TIME-UNDER-WATER ANALYSIS")
+    print("=" * 78)
+    print(f"\nMax Consec Wins: {dist['max_win']}  (moyenne {dist['mean_win']:.2f})  |  "
+          f"Max Consec Losses: {dist['max_loss']}  (moyenne {dist['mean_loss']:.2f})")
+    print(f"Trades breakeven (neutres): {result['breakeven_trades']}")
+
+    print("\n" + "-" * 78)
+    print(f"{'Longueur':<10} {'Séries W':>9} {'Séries L':>9} {'Perte moy.':>12} {'Pire perte':>12} {'Pire %':>8}")
+    print("-" * 78)
+    by_length = result['loss_streaks']['by_length']
+    for k in range(1, max(len(dist['win']), len(dist['loss']))):
+        wins = dist['win'][k] if k < len(dist['win']) else 0
+        losses = dist['loss'][k] if k < len(dist['loss']) else 0
+        if wins == 0 and losses == 0:
+            continue
+        row = by_length.get(k)
+        impact = (f"${row['mean_loss']:>11,.0f} ${row['worst_loss']:>11,.0f} {row['worst_loss_pct']:>7.2f}%"
+                  if row else f"{'-':>12} {'-':>12} {'-':>8}")
+        print(f"{k:<10} {wins:>9} {losses:>9} {impact}")
+
+    episodes = result['episodes']
+    print("\n" + "-" * 78)
+    print(f"EPISODES DE DRAWDOWN ({len(episodes['depth'])}, "
+          f"sous l'eau {episodes['time_under_water_pct']:.1f}% du temps)")
+    print("-" * 78)
+    has_days = 'duration_days' in episodes
+    unit = 'jours' if has_days else 'trades'
+    print(f"{'Profondeur':>12} {'%':>7} {'Baisse':>10} {'Récup.':>10} {'Durée':>10}  ({unit})")
+    for i in np.argsort(-episodes['depth'])[:top]:
+        suffix = 'days' if has_days else 'trades'
+        recovery = episodes[f'recovery_{suffix}'][i]
+        print(f"${episodes['depth'][i]:>11,.0f} {episodes['depth_pct'][i]:>6.2f}% "
+              f"{episodes[f'decline_{suffix}'][i]:>10.1f} "
+              f"{'en cours' if np.isnan(recovery) else f'{recovery:.1f}':>10} "
+              f"{episodes[f'duration_{suffix}'][i]:>10.1f}")
+
+    print("\n" + "-" * 78)
+    print(f"P(>= {result['max_consecutive_losses']} pertes consécutives sur {result['horizon']} trades): "
+          f"{result['p_hit_max_losses'] * 100:.1f}%  (taux de perte {result['loss_rate'] * 100:.1f}%, "
+          f"observé {result['observed_hits']} fois)")
+    print("=" * 78 + "\n")
+
+
+def main():
+    """Démonstration sur des trades simulés"""
+    from analyze_backtest import generate_sample_trades
+    from metric_kernels import to_columns
+
+    columns = to_columns(generate_sample_trades(num_trades=1000, win_rate=0.55, avg_rr=1.5))
+    result = streak_analytics(columns['profit'], 100000, times=columns['time'], horizon=200)
+    print_streak_report(result)
+
+
+if __name__ == "__main__":
+    main()
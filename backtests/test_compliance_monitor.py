@@ -0,0 +1,53 @@
+"""Tests de régression du moniteur de conformité"""
+
+import json
+import os
+
+from compliance_monitor import LEVEL_OK, AccountMonitor, ComplianceMonitor, parse_time
+
+
+def _write_account(root, account_id, deals, equity):
+    folder = os.path.join(root, account_id)
+    os.makedirs(folder)
+    with open(os.path.join(folder, 'account.json'), 'w') as f:
+        json.dump({'profile': 'FTMO', 'initial_balance': 100000}, f)
+    with open(os.path.join(folder, 'deals.csv'), 'w') as f:
+        f.write("time,ticket,symbol,type,volume,profit\n")
+        f.writelines(f"{t},{i},EURUSD,BUY,1.0,{p}\n" for i, (t, p) in enumerate(deals))
+    with open(os.path.join(folder, 'equity.csv'), 'w') as f:
+        f.write("time,balance,equity\n")
+        f.writelines(f"{t},{b},{e}\n" for t, b, e in equity)
+
+
+def test_multi_day_scan_keeps_daily_baseline(tmp_path):
+    """Un scan couvrant deux jours ne doit pas fausser le solde de début de journée"""
+    deals = [('2025.01.06 10:00:00', 1000), ('2025.01.07 10:00:00', 6000)]
+    equity = [('2025.01.06 18:00:00', 101000, 101000), ('2025.01.07 18:00:00', 107000, 107000)]
+    _write_account(str(tmp_path), 'ACC1', deals, equity)
+
+    monitor = ComplianceMonitor(str(tmp_path))
+    monitor.discover()
+    alerts = monitor.process_account('ACC1')
+
+    account = monitor.accounts['ACC1']
+    assert account.levels['daily_dd'] == LEVEL_OK
+    assert account.max_daily_dd_pct == 0.0
+    assert account.day_start_balance == 101000
+    assert account.balance == 107000
+    assert all(a['rule'] != 'daily_dd' for a in alerts)
+
+
+def test_out_of_order_rows_never_roll_day_back():
+    account = AccountMonitor('ACC1', 'FTMO', 100000)
+    account.on_deal(parse_time('2025.01.07 10:00:00'), 2000)
+    # Snapshot périmé de la veille: ignoré
+    assert account.on_equity(parse_time('2025.01.06 18:00:00'), 100000, 100000) == []
+    # Deal tardif de la veille: comptabilisé sur le jour courant
+    account.on_deal(parse_time('2025.01.06 12:00:00'), 500)
+    # Le deal tardif ne rend pas le snapshot périmé de nouveau acceptable
+    assert account.on_equity(parse_time('2025.01.06 18:00:00'), 100000, 100000) == []
+
+    assert account.last_update == parse_time('2025.01.07 10:00:00')
+    assert account.day == parse_time('2025.01.07 00:00:00').date()
+    assert account.balance == 102500
+    assert account.levels['daily_dd'] == LEVEL_OK
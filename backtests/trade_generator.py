@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+PropFirm Trade Generator
+Générateur vectorisé (NumPy) de trades synthétiques au format colonnaire,
+pour les tests de charge de l'analyseur, du validateur et des simulateurs
+
+Dizaines de millions de trades en quelques secondes: régimes de marché,
+pertes autocorrélées, horaires intraday par session et multi-symboles,
+reproductible par graine
+"""
+
+import time
+
+import numpy as np
+
+from metric_kernels import WEEKMASK
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+AVG_LOSS = 100          # $ par perte en moyenne (comme generate_sample_trades)
+TRADES_PER_DAY = 6
+START_DATE = '2024-01-01'
+
+# Sessions en heure serveur: (centre h, écart-type h, poids)
+SESSIONS = {
+    'asia': (3.0, 2.0, 0.10),
+    'london': (9.5, 1.5, 0.45),
+    'new_york': (15.5, 1.5, 0.45)
+}
+
+SYMBOLS = {'EURUSD': 0.4, 'GBPUSD': 0.25, 'USDJPY': 0.2, 'XAUUSD': 0.15}
+
+# Régimes: win rate, R:R et échelle des montants (volatilité)
+REGIMES = (
+    {'name': 'trend', 'win_rate': 0.60, 'avg_rr': 1.6, 'scale': 1.0, 'weight': 0.5},
+    {'name': 'range', 'win_rate': 0.50, 'avg_rr': 1.3, 'scale': 0.8, 'weight': 0.3},
+    {'name': 'volatile', 'win_rate': 0.45, 'avg_rr': 1.5, 'scale': 1.6, 'weight': 0.2}
+)
+
+#==============================================================================
+# PROCESSUS COLLANTS
+#==============================================================================
+
+def _sticky(rng, n, persistence, fresh_values):
+    """
+    Série où chaque valeur recopie la précédente avec probabilité `persistence`,
+    sinon prend une valeur fraîche (fresh_values[i]); le premier élément est frais
+    Remplissage avant par maximum.accumulate: aucune boucle Python
+    Pour des issues binaires de taux q: P(L|L) = p + (1-p)q, autocorrélation lag-1 = p
+    """
+    fresh = rng.random(n) >= persistence
+    fresh[0] = True
+    source = np.maximum.accumulate(np.where(fresh, np.arange(n), 0))
+    return fresh_values[source]
+
+#==============================================================================
+# HORAIRES
+#==============================================================================
+
+def _trade_times(rng, n, trades_per_day, sessions, start):
+    """Jours ouvrés (Poisson trades/jour) + heure intraday par mélange de sessions"""
+    # Jours: assez de jours pour couvrir n trades, puis tronqué
+    n_days = int(n / max(trades_per_day, 1e-9) * 1.2) + 10
+    counts = rng.poisson(trades_per_day, size=n_days)
+    while counts.sum() < n:
+        counts = np.concatenate([counts, rng.poisson(trades_per_day, size=n_days)])
+    day = np.repeat(np.arange(len(counts), dtype=np.int64), counts)[:n]
+
+    centers, stds, weights = (np.array(v, dtype=np.float64) for v in zip(*sessions.values()))
+    session = rng.choice(len(centers), size=n, p=weights / weights.sum())
+    hours = rng.normal(centers[session], stds[session])
+    seconds = np.clip(hours * 3600, 0, 86399).astype(np.int64)
+
+    first = np.busday_offset(np.datetime64(start, 'D'), 0, roll='forward', weekmask=WEEKMASK)
+    dates = np.busday_offset(first, np.arange(len(counts)), weekmask=WEEKMASK)
+    stamps = dates[day].astype('datetime64[s]').astype(np.int64) + seconds
+    stamps.sort()       # Ordre chronologique (les jours sont déjà croissants)
+    return stamps.astype('datetime64[s]')
+
+#==============================================================================
+# GENERATEUR
+#==============================================================================
+
+def generate_trades(n_trades, win_rate=0.55, avg_rr=1.5, avg_loss=AVG_LOSS,
+                    trades_per_day=TRADES_PER_DAY, sessions=None, symbols=None,
+                    regimes=None, regime_switch_prob=0.0, loss_autocorr=0.0,
+                    start=START_DATE, seed=42):
+    """
+    Génère n_trades trades au format colonnaire:
+    {'time': datetime64[s], 'profit': float64, 'side': int8 (+1 BUY, -1 SELL),
+     'symbol_code': int16, 'regime': int8, 'symbols': noms des symboles}
+
+    regimes: liste de dicts (win_rate, avg_rr, scale, weight); None = un seul
+    régime (win_rate, avg_rr). Changement de régime avec probabilité
+    regime_switch_prob par trade (nouveau régime tiré selon les poids)
+    loss_autocorr: autocorrélation lag-1 des issues (0 = trades indépendants)
+    """
+    rng = np.random.default_rng(seed)
+    n = int(n_trades)
+    sessions = sessions or SESSIONS
+    symbols = symbols or {'EURUSD': 1.0}
+    if regimes is None:
+        regimes = ({'name': 'base', 'win_rate': win_rate, 'avg_rr': avg_rr, 'scale': 1.0, 'weight': 1.0},)
+    if not 0 <= loss_autocorr < 1:
+        raise ValueError("loss_autocorr doit être dans [0, 1)")
+
+    # Régimes: processus collant sur les indices de régime
+    weights = np.array([r.get('weight', 1.0) for r in regimes], dtype=np.float64)
+    regime_draws = rng.choice(len(regimes), size=n, p=weights / weights.sum()).astype(np.int8)
+    regime = _sticky(rng, n, 1 - regime_switch_prob, regime_draws) if len(regimes) > 1 else regime_draws
+
+    r_win_rate = np.array([r['win_rate'] for r in regimes])[regime]
+    r_avg_rr = np.array([r['avg_rr'] for r in regimes])[regime]
+    r_scale = np.array([r.get('scale', 1.0) for r in regimes])[regime]
+
+    # Issues: Bernoulli par régime, rendues collantes pour l'autocorrélation
+    wins = rng.random(n) < r_win_rate
+    if loss_autocorr > 0:
+        wins = _sticky(rng, n, loss_autocorr, wins)
+
+    # Montants: même dispersion uniforme que generate_sample_trades
+    size = (0.5 + rng.random(n)) * avg_loss * r_scale
+    profit = np.where(wins, size * r_avg_rr, -size)
+
+    names = list(symbols.keys())
+    p = np.array(list(symbols.values()), dtype=np.float64)
+    symbol_code = rng.choice(len(names), size=n, p=p / p.sum()).astype(np.int16)
+    side = np.where(rng.random(n) < 0.5, 1, -1).astype(np.int8)
+
+    return {
+        'time': _trade_times(rng, n, trades_per_day, sessions, start),
+        'profit': profit,
+        'side': side,
+        'symbol_code': symbol_code,
+        'regime': regime.astype(np.int8),
+        'symbols': np.array(names)
+    }
+
+
+def split_by_symbol(columns):
+    """Découpe un set multi-symboles en sets colonnaires par symbole"""
+    order = np.argsort(columns['symbol_code'], kind='stable')
+    codes = columns['symbol_code'][order]
+    bounds = np.searchsorted(codes, np.arange(len(columns['symbols']) + 1))
+    result = {}
+    for i, name in enumerate(columns['symbols']):
+        idx = order[bounds[i]:bounds[i + 1]]
+        result[str(name)] = {'time': columns['time'][idx], 'profit': columns['profit'][idx]}
+    return result
+
+
+def with_labels(columns):
+    """
+    Ajoute les colonnes texte 'type' et 'symbol' (format trade_warehouse.ingest)
+    Réservé aux sets de taille raisonnable: les chaînes coûtent ~10x la mémoire
+    """
+    labeled = dict(columns)
+    labeled['type'] = np.array(['SELL', 'BUY'])[(columns['side'] > 0).astype(np.int8)]
+    labeled['symbol'] = columns['symbols'][columns['symbol_code']]
+    return labeled
+
+#==============================================================================
+# MAIN
+#==============================================================================
+
+def main():
+    """Test de charge: 10 millions de trades (flotte entière) puis noyaux de métriques"""
+    from metric_kernels import summarize_trades
+    from streak_analytics import streak_distribution, trade_outcomes
+
+    n = 10_000_000
+    started = time.perf_counter()
+    columns = generate_trades(n, symbols=SYMBOLS, regimes=REGIMES, regime_switch_prob=1 / 500,
+                              loss_autocorr=0.15, trades_per_day=2000)
+    generated = time.perf_counter() - started
+
+    print("\n" + "=" * 70)
+    print("                 SYNTHETIC TRADE GENERATOR - STRESS TEST")
+    print("=" * 70)
+    print(f"Trades générés:   {n:,} en {generated:.2f}s ({n / generated / 1e6:.1f} M trades/s)")
+    print(f"Période:          {columns['time'][0]} -> {columns['time'][-1]}")
+
+    wins = columns['profit'] > 0
+    print(f"Win rate:         {wins.mean() * 100:.2f}%")
+    print(f"Autocorr. issues: {np.corrcoef(wins[:-1], wins[1:])[0, 1]:.3f}")
+    counts = np.bincount(columns['symbol_code'], minlength=len(columns['symbols']))
+    print("Symboles:         " + ", ".join(f"{s} {c / n * 100:.0f}%" for s, c in zip(columns['symbols'], counts)))
+    hours = np.bincount((columns['time'].astype(np.int64) % 86400) // 3600, minlength=24) / n * 100
+    print("Heures (pic):     " + ", ".join(f"{h}h {hours[h]:.1f}%" for h in np.argsort(-hours)[:3]))
+
+    started = time.perf_counter()
+    metrics = summarize_trades(columns['time'], columns['profit'], 100000)
+    print(f"\nsummarize_trades: {time.perf_counter() - started:.2f}s "
+          f"(PF {metrics['profit_factor']:.2f}, {metrics['trading_days']} jours)")
+    started = time.perf_counter()
+    streaks = streak_distribution(trade_outcomes(columns['profit']))
+    print(f"Séries:           {time.perf_counter() - started:.2f}s (max pertes consécutives {streaks['max_loss']})")
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
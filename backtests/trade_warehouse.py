@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+PropFirm Trade Warehouse
+Stockage SQLite embarqué de tous les backtests et deals live, indexé par EA,
+version, symbole, profil et date, avec résumé de métriques précalculé par run
+"""
+
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from metric_kernels import sort_by_time, summarize_trades, to_columns
+from propfirm_validator import PROPFIRM_PROFILES, PropFirmValidator
+
+#==============================================================================
+# SCHEMA
+#==============================================================================
+
+DEFAULT_DB = 'trade_warehouse.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id          INTEGER PRIMARY KEY,
+    ea              TEXT NOT NULL,
+    version         TEXT NOT NULL,
+    symbol          TEXT NOT NULL,
+    source          TEXT NOT NULL DEFAULT 'backtest',
+    account         TEXT,
+    label           TEXT,
+    initial_balance REAL NOT NULL,
+    start_time      INTEGER,
+    end_time        INTEGER,
+    ingested_at     INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_ea ON runs (ea, version, symbol);
+CREATE INDEX IF NOT EXISTS idx_runs_symbol ON runs (symbol);
+CREATE INDEX IF NOT EXISTS idx_runs_dates ON runs (start_time, end_time);
+
+CREATE TABLE IF NOT EXISTS trades (
+    run_id  INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    time    INTEGER NOT NULL,
+    profit  REAL NOT NULL,
+    type    TEXT,
+    symbol  TEXT,
+    volume  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_run_time ON trades (run_id, time);
+
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id           INTEGER PRIMARY KEY REFERENCES runs(run_id) ON DELETE CASCADE,
+    total_trades     INTEGER,
+    win_rate         REAL,
+    net_profit       REAL,
+    net_profit_pct   REAL,
+    profit_factor    REAL,
+    expected_payoff  REAL,
+    max_drawdown_pct REAL,
+    max_daily_dd_pct REAL,
+    trading_days     INTEGER,
+    sharpe_ratio     REAL,
+    sortino_ratio    REAL,
+    calmar_ratio     REAL,
+    ulcer_index      REAL
+);
+
+CREATE TABLE IF NOT EXISTS run_compliance (
+    run_id     INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    profile    TEXT NOT NULL,
+    would_pass INTEGER NOT NULL,
+    score      INTEGER NOT NULL,
+    PRIMARY KEY (profile, would_pass, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_compliance_run ON run_compliance (run_id);
+"""
+
+METRIC_COLUMNS = (
+    'total_trades', 'win_rate', 'net_profit', 'net_profit_pct', 'profit_factor',
+    'expected_payoff', 'max_drawdown_pct', 'max_daily_dd_pct', 'trading_days',
+    'sharpe_ratio', 'sortino_ratio', 'calmar_ratio', 'ulcer_index'
+)
+
+
+def _epoch(value):
+    """datetime / datetime64 / str -> secondes epoch"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int(np.datetime64(value, 's').astype(np.int64))
+
+
+def _finite(value):
+    """SQLite n'aime pas inf: stocké NULL"""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+#==============================================================================
+# WAREHOUSE
+#==============================================================================
+
+class TradeWarehouse:
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self.validators = {name: PropFirmValidator(name) for name in PROPFIRM_PROFILES}
+
+    def close(self):
+        self.conn.close()
+
+    #--------------------------------------------------------------------------
+    # INGESTION
+    #--------------------------------------------------------------------------
+
+    def ingest(self, columns, ea, version, symbol, initial_balance=100000,
+               source='backtest', account=None, label=None):
+        """
+        Insère un run (colonnes: 'time', 'profit', optionnel 'type', 'volume', 'symbol')
+        Calcule et stocke le résumé de métriques et la conformité par profil
+        Les trades sont triés par date (equity et drawdown en ordre chronologique)
+        Retourne le run_id; ValueError si des trades n'ont pas de date
+        """
+        times = np.asarray(columns['time'], dtype='datetime64[s]')
+        profit = np.asarray(columns['profit'], dtype=np.float64)
+        n = len(profit)
+        undated = int(np.isnat(times).sum())
+        if undated:
+            raise ValueError(f"{undated} trade(s) sans date: impossible de les placer dans le calendrier")
+        columns = sort_by_time({**columns, 'time': times, 'profit': profit})
+        times, profit = columns['time'], columns['profit']
+        epochs = times.astype(np.int64)
+
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (ea, version, symbol, source, account, label, initial_balance,"
+                " start_time, end_time, ingested_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (ea, str(version), symbol, source, account, label, initial_balance,
+                 int(epochs.min()) if n else None, int(epochs.max()) if n else None,
+                 int(time.time()))
+            )
+            run_id = cur.lastrowid
+
+            types = columns.get('type', [None] * n)
+            volumes = columns.get('volume', [None] * n)
+            symbols = columns.get('symbol', [symbol] * n)
+            self.conn.executemany(
+                "INSERT INTO trades (run_id, time, profit, type, symbol, volume) VALUES (?, ?, ?, ?, ?, ?)",
+                zip([run_id] * n, epochs.tolist(), profit.tolist(), types, symbols,
+                    [None if v is None else float(v) for v in volumes])
+            )
+
+            if n:
+                self._store_summary(run_id, times, profit, initial_balance)
+        return run_id
+
+    def ingest_trades(self, trades, ea, version, symbol, **kwargs):
+        """Insère un run depuis une liste de trades (format BacktestAnalyzer)"""
+        columns = to_columns(trades)
+        columns['type'] = [t.get('type') for t in trades]
+        columns['volume'] = [t.get('volume') for t in trades]
+        return self.ingest(columns, ea, version, symbol, **kwargs)
+
+    def _store_summary(self, run_id, times, profit, initial_balance):
+        metrics = summarize_trades(times, profit, initial_balance)
+        row = [_finite(metrics[c]) for c in METRIC_COLUMNS]
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO run_metrics (run_id, {', '.join(METRIC_COLUMNS)})"
+            f" VALUES (?{', ?' * len(METRIC_COLUMNS)})",
+            [run_id] + row
+        )
+
+        validator_metrics = {
+            'net_profit_pct': float(metrics['net_profit_pct']),
+            'max_dd_pct': float(metrics['max_drawdown_pct']),
+            'max_daily_dd_pct': float(metrics['max_daily_dd_pct']),
+            'trading_days': int(metrics['trading_days']),
+            'profit_factor': float(metrics['profit_factor']),
+            'win_rate': float(metrics['win_rate']),
+            'total_trades': int(metrics['total_trades'])
+        }
+        rows = []
+        for name, validator in self.validators.items():
+            results = validator.validate(validator_metrics)
+            rows.append((run_id, name, int(results['would_pass']), results['score']))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO run_compliance (run_id, profile, would_pass, score) VALUES (?, ?, ?, ?)",
+            rows
+        )
+
+    def delete_run(self, run_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    #--------------------------------------------------------------------------
+    # REQUETES
+    #--------------------------------------------------------------------------
+
+    def find_runs(self, ea=None, version=None, symbol=None, source=None,
+                  profile=None, passed=None, start=None, end=None, order_by='net_profit_pct'):
+        """
+        Runs filtrés avec leur résumé de métriques
+        Ex: find_runs(ea='SessionBreakout', version='6', symbol='EURUSD',
+                      profile='FUNDING_PIPS_1STEP', passed=True)
+        start/end: runs dont la période chevauche [start, end]
+        """
+        # Colonnes de métriques explicites: m.run_id (NULL sans résumé) écraserait r.run_id
+        sql = ["SELECT r.*, " + ", ".join(f"m.{c}" for c in METRIC_COLUMNS)]
+        params = []
+        if profile:
+            sql[0] += ", c.score AS profile_score, c.would_pass AS profile_pass"
+            sql.append("FROM run_compliance c JOIN runs r ON r.run_id = c.run_id")
+        else:
+            sql.append("FROM runs r")
+        sql.append("LEFT JOIN run_metrics m ON m.run_id = r.run_id")
+
+        where = []
+        for column, value in (('r.ea', ea), ('r.version', version), ('r.symbol', symbol),
+                              ('r.source', source)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(str(value))
+        if profile:
+            where.append("c.profile = ?")
+            params.append(profile)
+            if passed is not None:
+                where.append("c.would_pass = ?")
+                params.append(int(passed))
+        if start is not None:
+            where.append("r.end_time >= ?")
+            params.append(_epoch(start))
+        if end is not None:
+            where.append("r.start_time <= ?")
+            params.append(_epoch(end))
+
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        if order_by in METRIC_COLUMNS:
+            sql.append(f"ORDER BY m.{order_by} DESC")
+
+        cur = self.conn.execute(" ".join(sql), params)
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in cur.fetchall()]
+
+    def load_trades(self, run_id, start=None, end=None):
+        """Trades d'un run au format colonnaire (plage de dates optionnelle)"""
+        sql = "SELECT time, profit FROM trades WHERE run_id = ?"
+        params = [run_id]
+        if start is not None:
+            sql += " AND time >= ?"
+            params.append(_epoch(start))
+        if end is not None:
+            sql += " AND time <= ?"
+            params.append(_epoch(end))
+        rows = self.conn.execute(sql + " ORDER BY time", params).fetchall()
+        data = np.array(rows, dtype=np.float64).reshape(-1, 2)
+        return {
+            'time': data[:, 0].astype(np.int64).astype('datetime64[s]'),
+            'profit': data[:, 1]
+        }
+
+    def compare_versions(self, ea, symbol=None, profile=None):
+        """Agrégats par version d'un EA (moyennes des résumés précalculés)"""
+        sql = ("SELECT r.version, COUNT(*) AS runs, AVG(m.net_profit_pct) AS avg_profit_pct,"
+               " AVG(m.max_drawdown_pct) AS avg_max_dd_pct, AVG(m.profit_factor) AS avg_pf,"
+               " AVG(m.sharpe_ratio) AS avg_sharpe")
+        params = [ea]
+        if profile:
+            sql += (", AVG(c.would_pass) * 100 AS pass_rate FROM runs r"
+                    " JOIN run_compliance c ON c.run_id = r.run_id AND c.profile = ?")
+            params.insert(0, profile)
+        else:
+            sql += " FROM runs r"
+        sql += " LEFT JOIN run_metrics m ON m.run_id = r.run_id WHERE r.ea = ?"
+        if symbol:
+            sql += " AND r.symbol = ?"
+            params.append(symbol)
+        sql += " GROUP BY r.version ORDER BY CAST(r.version AS INTEGER), r.version"
+        cur = self.conn.execute(sql, params)
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in cur.fetchall()]
+
+#==============================================================================
+# MAIN
+#==============================================================================
+
+def main():
+    """Démonstration: ingestion de runs simulés puis requêtes indexées"""
+    from analyze_backtest import generate_sample_trades
+
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB
+    warehouse = TradeWarehouse(path)
+
+    if not warehouse.find_runs():
+        print("Ingestion de runs simulés...")
+        eas = [('SessionBreakout', str(v)) for v in range(1, 8)] + [('Scalper', '8'), ('SMC', '1')]
+        started = time.perf_counter()
+        for ea, version in eas:
+            for symbol in ('EURUSD', 'GBPUSD', 'XAUUSD'):
+                for _ in range(5):
+                    trades = generate_sample_trades(num_trades=500, win_rate=0.48 + 0.01 * int(version), avg_rr=1.5)
+                    warehouse.ingest_trades(trades, ea, version, symbol)
+        print(f"{len(eas) * 15} runs ingérés en {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    runs = warehouse.find_runs(ea='SessionBreakout', version='6', symbol='EURUSD',
+                               profile='FUNDING_PIPS_1STEP', passed=True)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print("\n" + "=" * 70)
+    print("  SessionBreakout v6 / EURUSD / FUNDING_PIPS_1STEP (pass)")
+    print("=" * 70)
+    for run in runs:
+        print(f"Run #{run['run_id']:<5} Profit: {run['net_profit_pct']:6.2f}%  "
+              f"DD: {run['max_drawdown_pct']:5.2f}%  Score: {run['profile_score']}")
+    print(f"\n{len(runs)} runs en {elapsed:.2f} ms")
+
+    print("\n" + "-" * 70)
+    print("SessionBreakout - comparaison des versions (FTMO)")
+    print("-" * 70)
+    for row in warehouse.compare_versions('SessionBreakout', profile='FTMO'):
+        print(f"v{row['version']:<3} runs: {row['runs']:<4} profit: {row['avg_profit_pct']:6.2f}%  "
+              f"DD: {row['avg_max_dd_pct']:5.2f}%  pass: {row['pass_rate']:5.1f}%")
+
+    warehouse.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+PropFirm Version Comparison
+Comparaison statistique de versions d'EA: bootstrap et tests de permutation
+vectorisés (profit factor, espérance, max DD, probabilité de passage challenge)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from metric_kernels import challenge_outcomes, server_days, to_columns
+from propfirm_validator import PROPFIRM_PROFILES
+
+#==============================================================================
+# CONFIGURATION
+#==============================================================================
+
+BATCH_SIZE = 4000          # Rééchantillons par matrice (mémoire ~ BATCH_SIZE x trades)
+CHALLENGE_DAYS = 60        # Horizon simulé pour la probabilité de passage
+INNER_PATHS = 100          # Challenges simulés par rééchantillon du set
+OBSERVED_PATHS = 10000     # Challenges simulés sur le set observé lui-même
+STATISTICS = ('profit_factor', 'expectancy', 'max_dd_pct')
+
+#==============================================================================
+# NOYAUX (une ligne = un rééchantillon)
+#==============================================================================
+
+def _statistics(samples, initial_balance):
+    """Statistiques par ligne d'une matrice de profits (rééchantillons x trades)"""
+    gains = np.where(samples > 0, samples, 0.0).sum(axis=1)
+    losses = -np.where(samples < 0, samples, 0.0).sum(axis=1)
+    equity = initial_balance + np.cumsum(samples, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial_balance)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_factor = np.where(losses > 0, gains / losses, np.inf)
+    return {
+        'profit_factor': profit_factor,
+        'expectancy': samples.mean(axis=1),
+        'max_dd_pct': ((peak - equity) / peak * 100).max(axis=1)
+    }
+
+
+def _bootstrap_batch(task):
+    profit, n_rows, initial_balance, seed = task
+    rng = np.random.default_rng(seed)
+    samples = profit[rng.integers(0, len(profit), size=(n_rows, len(profit)))]
+    return _statistics(samples, initial_balance)
+
+
+def _permutation_batch(task):
+    """Différence A - B après permutation des étiquettes du pool de trades"""
+    pool, n_a, n_rows, initial_balance, seed = task
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permuted(np.broadcast_to(pool, (n_rows, len(pool))), axis=1)
+    stats_a = _statistics(shuffled[:, :n_a], initial_balance)
+    stats_b = _statistics(shuffled[:, n_a:], initial_balance)
+    return {key: stats_a[key] - stats_b[key] for key in STATISTICS}
+
+
+def _pass_probability(replicates, trades_per_day, rules, initial_balance, rng, n_paths=INNER_PATHS):
+    """
+    Probabilité de passage (%) de chaque set de trades (une ligne = un set)
+    n_paths challenges tirés avec remise dans chaque set
+    """
+    n_sets, n = replicates.shape
+    n_trades = CHALLENGE_DAYS * trades_per_day
+    picks = rng.integers(0, n, size=(n_sets, n_paths, n_trades))
+    paths = replicates[np.arange(n_sets)[:, None, None], picks].reshape(-1, n_trades)
+    outcomes = challenge_outcomes(paths / initial_balance * 100, trades_per_day,
+                                  rules['max_daily_dd'], rules['max_total_dd'],
+                                  rules['profit_target'], rules['min_trading_days'])
+    return outcomes['passed'].reshape(n_sets, n_paths).mean(axis=1) * 100
+
+
+def _challenge_batch(task):
+    """Bootstrap de la probabilité de passage: un rééchantillon du set par ligne"""
+    profit, n_rows, trades_per_day, rules, initial_balance, seed = task
+    rng = np.random.default_rng(seed)
+    replicates = profit[rng.integers(0, len(profit), size=(n_rows, len(profit)))]
+    return _pass_probability(replicates, trades_per_day, rules, initial_balance, rng)
+
+
+def _challenge_permutation_batch(task):
+    """Différence de probabilité de passage A - B après permutation des étiquettes"""
+    pool, n_a, n_rows, trades_per_day, rules, initial_balance, seed = task
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permuted(np.broadcast_to(pool, (n_rows, len(pool))), axis=1)
+    p_a = _pass_probability(shuffled[:, :n_a], trades_per_day, rules, initial_balance, rng)
+    p_b = _pass_probability(shuffled[:, n_a:], trades_per_day, rules, initial_balance, rng)
+    return p_a - p_b
+
+#==============================================================================
+# EXECUTION PAR LOTS
+#==============================================================================
+
+def _run_batches(func, make_task, n_resamples, seed, workers, batch_size=BATCH_SIZE):
+    """Découpe n_resamples en matrices et les répartit sur un pool de processus"""
+    sizes = [batch_size] * (n_resamples // batch_size)
+    if n_resamples % batch_size:
+        sizes.append(n_resamples % batch_size)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    seeds = seed.spawn(len(sizes))
+    tasks = [make_task(size, s) for size, s in zip(sizes, seeds)]
+
+    if workers <= 1 or len(tasks) == 1:
+        parts = [func(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(func, tasks))
+
+    if isinstance(parts[0], dict):
+        return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+    return np.concatenate(parts)
+
+
+def _interval(values, confidence):
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return (float('nan'), float('nan'))
+    alpha = (1 - confidence) / 2 * 100
+    low, high = np.percentile(finite, [alpha, 100 - alpha])
+    return (float(low), float(high))
+
+
+def _trades_per_day(columns):
+    """Trades moyens par jour de trading (1 si pas de dates)"""
+    times = columns.get('time')
+    if times is None or len(times) == 0 or np.isnat(times).any():
+        return 1
+    n_days = len(np.unique(server_days(times)))
+    return max(1, int(round(len(times) / n_days)))
+
+#==============================================================================
+# COMPARAISON
+#==============================================================================
+
+def compare_trade_sets(trade_sets, labels=None, profile='FTMO', n_resamples=100000,
+                       n_permutations=None, initial_balance=100000, confidence=0.95,
+                       seed=42, workers=None):
+    """
+    Compare chaque set au premier (référence)
+    trade_sets: sets colonnaires (voir to_columns)
+    Retourne par set: intervalles bootstrap, et par comparaison: IC de la
+    différence, p-values bootstrap et permutation
+    """
+    if len(trade_sets) < 2:
+        raise ValueError("Au moins deux sets de trades sont nécessaires")
+    if profile not in PROPFIRM_PROFILES:
+        raise ValueError(f"Profil inconnu: {profile}")
+
+    labels = labels or [f"Set {i + 1}" for i in range(len(trade_sets))]
+    n_permutations = n_permutations or n_resamples
+    workers = workers or os.cpu_count() or 1
+    rules = PROPFIRM_PROFILES[profile]
+    seeds = np.random.SeedSequence(seed).spawn(len(trade_sets) * 4)
+
+    # Probabilité de passage: chaque rééchantillon simule INNER_PATHS challenges
+    n_outer = max(1, n_resamples // INNER_PATHS)
+    n_outer_perm = max(1, n_permutations // INNER_PATHS)
+    challenge_batch = max(1, BATCH_SIZE // INNER_PATHS)
+
+    sets = []
+    for i, columns in enumerate(trade_sets):
+        profit = np.asarray(columns['profit'], dtype=np.float64)
+        tpd = _trades_per_day(columns)
+        boot = _run_batches(
+            _bootstrap_batch, lambda size, s: (profit, size, initial_balance, s),
+            n_resamples, seeds[4 * i], workers
+        )
+        boot['pass_probability'] = _run_batches(
+            _challenge_batch, lambda size, s: (profit, size, tpd, rules, initial_balance, s),
+            n_outer, seeds[4 * i + 1], workers, challenge_batch
+        )
+        observed = {k: float(v[0]) for k, v in _statistics(profit[None, :], initial_balance).items()}
+        # Estimation observée: challenges tirés dans la séquence réelle, flux aléatoire
+        # indépendant des réplicats bootstrap
+        observed['pass_probability'] = float(_pass_probability(
+            profit[None, :], tpd, rules, initial_balance,
+            np.random.default_rng(seeds[4 * i + 3]), OBSERVED_PATHS)[0])
+        sets.append({
+            'label': labels[i],
+            'profit': profit,
+            'trades': len(profit),
+            'trades_per_day': tpd,
+            'observed': observed,
+            'bootstrap': boot,
+            'intervals': {key: _interval(boot[key], confidence) for key in boot}
+        })
+
+    reference = sets[0]
+    comparisons = []
+    for i, s in enumerate(sets[1:], start=1):
+        pool = np.concatenate([s['profit'], reference['profit']])
+        n_a = s['trades']
+        # Rythme commun sous l'hypothèse nulle (étiquettes interchangeables)
+        tpd = max(1, int(round((s['trades_per_day'] + reference['trades_per_day']) / 2)))
+        perm_seed, statistic_seed = np.random.SeedSequence([seed, i]).spawn(2)
+        perm = _run_batches(
+            _permutation_batch,
+            lambda size, sd: (pool, n_a, size, initial_balance, sd),
+            n_permutations, seeds[4 * i + 2], workers
+        )
+        perm['pass_probability'] = _run_batches(
+            _challenge_permutation_batch,
+            lambda size, sd: (pool, n_a, size, tpd, rules, initial_balance, sd),
+            n_outer_perm, perm_seed, workers, challenge_batch
+        )
+        # Statistique de test de la probabilité de passage: mêmes rythme et nombre de
+        # chemins que sous l'hypothèse nulle, sur les séquences réelles non permutées
+        rng = np.random.default_rng(statistic_seed)
+        tested = {'pass_probability': float(
+            _pass_probability(s['profit'][None, :], tpd, rules, initial_balance, rng)[0]
+            - _pass_probability(reference['profit'][None, :], tpd, rules, initial_balance, rng)[0])}
+
+        comparison = {'label': f"{s['label']} vs {reference['label']}", 'metrics': {}}
+        for key in STATISTICS + ('pass_probability',):
+            observed = s['observed'][key] - reference['observed'][key]
+            diff = s['bootstrap'][key] - reference['bootstrap'][key]
+            finite = diff[np.isfinite(diff)]
+            if finite.size:
+                ties = (finite == 0).mean() / 2    # Egalités réparties des deux côtés
+                p_boot = 2 * min((finite < 0).mean() + ties, (finite > 0).mean() + ties)
+            else:
+                p_boot = float('nan')
+            perm_values = perm[key][np.isfinite(perm[key])]
+            statistic = tested.get(key, observed)
+            p_perm = ((np.abs(perm_values) >= abs(statistic)).sum() + 1) / (perm_values.size + 1)
+            comparison['metrics'][key] = {
+                'difference': observed,
+                'interval': _interval(diff, confidence),
+                'p_bootstrap': float(min(p_boot, 1.0)),
+                'p_permutation': float(p_perm)
+            }
+        comparisons.append(comparison)
+
+    return {
+        'profile': profile,
+        'n_resamples': n_resamples,
+        'n_permutations': n_permutations,
+        'confidence': confidence,
+        'sets': sets,
+        'comparisons': comparisons
+    }
+
+#==============================================================================
+# RAPPORT
+#==============================================================================
+
+def print_comparison_report(results):
+    """Affiche le rapport de comparaison"""
+    conf = int(results['confidence'] * 100)
+    print("\n" + "=" * 78)
+    print("                 EA VERSION COMPARISON")
+    print("=" * 78)
+    print(f"\nProfil: {PROPFIRM_PROFILES[results['profile']]['name']}  |  "
+          f"Bootstrap: {results['n_resamples']:,}  |  Permutations: {results['n_permutations']:,}")
+
+    for s in results['sets']:
+        print("\n" + "-" * 78)
+        print(f"{s['label']} ({s['trades']} trades, ~{s['trades_per_day']}/jour)")
+        print("-" * 78)
+        for key in STATISTICS + ('pass_probability',):
+            low, high = s['intervals'][key]
+            print(f"{key:18s}: {s['observed'][key]:10.2f}   IC{conf}: [{low:.2f}, {high:.2f}]")
+
+    for c in results['comparisons']:
+        print("\n" + "-" * 78)
+        print(c['label'])
+        print("-" * 78)
+        for key, m in c['metrics'].items():
+            low, high = m['interval']
+            significant = "✓" if m['p_permutation'] < 1 - results['confidence'] else " "
+            print(f"{key:18s}: Δ {m['difference']:+9.2f}  IC{conf}: [{low:+.2f}, {high:+.2f}]  "
+                  f"p_boot={m['p_bootstrap']:.4f}  p_perm={m['p_permutation']:.4f} {significant}")
+
+    print("\n" + "=" * 78 + "\n")
+
+
+def main():
+    """Démonstration: deux versions simulées très proches"""
+    import time
+    from analyze_backtest import generate_sample_trades
+
+    v6 = to_columns(generate_sample_trades(num_trades=600, win_rate=0.54, avg_rr=1.5))
+    v7 = to_columns(generate_sample_trades(num_trades=600, win_rate=0.56, avg_rr=1.5))
+
+    started = time.perf_counter()
+    results = compare_trade_sets([v6, v7], labels=['SessionBreakout v6', 'SessionBreakout v7'],
+                                 profile='FTMO', n_resamples=100000)
+    print_comparison_report(results)
+    print(f"Durée: {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+PropFirm Walk-Forward Engine
+Découpage in-sample / out-of-sample (ancré ou glissant) et évaluation parallèle
+des métriques et de la conformité prop firm pour chaque fold
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from metric_kernels import (
+    bucket_daily, compliance_kernel, equity_from_pnl, pad_trade_sets,
+    returns_from_equity, server_days, sharpe_ratio, sort_by_time, to_columns,
+    trade_metrics, trading_calendar
+)
+from analyze_backtest import PROPFIRM_RULES, generate_sample_trades
+
+#==============================================================================
+# FOLDS
+#==============================================================================
+
+def make_folds(n_days, is_days, oos_days, step_days=None, anchored=False):
+    """
+    Génère les folds en jours de trading (index dans le calendrier)
+    - glissant: fenêtre IS de taille fixe qui avance de step_days
+    - ancré: IS démarre toujours au jour 0 et s'allonge
+    Retourne un tableau (folds x 4): is_start, is_end, oos_start, oos_end (bornes exclusives)
+    """
+    step_days = step_days or oos_days
+    is_end = np.arange(is_days, n_days - oos_days + 1, step_days)
+    is_start = np.zeros_like(is_end) if anchored else is_end - is_days
+    return np.stack([is_start, is_end, is_end, is_end + oos_days], axis=1)
+
+#==============================================================================
+# WORKERS
+#==============================================================================
+
+# Etat partagé par worker: transmis une seule fois via l'initializer du pool
+_STATE = {}
+
+
+def _init_worker(state):
+    _STATE.clear()
+    _STATE.update(state)
+
+
+def _window_metrics(d0, d1):
+    """Métriques de tous les sets sur la fenêtre de jours [d0, d1)"""
+    # Colonnes couvrant la fenêtre pour au moins un set (trades triés par date)
+    c0, c1 = _STATE['col_start'][d0], _STATE['col_end'][d1]
+    day_index = _STATE['day_index'][:, c0:c1]
+    profit = _STATE['profit'][:, c0:c1]
+    valid = _STATE['valid'][:, c0:c1] & (day_index >= d0) & (day_index < d1)
+    initial_balance = _STATE['initial_balance']
+
+    metrics = trade_metrics(profit, valid, _STATE['daily_pnl'][:, d0:d1],
+                            _STATE['daily_count'][:, d0:d1], initial_balance)
+
+    equity = equity_from_pnl(_STATE['daily_pnl'][:, d0:d1], initial_balance)
+    metrics['sharpe_ratio'] = sharpe_ratio(returns_from_equity(equity))
+    metrics['profit_per_day'] = metrics['net_profit'] / max(d1 - d0, 1)
+
+    compliance = {
+        firm: compliance_kernel(metrics, rules)['would_pass']
+        for firm, rules in _STATE['rules'].items()
+    }
+    return metrics, compliance
+
+
+def _evaluate_folds(folds):
+    """Evalue un paquet de folds: retourne une liste de (is, oos) par fold"""
+    results = []
+    for is_start, is_end, oos_start, oos_end in folds:
+        results.append((_window_metrics(is_start, is_end),
+                        _window_metrics(oos_start, oos_end)))
+    return results
+
+#==============================================================================
+# MOTEUR
+#==============================================================================
+
+class WalkForwardEngine:
+    def __init__(self, trade_sets, initial_balance=100000, propfirms=None,
+                 server_offset_hours=0, workers=None):
+        """
+        trade_sets: liste de sets colonnaires (voir to_columns), ex: une passe
+        d'optimisation ou une version d'EA par set
+        """
+        self.initial_balance = initial_balance
+        self.propfirms = propfirms or list(PROPFIRM_RULES.keys())
+        self.workers = workers or os.cpu_count() or 1
+
+        # Les bornes de fenêtres (searchsorted) supposent chaque set trié par date
+        batch = pad_trade_sets([sort_by_time(s) for s in trade_sets])
+        days = server_days(batch['time'], server_offset_hours)
+        self.calendar, day_index = trading_calendar(days)
+        n_days = len(self.calendar)
+
+        # Bornes de colonnes par jour: [col_start[d0], col_end[d1]) contient la fenêtre
+        bounds = np.stack([np.searchsorted(row, np.arange(n_days + 1)) for row in day_index])
+
+        self.state = {
+            'profit': batch['profit'],
+            'valid': batch['valid'],
+            'day_index': day_index,
+            'col_start': bounds.min(axis=0),
+            'col_end': bounds.max(axis=0),
+            'daily_pnl': bucket_daily(np.where(batch['valid'], batch['profit'], 0), day_index, n_days),
+            'daily_count': bucket_daily(batch['valid'].astype(np.float64), day_index, n_days),
+            'initial_balance': initial_balance,
+            'rules': {firm: PROPFIRM_RULES[firm] for firm in self.propfirms}
+        }
+
+    def folds(self, is_days, oos_days, step_days=None, anchored=False):
+        """Folds sur le calendrier de trading du lot"""
+        return make_folds(len(self.calendar), is_days, oos_days, step_days, anchored)
+
+    def run(self, folds):
+        """
+        Evalue tous les folds en parallèle
+        Les tableaux retournés sont de forme (folds x sets)
+        """
+        folds = np.asarray(folds, dtype=np.int64)
+        if len(folds) == 0:
+            raise ValueError("Aucun fold: historique trop court pour ces fenêtres")
+
+        n_chunks = min(len(folds), self.workers * 4)
+        chunks = [c.tolist() for c in np.array_split(folds, n_chunks)]
+
+        if self.workers <= 1:
+            _init_worker(self.state)
+            parts = [_evaluate_folds(c) for c in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(self.state,)) as pool:
+                parts = list(pool.map(_evaluate_folds, chunks))
+
+        fold_results = [r for part in parts for r in part]
+        return self._assemble(folds, fold_results)
+
+    def _assemble(self, folds, fold_results):
+        """Empile les résultats par fold et calcule la dégradation IS -> OOS"""
+        result = {
+            'folds': folds,
+            'fold_dates': self.calendar[np.minimum(folds, len(self.calendar) - 1)],
+            'in_sample': {},
+            'out_of_sample': {},
+            'compliance': {'in_sample': {}, 'out_of_sample': {}}
+        }
+
+        for side, pos in (('in_sample', 0), ('out_of_sample', 1)):
+            keys = fold_results[0][pos][0].keys()
+            for key in keys:
+                result[side][key] = np.stack([r[pos][0][key] for r in fold_results])
+            for firm in self.propfirms:
+                result['compliance'][side][firm] = np.stack([r[pos][1][firm] for r in fold_results])
+
+        is_m = result['in_sample']
+        oos_m = result['out_of_sample']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            efficiency = np.where(is_m['profit_per_day'] > 0,
+                                  oos_m['profit_per_day'] / is_m['profit_per_day'], np.nan)
+        result['degradation'] = {
+            'walk_forward_efficiency': efficiency,
+            'profit_factor': oos_m['profit_factor'] - is_m['profit_factor'],
+            'win_rate': oos_m['win_rate'] - is_m['win_rate'],
+            'sharpe_ratio': oos_m['sharpe_ratio'] - is_m['sharpe_ratio'],
+            'max_drawdown_pct': oos_m['max_drawdown_pct'] - is_m['max_drawdown_pct']
+        }
+        return result
+
+#==============================================================================
+# RAPPORT
+#==============================================================================
+
+def summarize(result, labels=None):
+    """Résumé par set: efficacité médiane et taux de réussite IS/OOS par firme"""
+    n_sets = result['in_sample']['net_profit'].shape[1]
+    labels = labels or [f"Set {i + 1}" for i in range(n_sets)]
+    summary = []
+    for i, label in enumerate(labels):
+        wfe = result['degradation']['walk_forward_efficiency'][:, i]
+        row = {
+            'label': label,
+            'wfe_median': float(np.nanmedian(wfe)) if np.isfinite(wfe).any() else float('nan'),
+            'oos_profitable_pct': float((result['out_of_sample']['net_profit'][:, i] > 0).mean() * 100),
+            'pass_rate': {}
+        }
+        for firm, passes in result['compliance']['out_of_sample'].items():
+            row['pass_rate'][firm] = {
+                'in_sample': float(result['compliance']['in_sample'][firm][:, i].mean() * 100),
+                'out_of_sample': float(passes[:, i].mean() * 100)
+            }
+        summary.append(row)
+    return summary
+
+
+def print_walk_forward_report(result, labels=None):
+    """Affiche le rapport walk-forward"""
+    summary = summarize(result, labels)
+    folds = result['folds']
+
+    print("\n" + "=" * 70)
+    print("                    WALK-FORWARD REPORT")
+    print("=" * 70)
+    print(f"\nFolds: {len(folds)}  (IS {folds[0, 1] - folds[0, 0]}j -> OOS {folds[0, 3] - folds[0, 2]}j)")
+    print(f"Période: {result['fold_dates'][0, 0]} -> {result['fold_dates'][-1, 3]}")
+
+    for row in summary:
+        print("\n" + "-" * 70)
+        print(row['label'])
+        print("-" * 70)
+        print(f"WF Efficiency (médiane): {row['wfe_median']:.2f}")
+        print(f"Folds OOS rentables:     {row['oos_profitable_pct']:.1f}%")
+        for firm, rates in row['pass_rate'].items():
+            print(f"{firm:20s}: IS {rates['in_sample']:5.1f}% -> OOS {rates['out_of_sample']:5.1f}%")
+
+    print("\n" + "=" * 70 + "\n")
+
+
+def main():
+    """Démonstration sur des trades simulés"""
+    print("\nGénération de trades simulés...")
+    sets = [
+        to_columns(generate_sample_trades(num_trades=3000, win_rate=wr, avg_rr=1.5))
+        for wr in (0.45, 0.50, 0.55)
+    ]
+    engine = WalkForwardEngine(sets, initial_balance=100000)
+
+    for anchored in (False, True):
+        folds = engine.folds(is_days=60, oos_days=20, anchored=anchored)
+        print(f"\nMode {'ancré' if anchored else 'glissant'}: {len(folds)} folds")
+        result = engine.run(folds)
+        print_walk_forward_report(result, labels=['WR 45%', 'WR 50%', 'WR 55%'])
+
+
+if __name__ == "__main__":
+    main()